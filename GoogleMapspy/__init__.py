@@ -1,2 +1,22 @@
-from GoogleMapspy.google_maps import GoogleMaps
+import importlib
 
+# the clients are imported on first access, so `import GoogleMapspy` stays cheap and aiohttp
+# is only loaded by code that uses AsyncGoogleMaps
+_LAZY = {
+    "GoogleMaps": "GoogleMapspy.google_maps",
+    "AsyncGoogleMaps": "GoogleMapspy.async_google_maps",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
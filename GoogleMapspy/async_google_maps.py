@@ -0,0 +1,474 @@
+import asyncio
+import time
+
+from GoogleMapspy.cursors import ReviewCursor, SORT_HIGHEST, SORT_LOWEST, SORT_NEWEST, SORT_RELEVANT
+from GoogleMapspy.decoding import accept_encoding, loads
+from GoogleMapspy.google_maps import GoogleMaps, GOOGLE_URL
+from GoogleMapspy.headers import HeaderRotator
+from GoogleMapspy.paging import PageSize, page_size
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.proxy_pool import ProxyPool
+from GoogleMapspy.retry import RetryPolicy, is_blocked
+from GoogleMapspy.var import Place, PlaceError, Review, get_index
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency: pip install GoogleMapsPY[async]
+    aiohttp = None
+
+try:
+    from aiohttp.compression_utils import HAS_BROTLI, HAS_ZSTD
+except ImportError:  # no aiohttp, or one without zstd support
+    HAS_BROTLI = HAS_ZSTD = False
+
+AIOHTTP_ACCEPT_ENCODING = accept_encoding(brotli=HAS_BROTLI, zstd=HAS_ZSTD)
+
+
+class AsyncGoogleMaps(GoogleMaps):
+    """
+    asyncio version of GoogleMaps.
+
+    Shares the url builders and the Place/Review parsers with GoogleMaps, but every request goes through
+    one aiohttp.ClientSession, so a single event loop can keep many keyword and place fetches in flight.
+    `max_concurrency` caps the number of requests this client sends at the same time. Unlike GoogleMaps, the
+    default rate_limiter has no endpoint rates, so that cap is the only limit; pass
+    RateLimiter(rates=DEFAULT_RATES) for the pace of the sync client.
+
+        async with AsyncGoogleMaps(lang="en", country_code="eg") as maps:
+            async for place in maps.search("restaurant"):
+                print(place)
+    """
+
+    def __init__(self, latitude: str = "-200", longitude: str = "-200", lang: str = "en", country_code: str = "eg",
+                 zoom: float = None, zoom_index: int = 9, session: "aiohttp.ClientSession" = None,
+                 proxies: "dict | ProxyPool" = None, base_url: str = GOOGLE_URL, rate_limiter: RateLimiter = None,
+                 retry_policy: RetryPolicy = None, max_concurrency: int = 10, timeout: float = 60,
+                 header_rotator: HeaderRotator = None, keep_raw: bool = True, keep_results: bool = True,
+                 cursor_store=None):
+        if aiohttp is None:
+            raise ImportError("AsyncGoogleMaps requires aiohttp, install it with `pip install aiohttp`")
+
+        self._own_session = session is None
+        super().__init__(latitude=latitude, longitude=longitude, lang=lang, country_code=country_code, zoom=zoom,
+                         zoom_index=zoom_index, session=session, proxies=proxies, base_url=base_url,
+                         rate_limiter=rate_limiter, retry_policy=retry_policy, header_rotator=header_rotator,
+                         keep_raw=keep_raw, keep_results=keep_results, cursor_store=cursor_store)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # notified when this client gives a pool proxy back
+        self._proxy_released = asyncio.Condition()
+
+    def _new_session(self):
+        # aiohttp.ClientSession must be created inside a running loop, see _get_session
+        return None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    @property
+    def accept_encoding(self):
+        return AIOHTTP_ACCEPT_ENCODING
+
+    def _get_session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    def _new_rate_limiter(self):
+        # no endpoint rates by default, the semaphore is the only limit unless a RateLimiter is passed
+        return RateLimiter()
+
+    async def _throttle_async(self, endpoint, sleep_time=None, proxy=None):
+        wait = self.rate_limiter.delay(endpoint, proxy or self.proxy, self._rate(sleep_time))
+        if wait:
+            await asyncio.sleep(wait)
+
+    async def _acquire_proxy(self, endpoint, sleep_time=None):
+        # ProxyPool.acquire blocks the thread: take a proxy without blocking, else wait for a release of this
+        # client or the end of the next quarantine (at most a second, for releases by other users of the pool)
+        async with self._proxy_released:
+            while True:
+                proxy, wait = self.proxy_pool.acquire_for(self.rate_limiter, endpoint, self._rate(sleep_time),
+                                                          block=False,
+                                                          cooldown=self.retry_policy.circuit_breaker.remaining)
+                if proxy is not None:
+                    return proxy, wait
+                try:
+                    await asyncio.wait_for(self._proxy_released.wait(), min(self.proxy_pool.next_free_in() or 1, 1))
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release_proxy(self, proxy, **kwargs):
+        self.proxy_pool.release(proxy, **kwargs)
+        async with self._proxy_released:
+            self._proxy_released.notify_all()
+
+    async def _send(self, url, proxy):
+        async with self._semaphore:
+            async with self._get_session().get(url, headers=self._headers(proxy), proxy=proxy) as r:
+                await r.read()
+                return r
+
+    async def _get_json_async(self, endpoint, url, sleep_time=None, stats: dict = None,
+                              retry_timeouts: bool = True):
+        """
+        Awaitable GoogleMaps._get_json, with the same arguments.
+
+        :param stats: see GoogleMaps._get_json
+        :param retry_timeouts: see GoogleMaps._request
+        """
+        used = []
+
+        async def send():
+            if self.proxy_pool is None:
+                await self._throttle_async(endpoint, sleep_time)
+                start = time.monotonic()
+                r = await self._send(url, self.proxy)
+                if stats is not None:
+                    stats["latency"] = time.monotonic() - start
+                return r
+
+            proxy, wait = await self._acquire_proxy(endpoint, sleep_time)
+            used.append(proxy)
+            try:
+                if wait:
+                    await asyncio.sleep(wait)
+                start = time.monotonic()
+                r = await self._send(url, proxy)
+            except Exception:
+                await self._release_proxy(proxy, ok=False)
+                raise
+            latency = time.monotonic() - start
+            if stats is not None:
+                stats["latency"] = latency
+            await self._release_proxy(proxy, latency=latency, ok=r.ok, blocked=is_blocked(r))
+            return r
+
+        r = await self.retry_policy.call_async(send, key=self._retry_key(used),
+                                               exceptions=(aiohttp.ClientConnectionError, asyncio.TimeoutError),
+                                               retry_timeouts=retry_timeouts)
+        if not r.ok:
+            r.release()
+        r.raise_for_status()
+        if stats is not None:
+            stats["bytes"] = int(r.headers.get("content-length") or 0) or None
+        # aiohttp decompressed the body while reading it in _send; loads skips the prefix without slicing
+        return loads(await r.text("utf-8"))
+
+    async def get_images(self, ids=[]):
+        if ids:
+            id1, id2 = ids
+        else:
+            raise Exception("pass ids")
+        list_data = await self._get_json_async("images", self._get_images_url(id1_=id1, id2_=id2))
+        return self._parse_images(list_data)
+
+    async def get_reviews(self, ids=[], url="", clear_old=True, streem=True, sleep_time: float = None,
+                          sort: int = None, resume: bool = False, new_only: bool = False,
+                          page: "int | PageSize" = 200):
+        """
+        :param sort: see GoogleMaps.get_reviews
+        :param resume: see GoogleMaps.get_reviews, off by default
+        :param new_only:
+        :param page:
+        """
+        sort = sort or (SORT_NEWEST if new_only else SORT_RELEVANT)
+        pager = page_size(page)
+        pager.reset()
+        id1, id2 = self._review_ids(ids, url)
+
+        crawl = ReviewCursor(self.cursor_store, id1, id2, sort, resume=resume, new_only=new_only)
+        self.reviews = []
+        last_id = crawl.start
+        while True:
+            size, stats = pager.size, {}
+            try:
+                list_data = await self._get_json_async("review",
+                                                       self._url_get_review(id1, id2, last_id, page=size, sort=sort),
+                                                       sleep_time, stats=stats,
+                                                       retry_timeouts=not pager.can_shrink)
+            except asyncio.TimeoutError:
+                if not pager.timed_out():
+                    raise
+                self.logger.info(f"Timeout, Page:{size} >> {pager.size}")
+                continue
+
+            if len(list_data[2]) == 0:
+                break
+            pager.record(size, len(list_data[2]), stats.get("latency"), stats.get("bytes"))
+
+            for ll in list_data[2]:
+                review = Review(ll)
+                if not crawl.accept(review.id):
+                    break
+                last_id = review.id
+                if self.keep_results:
+                    self.reviews.append(review)
+                if streem:
+                    yield review
+                if not last_id:
+                    break
+            crawl.page_done(last_id)
+
+            if not last_id or crawl.stopped:
+                break
+
+        crawl.finish()
+
+    async def get_reviews_parallel(self, ids=[], url="", sorts=(SORT_HIGHEST, SORT_LOWEST), total: int = None,
+                                   sleep_time: float = None, page: "int | PageSize" = 200,
+                                   stop_at_known: bool = False):
+        """
+        asyncio version of GoogleMaps.get_reviews_parallel: one task per sort order, same arguments.
+        The default rate limiter of the async client has no "review" rate, so the streams overlap without a
+        ProxyPool; with a "review" rate they take turns on the bucket of their proxy.
+        """
+        id1, id2 = self._review_ids(ids, url)
+        pager = page_size(page)
+        pager.reset()
+        self.reviews = []
+        seen = set()
+        stop = asyncio.Event()
+        results = asyncio.Queue()
+        done = object()
+
+        async def stream(sort):
+            last_id = ""
+            try:
+                while not stop.is_set():
+                    size, stats = pager.size, {}
+                    try:
+                        list_data = await self._get_json_async("review",
+                                                               self._url_get_review(id1, id2, last_id, size, sort),
+                                                               sleep_time, stats=stats,
+                                                               retry_timeouts=not pager.can_shrink)
+                    except asyncio.TimeoutError:
+                        if not pager.timed_out():
+                            raise
+                        continue
+                    reviews = [Review(ll) for ll in list_data[2] or ()]
+                    if not reviews:
+                        break
+                    pager.record(size, len(reviews), stats.get("latency"), stats.get("bytes"))
+                    new = [r for r in reviews if r.id is None or r.id not in seen]
+                    seen.update(r.id for r in new)
+                    for review in new:
+                        results.put_nowait(review)
+                    last_id = reviews[-1].id
+                    if total is not None and len(seen) >= total:
+                        stop.set()
+                    if not last_id or (stop_at_known and not new):
+                        break
+            except Exception as e:
+                results.put_nowait(e)
+            finally:
+                results.put_nowait(done)
+
+        tasks = [asyncio.ensure_future(stream(sort)) for sort in sorts]
+        running = len(tasks)
+        try:
+            while running:
+                item = await results.get()
+                if item is done:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    if self.keep_results:
+                        self.reviews.append(item)
+                    yield item
+        finally:
+            stop.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_place(self, keyword="", url="", offset=0, p=100, fields=None, as_tuple: bool = False) -> Place:
+        parse = self._parser(fields, as_tuple)
+        if keyword:
+            list_data = await self._get_json_async("search", self._url_search(keyword, p, offset)["url"])
+            return self._place_from_search(list_data, parse)
+        elif url:
+            list_data = await self._get_json_async("place", self._url_get_place(url))
+            return parse(list_data[6])
+        raise Exception("pass keyword or url")
+
+    async def get_places(self, urls=(), keywords=(), workers: int = 8, ordered: bool = False, queue_size: int = None,
+                         fields=None, as_tuple: bool = False):
+        """
+        Async generator of GoogleMaps.get_places: up to `workers` get_place calls in flight on the event loop,
+        each Place yielded as soon as it is ready. Same arguments.
+
+            async for place in maps.get_places(urls=urls, workers=32):
+                ...
+        """
+        items = [(url, "") for url in urls] + [("", keyword) for keyword in keywords]
+        queue_size = max(queue_size or workers * 2, workers)
+
+        async def fetch(index, url, keyword):
+            try:
+                place = await self.get_place(keyword=keyword, url=url, fields=fields, as_tuple=as_tuple)
+            except Exception as e:
+                self.logger.error(f"get_places: {index=}, {url=}, {keyword=}: {e}")
+                return PlaceError(index, url=url or None, keyword=keyword or None, error=e)
+            if place is None:
+                return PlaceError(index, url=url or None, keyword=keyword or None,
+                                  error=LookupError("no place found"))
+            return place
+
+        todo = iter(enumerate(items))
+        pending = {}
+        done_out_of_order = {}
+        next_index = 0
+
+        def fill():
+            # `workers` bounds the requests in flight, `queue_size` the results held back by `ordered`
+            while len(pending) < workers and len(pending) + len(done_out_of_order) < queue_size:
+                item = next(todo, None)
+                if item is None:
+                    return
+                index, (url, keyword) = item
+                pending[asyncio.ensure_future(fetch(index, url, keyword))] = index
+
+        try:
+            fill()
+            while pending:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    index = pending.pop(task)
+                    if ordered:
+                        done_out_of_order[index] = task.result()
+                    else:
+                        yield task.result()
+
+                while next_index in done_out_of_order:
+                    yield done_out_of_order.pop(next_index)
+                    next_index += 1
+                fill()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def search(self, keyword: str, all_: bool = True, clear_old: bool = True, offset: int = 0,
+                     per_page: int = 100, streem: bool = True, sleep_time: float = None, add_oq: bool = True,
+                     fields=None, as_tuple: bool = False, resume: bool = True):
+        """
+        Same paging as GoogleMaps.search, but the keyword is not stored on the client,
+        so one AsyncGoogleMaps can run many searches concurrently.
+
+        :param keyword:
+        :param all_:
+        :param clear_old:
+        :param offset:
+        :param per_page:
+        :param streem:
+        :param sleep_time:
+        :param add_oq:
+        :param fields: see GoogleMaps.search
+        :param as_tuple:
+        :param resume:
+        :return:
+        """
+        store = self.cursor_store
+        if offset and resume and store is not None:
+            raise ValueError("search: the checkpoint of resume=True sets the offset, pass resume=False to give one")
+        parse = self._parser(fields, as_tuple)
+        pager = page_size(per_page)
+        pager.reset()
+        if clear_old:
+            self.places = []
+        key = self._search_key(keyword)
+        if store is not None and resume:
+            saved = store.get_search(key)
+            if saved is not None and not saved[2]:
+                offset, pager.size = saved[0], saved[1]
+                self.logger.info(f"Resume search, Keyword:{keyword}, Offset:{offset}, Per Page:{pager.size}")
+
+        done = False
+        while pager.size > 0:
+            per_page = pager.size
+            if store is not None:
+                store.set_search(key, offset, per_page)
+            self.logger.info(f"request:{'GET'}, Per Page:{per_page}, Offset:{offset}, Keyword:{keyword}")
+            url = self._url_search(keyword, per_page, offset, add_oq=add_oq)["url"]
+            stats = {}
+            try:
+                list_data = await self._get_json_async("search", url, sleep_time, stats=stats,
+                                                       retry_timeouts=not pager.can_shrink)
+            except asyncio.TimeoutError:
+                if not pager.timed_out():
+                    raise
+                self.logger.info(f"Timeout, Per Page:{per_page} >> {pager.size}")
+                continue
+            data, type_ = self._prepare_data(list_data)
+
+            if type_ == "place":
+                if data[-1][-1] == 0 or not get_index(data, 14):
+                    self.logger.info(f"No Place, {per_page} {type_}", )
+                    if per_page <= 1:
+                        done = True
+                        break
+                    pager.shrink(4)
+                    continue
+
+                place = parse(data[14])
+                if self.keep_results:
+                    self.places.append(place)
+                yield place
+                done = True
+                break
+
+            elif type_ == "list":
+                pager.record(per_page, len(data), stats.get("latency"), stats.get("bytes"))
+                for ll in data:
+                    if data[-1][-1] == 0 or not get_index(ll, 14) or not get_index(get_index(ll, 14), 11):
+                        self.logger.info(f"No Place, {per_page} {type_}", )
+                        continue
+
+                    place = parse(ll[14])
+                    if self.keep_results:
+                        self.places.append(place)
+                    if streem:
+                        yield place
+            elif self._results_ended(list_data):
+                self.logger.info(f"No more places, Offset:{offset}, Keyword:{keyword}")
+                done = True
+                break
+            else:
+                self.logger.error(f"{type_=}, {per_page=}, {list_data=}")
+                break
+
+            if not all_:
+                break
+
+            offset += len(data)
+        else:
+            done = True
+
+        if store is not None and done:
+            store.set_search(key, offset, pager.size, done=True)
+
+    async def search_many(self, keywords, skip_done: bool = True, **kwargs):
+        """
+        Same as GoogleMaps.search_many, one keyword after the other.
+        """
+        for index, keyword in enumerate(keywords):
+            if skip_done and self.search_done(keyword):
+                self.logger.info(f"search_many: skip done keyword {keyword!r}")
+                continue
+            try:
+                async for place in self.search(keyword, **kwargs):
+                    yield place
+            except Exception as e:
+                self.logger.error(f"search_many: {index=}, {keyword=}: {e}")
+                yield PlaceError(index, keyword=keyword, error=e)
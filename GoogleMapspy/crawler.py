@@ -0,0 +1,347 @@
+"""
+Area sweeps of the /search?tbm=map endpoint, tile by tile.
+
+A search around a point returns the companies of one map viewport. GeoCrawler starts at a point, searches it,
+and queues its four neighbours one step away (the '1d' size of the zoom), until the area is covered:
+
+    crawler = GeoCrawler(keyword="restaurant", bbox=(114.10, 22.25, 114.25, 22.40))
+    for company in crawler.crawl(114.1277, 22.3527):
+        ...
+
+The frontier is an explicit queue, not recursion, and a tile is queued once: its centre is rounded onto a grid of
+half a step, so the same tile reached by two paths (up then left, left then up) is one visited key. A company is
+yielded once, the first time it is seen.
+
+QuadTreeCrawler covers a bounding box with GoogleMaps.search instead, splitting the tiles whose search was truncated.
+"""
+import collections
+import logging
+
+import requests
+
+from GoogleMapspy.function import get_1d, get_23d, get_companies, lat_degree2km, lng_degree2km
+
+# zoom stepped with when no probed zoom found anything (the 1d of zoom 16, get_23d's default distance)
+DEFAULT_ZOOM = 16
+
+
+def in_polygon(longitude, latitude, polygon) -> bool:
+    """
+    Ray casting test.
+
+    :param polygon: [(longitude, latitude), ...], closed or not
+    """
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > latitude) != (yj > latitude) and longitude < (xj - xi) * (latitude - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def company_key(company: dict) -> tuple:
+    """
+    Identity of a company dict of get_allcom, which carries no place id.
+    """
+    return company.get("companyName"), company.get("address"), company.get("phone")
+
+
+def place_key(place) -> tuple:
+    """
+    Identity of a Place: its ids, or for a place without any its title, address and coordinates.
+    """
+    if place.google_id or place.google_place_id:
+        return place.google_id, place.google_place_id
+    return place.title, place.full_address, place.latitude, place.longitude
+
+
+class ZoomSweep:
+    """
+    Searches a tile at every zoom of `zooms` and steps with the first (widest) one that found the most
+    companies, as get_com did. Costs every page of every zoom at every tile.
+    """
+
+    def __init__(self, zooms=range(14, 21)):
+        self.zooms = tuple(zooms)
+
+    def choose(self, crawler, longitude, latitude) -> tuple:
+        """
+        :return: (zoom to step with, [companies found while probing])
+        """
+        counts = {}
+        found = []
+        for zoom in self.zooms:
+            companies = crawler.search_tile(longitude, latitude, zoom)
+            counts[zoom] = len(companies)
+            found += companies
+        best = max(counts.values(), default=0)
+        return (next(z for z, n in counts.items() if n == best) if best else DEFAULT_ZOOM), found
+
+
+class ZoomSearch:
+    """
+    Binary search for the widest zoom whose search is complete.
+
+    A search returns at most `saturation` companies: a tile that gives that many holds more than Google returned,
+    and a closer zoom is needed to get them all. The result count only grows as the zoom widens, so the widest
+    complete zoom is found in log2(len(zooms)) searches instead of one per zoom. It is cached per keyword and
+    region of `region_km`: the next tile of the region searches the cached zoom only, and goes closer when that
+    search saturates.
+
+    :param zooms: zoom levels to choose from
+    :param saturation: result count of a truncated search, 120 for the /search?tbm=map endpoint
+    :param region_km: side of the cache regions
+    """
+
+    def __init__(self, zooms=range(14, 21), saturation: int = 120, region_km: float = 10.0):
+        self.zooms = tuple(sorted(zooms))
+        self.saturation = saturation
+        self.region_km = region_km
+        self.cache = {}
+        self.hits = 0
+
+    def region(self, keyword, longitude, latitude) -> tuple:
+        return (keyword, round(lat_degree2km(latitude) / self.region_km),
+                round(lng_degree2km(longitude, latitude) / self.region_km))
+
+    def choose(self, crawler, longitude, latitude) -> tuple:
+        """
+        :return: (zoom to step with, [companies found while probing])
+        """
+        results = {}
+
+        def saturated(i):
+            if i not in results:
+                results[i] = crawler.search_tile(longitude, latitude, self.zooms[i])
+            return len(results[i]) >= self.saturation
+
+        key = self.region(crawler.keyword, longitude, latitude)
+        low, high = 0, len(self.zooms) - 1
+        cached = self.cache.get(key)
+        if cached in self.zooms:
+            i = self.zooms.index(cached)
+            if not saturated(i):
+                # complete here too; a wider zoom might be, but the region's tiles are about alike
+                self.hits += 1
+                return cached, results[i]
+            low = min(i + 1, high)
+        while low < high:
+            middle = (low + high) // 2
+            if saturated(middle):
+                low = middle + 1
+            else:
+                high = middle
+        # the chosen zoom may never have been searched (every probe saturated): its companies are the tile's
+        saturated(low)
+        self.cache[key] = self.zooms[low]
+        return self.zooms[low], [c for companies in results.values() for c in companies]
+
+
+class GeoCrawler:
+    """
+    :param keyword: search keyword
+    :param zoom: zoom level of every tile (2-21); the step to the next tiles is its 1d value.
+        None lets `probe` choose the zoom of each tile
+    :param probe: ZoomSearch (default) or ZoomSweep, used when `zoom` is None
+    :param bbox: (min_longitude, min_latitude, max_longitude, max_latitude); tiles whose centre is outside are skipped
+    :param polygon: [(longitude, latitude), ...]; tiles whose centre is outside are skipped
+    :param max_tiles: stop after that many tiles
+    :param max_pages: pages of 20 companies read per tile and zoom, default until an empty page
+    :param proxies: requests proxies dict or ProxyPool, for the default `fetch`
+    :param fetch: function(longitude, latitude, d1, offset) -> [company dicts] of one page,
+        default function.get_companies
+    """
+
+    def __init__(self, keyword: str = "company", zoom: int = None, probe=None, bbox=None, polygon=None,
+                 max_tiles: int = None, max_pages: int = None, proxies=None, fetch=None):
+        self.keyword = keyword
+        self.zoom = zoom
+        self.probe = ZoomSearch() if probe is None else probe
+        self.bbox = bbox
+        self.polygon = polygon
+        self.max_tiles = max_tiles
+        self.max_pages = max_pages
+        self.proxies = proxies
+        self._fetch = fetch
+        self.d1 = get_1d(0)
+        self.logger = logging.getLogger(name="GoogleMapsPy")
+        self.tiles = 0
+        self.requests = 0
+
+    def __repr__(self):
+        return f"GeoCrawler(keyword={self.keyword!r}, zoom={self.zoom}, tiles={self.tiles})"
+
+    def fetch(self, longitude, latitude, d1, offset) -> list:
+        if self._fetch is not None:
+            return self._fetch(longitude, latitude, d1, offset)
+        return get_companies(longitude, latitude, d1, offset, proxies=self.proxies, keyword=self.keyword)
+
+    def inside(self, longitude, latitude) -> bool:
+        if self.bbox is not None:
+            min_lng, min_lat, max_lng, max_lat = self.bbox
+            if not (min_lng <= longitude <= max_lng and min_lat <= latitude <= max_lat):
+                return False
+        return self.polygon is None or in_polygon(longitude, latitude, self.polygon)
+
+    def tile_key(self, longitude, latitude, zoom) -> tuple:
+        """
+        Visited key of the tile centred on a point: the point on a grid of half the step of `zoom`, in km.
+        """
+        cell = self.d1[zoom] / 2000
+        return zoom, round(lat_degree2km(latitude) / cell), round(lng_degree2km(longitude, latitude) / cell)
+
+    def search_tile(self, longitude, latitude, zoom) -> list:
+        """
+        :return: the companies of every page of a search at `zoom`; a failed request ends the pages
+        """
+        companies = []
+        offset = 0
+        while self.max_pages is None or offset < self.max_pages * 20:
+            try:
+                self.requests += 1
+                page = self.fetch(longitude, latitude, self.d1[zoom], offset)
+            except requests.RequestException as e:
+                self.logger.warning(f"Search at {longitude},{latitude} zoom {zoom} offset {offset} failed: {e}")
+                break
+            if not page:
+                break
+            companies += page
+            offset += 20
+        return companies
+
+    def crawl(self, longitude, latitude):
+        """
+        Sweep the area from a starting point, breadth first.
+
+        :return: generator of company dicts, each company once
+        """
+        if self.bbox is None and self.polygon is None and self.max_tiles is None:
+            raise ValueError("GeoCrawler needs a bbox, a polygon or max_tiles to know where to stop")
+        if not self.inside(longitude, latitude):
+            self.logger.warning(f"Starting point {longitude},{latitude} is outside the area")
+            return
+
+        seen = set()
+        # a tile is marked visited when it is queued, so the frontier never holds a tile twice; the start tile
+        # once its zoom is chosen, as its neighbours are keyed with that zoom
+        visited = set()
+        frontier = collections.deque([(longitude, latitude)])
+        while frontier and (self.max_tiles is None or self.tiles < self.max_tiles):
+            lng, lat = frontier.popleft()
+            self.tiles += 1
+
+            if self.zoom is None:
+                step_zoom, companies = self.probe.choose(self, lng, lat)
+            else:
+                step_zoom, companies = self.zoom, self.search_tile(lng, lat, self.zoom)
+            self.logger.debug(f"Tile {lng},{lat}: {len(companies)} companies, stepping with zoom {step_zoom}")
+            if not visited:
+                visited.add(self.tile_key(lng, lat, step_zoom))
+            for company in companies:
+                key = company_key(company)
+                if key not in seen:
+                    seen.add(key)
+                    yield company
+
+            for next_lng, next_lat in get_23d(lng, lat, dis=self.d1[step_zoom]):
+                key = self.tile_key(next_lng, next_lat, step_zoom)
+                if key not in visited and self.inside(next_lng, next_lat):
+                    visited.add(key)
+                    frontier.append((next_lng, next_lat))
+
+
+class QuadTreeCrawler:
+    """
+    Area crawl with GoogleMaps.search, splitting the tiles where Google truncates.
+
+    A tile is searched with a viewport covering it. A search that returns `cap` places was truncated: the tile
+    holds more, so it is split into four quarters searched in turn. A search that returns fewer covered its tile.
+    Sparse areas take a few wide searches and dense ones as many small ones as they need, instead of one fixed
+    step everywhere:
+
+        crawler = QuadTreeCrawler(GoogleMaps(lang="en"), "restaurant", bbox=(114.10, 22.25, 114.25, 22.40))
+        for place in crawler.crawl():
+            ...
+
+    :param maps: GoogleMaps searching the tiles; its latitude, longitude and zoom are restored after the crawl
+    :param keyword: search keyword
+    :param bbox: (min_longitude, min_latitude, max_longitude, max_latitude)
+    :param cap: places a search returns at most, 120 for the /search?tbm=map endpoint
+    :param min_size_m: tiles smaller than this are not split further; their truncated searches are logged
+    :param max_tiles: stop after that many searches
+    :param per_page: passed to search
+    """
+
+    def __init__(self, maps, keyword: str, bbox, cap: int = 120, min_size_m: float = 200, max_tiles: int = None,
+                 per_page=100):
+        self.maps = maps
+        self.keyword = keyword
+        self.bbox = tuple(bbox)
+        self.cap = cap
+        self.min_size_m = min_size_m
+        self.max_tiles = max_tiles
+        self.per_page = per_page
+        self.logger = logging.getLogger(name="GoogleMapsPy")
+        self.tiles = 0
+        self.splits = 0
+        self.truncated = 0
+
+    def __repr__(self):
+        return f"QuadTreeCrawler(keyword={self.keyword!r}, tiles={self.tiles}, splits={self.splits})"
+
+    @staticmethod
+    def size_m(tile) -> float:
+        """
+        Longest side of a tile, in meters: the '1d' of the viewport searching it.
+        """
+        min_lng, min_lat, max_lng, max_lat = tile
+        middle = (min_lat + max_lat) / 2
+        return 1000 * max(lat_degree2km(max_lat - min_lat), lng_degree2km(max_lng - min_lng, middle))
+
+    @staticmethod
+    def split(tile) -> list:
+        min_lng, min_lat, max_lng, max_lat = tile
+        lng, lat = (min_lng + max_lng) / 2, (min_lat + max_lat) / 2
+        return [(min_lng, min_lat, lng, lat), (lng, min_lat, max_lng, lat),
+                (min_lng, lat, lng, max_lat), (lng, lat, max_lng, max_lat)]
+
+    def search_tile(self, tile) -> list:
+        """
+        :return: the places of a search with the viewport on `tile`
+        """
+        maps = self.maps
+        min_lng, min_lat, max_lng, max_lat = tile
+        maps.longitude, maps.latitude = (min_lng + max_lng) / 2, (min_lat + max_lat) / 2
+        maps.zoom = self.size_m(tile)
+        self.tiles += 1
+        return list(maps.search(self.keyword, per_page=self.per_page, resume=False))
+
+    def crawl(self):
+        """
+        :return: generator of the places of the area, each once; wide tiles first
+        """
+        maps = self.maps
+        saved = maps.latitude, maps.longitude, maps.zoom
+        seen = set()
+        frontier = collections.deque([self.bbox])
+        try:
+            while frontier and (self.max_tiles is None or self.tiles < self.max_tiles):
+                tile = frontier.popleft()
+                places = self.search_tile(tile)
+                if len(places) >= self.cap:
+                    if self.size_m(tile) / 2 >= self.min_size_m:
+                        self.splits += 1
+                        frontier.extend(self.split(tile))
+                    else:
+                        self.truncated += 1
+                        self.logger.warning(f"Tile {tile} is truncated at {len(places)} places and too small to split")
+                for place in places:
+                    key = place_key(place)
+                    if key not in seen:
+                        seen.add(key)
+                        yield place
+        finally:
+            maps.latitude, maps.longitude, maps.zoom = saved
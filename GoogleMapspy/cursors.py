@@ -0,0 +1,211 @@
+"""
+Review cursors and search checkpoints kept between runs.
+
+get_reviews pages with the id of the last review it got (`!3s` in the url). A cursor store keeps, for each
+place and sort order:
+    cursor: that last id while a crawl is in progress, so a crawl that crashed resumes where it stopped
+    head: the ids of the newest reviews already crawled, so a refresh with `new_only=True` (newest first)
+          stops paging at the first review it already has
+
+    maps = GoogleMaps(cursor_store=SQLiteCursorStore("reviews.db"))
+    for review in maps.get_reviews(url=url, new_only=True):
+        ...
+
+For searches, the store keeps the offset and page size of every (keyword, latitude, longitude, zoom, lang,
+country) search in progress, and marks it done at the end: an interrupted search resumes at its next page,
+and search_many skips the keywords already done.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# sort orders of the reviews endpoint (`!3e` in the url)
+SORT_RELEVANT = 1
+SORT_NEWEST = 2
+SORT_HIGHEST = 3
+SORT_LOWEST = 4
+
+# newest review ids kept per place; a refresh stops at any of them, so a few deleted reviews do not matter
+HEAD_SIZE = 20
+
+
+class MemoryCursorStore:
+    """
+    Cursors kept in this process, e.g. to resume get_reviews after an exception without a file.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cursors = {}
+        self._searches = {}
+
+    def get(self, key) -> tuple:
+        """
+        :return: (cursor or None, [head ids])
+        """
+        with self._lock:
+            cursor, head = self._cursors.get(key, (None, []))
+        return cursor, list(head)
+
+    def set_cursor(self, key, cursor):
+        """
+        :param cursor: last review id handed to the caller, None once the crawl is complete
+        """
+        with self._lock:
+            head = self._cursors.get(key, (None, []))[1]
+            self._cursors[key] = (cursor, head)
+
+    def set_head(self, key, head):
+        with self._lock:
+            cursor = self._cursors.get(key, (None, []))[0]
+            self._cursors[key] = (cursor, list(head))
+
+    def get_search(self, key):
+        """
+        :return: (offset, per_page, done) of the search `key`, None when it never ran
+        """
+        with self._lock:
+            return self._searches.get(key)
+
+    def set_search(self, key, offset, per_page, done: bool = False):
+        """
+        :param offset: offset of the next page to request
+        :param per_page: its page size
+        :param done: the search is complete
+        """
+        with self._lock:
+            self._searches[key] = (offset, per_page, done)
+
+
+class SQLiteCursorStore(MemoryCursorStore):
+    """
+    Cursors stored in a SQLite file, so they survive a crash and can be shared by several processes.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS review_cursors "
+                               "(key TEXT PRIMARY KEY, cursor TEXT, head TEXT, updated REAL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS search_checkpoints "
+                               "(key TEXT PRIMARY KEY, offset INTEGER, per_page INTEGER, done INTEGER, updated REAL)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key) -> tuple:
+        with self._lock:
+            row = self._connection().execute("SELECT cursor, head FROM review_cursors WHERE key = ?",
+                                             (key,)).fetchone()
+        if row is None:
+            return None, []
+        return row[0], json.loads(row[1] or "[]")
+
+    def set_cursor(self, key, cursor):
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO review_cursors (key, cursor, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET cursor = excluded.cursor, updated = excluded.updated",
+                (key, cursor, time.time()))
+
+    def set_head(self, key, head):
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO review_cursors (key, head, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET head = excluded.head, updated = excluded.updated",
+                (key, json.dumps(list(head)), time.time()))
+
+    def get_search(self, key):
+        with self._lock:
+            row = self._connection().execute("SELECT offset, per_page, done FROM search_checkpoints WHERE key = ?",
+                                             (key,)).fetchone()
+        return None if row is None else (row[0], row[1], bool(row[2]))
+
+    def set_search(self, key, offset, per_page, done: bool = False):
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO search_checkpoints (key, offset, per_page, done, updated) "
+                "VALUES (?, ?, ?, ?, ?)", (key, offset, per_page, int(done), time.time()))
+
+
+def search_key(keyword, latitude, longitude, zoom, lang, country_code) -> str:
+    """
+    Checkpoint key of a search: the same keyword around another point or in another language is another search.
+    """
+    return json.dumps([keyword, str(latitude), str(longitude), str(zoom), lang, country_code], ensure_ascii=False)
+
+
+class ReviewCursor:
+    """
+    Cursor state of one get_reviews call, shared by the sync and async clients.
+
+        crawl = ReviewCursor(store, id1, id2, sort, resume, new_only)
+        last_id = crawl.start
+        for each page:
+            for review in page:
+                if not crawl.accept(review.id): stop
+                yield review
+            crawl.page_done(last_id)
+        crawl.finish()
+
+    :param store: MemoryCursorStore / SQLiteCursorStore, or None to keep nothing
+    :param resume: start from the saved cursor of an unfinished crawl; otherwise start from the top (the cursor
+        is still saved as the crawl goes, for a later resume)
+    :param new_only: stop at the first review already in the head (needs sort=SORT_NEWEST)
+    """
+
+    def __init__(self, store, id1, id2, sort=SORT_RELEVANT, resume: bool = False, new_only: bool = False):
+        if new_only and sort != SORT_NEWEST:
+            raise ValueError("new_only needs the reviews sorted newest first (sort=SORT_NEWEST)")
+        self.store = store
+        self.key = f"{id1}:{id2}:{sort}"
+        cursor, self.head = store.get(self.key) if store is not None else (None, [])
+        self._known = set(self.head)
+        # a refresh pages from the newest review down to the head; without a head it is a full crawl
+        self.incremental = new_only and bool(self._known)
+        self.start = cursor if resume and cursor and not self.incremental else ""
+        self._new_head = []
+        self._saved_head = 0
+        self.stopped = False
+
+    def accept(self, review_id) -> bool:
+        """
+        :return: False when `review_id` is already known and paging should stop
+        """
+        if self.incremental and review_id in self._known:
+            self.stopped = True
+            return False
+        if not self.start and len(self._new_head) < HEAD_SIZE and review_id:
+            self._new_head.append(review_id)
+        return True
+
+    def page_done(self, last_id):
+        """
+        Called once the reviews of a page were handed to the caller.
+        """
+        if self.store is None:
+            return
+        if self.incremental:
+            # the head moves only when the refresh is complete, or reviews between it and the old head get lost
+            return
+        self.store.set_cursor(self.key, last_id or None)
+        if len(self._new_head) != self._saved_head:
+            # a crawl from the top: its newest reviews are the head of the next refresh
+            self.store.set_head(self.key, self._new_head)
+            self._saved_head = len(self._new_head)
+
+    def finish(self):
+        if self.store is None:
+            return
+        if self.incremental:
+            head = self._new_head + [i for i in self.head if i not in self._new_head]
+            self.store.set_head(self.key, head[:HEAD_SIZE])
+        else:
+            self.store.set_cursor(self.key, None)
@@ -0,0 +1,234 @@
+"""
+Reading Google's JSON responses.
+
+Every endpoint answers `)]}'` + newline + json (an XSSI guard). Instead of `json.loads(r.text[5:])`, which keeps
+the body as bytes, as text and as a sliced copy of the text, the body is read from the (already decompressed)
+byte stream into one buffer with the prefix dropped on the way, then decoded once.
+
+The JSON parser itself is pluggable: orjson or msgspec when installed (`pip install GoogleMapsPY[fast-json]`),
+the json module otherwise, see use_decoder. The fast backends parse straight from the bytes, the prefix skipped
+with a memoryview instead of a copy.
+"""
+import gc
+import json
+from contextlib import contextmanager
+from json.decoder import WHITESPACE
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    import orjson
+except ImportError:  # optional dependency: pip install GoogleMapsPY[fast-json]
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional dependency, orjson is preferred when both are installed
+    msgspec = None
+
+XSSI_PREFIX = b")]}'"
+# the /search?tbm=map&pb=... responses get_allcom reads: /*""*/{"d": ")]}'\n[...]", ...}
+ENVELOPE_PREFIX = b'/*""*/'
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+class Decoder:
+    """
+    A JSON backend.
+
+    :param name: name for use_decoder
+    :param decode: function(data, start) -> object, parsing data[start:]; data is bytes, bytearray or str.
+                   Errors are raised as json.JSONDecodeError
+    :param text: the backend parses str only, so byte buffers are decoded to text first
+    """
+
+    def __init__(self, name: str, decode, text: bool = False):
+        self.name = name
+        self.decode = decode
+        self.text = text
+
+    def __repr__(self):
+        return f"Decoder({self.name!r})"
+
+
+def _stdlib_decode(data, start):
+    if not isinstance(data, str):
+        data, start = str(memoryview(data)[start:], "utf-8"), 0
+    obj, end = _decoder.raw_decode(data, WHITESPACE.match(data, start).end())
+    end = WHITESPACE.match(data, end).end()
+    if end != len(data):
+        raise json.JSONDecodeError("Extra data", data, end)
+    return obj
+
+
+def _orjson_decode(data, start):
+    # orjson.JSONDecodeError is a json.JSONDecodeError
+    if isinstance(data, str):
+        return orjson.loads(data[start:] if start else data)
+    return orjson.loads(memoryview(data)[start:])
+
+
+def _msgspec_decode(data, start):
+    try:
+        if isinstance(data, str):
+            return msgspec.json.decode(data[start:] if start else data)
+        return msgspec.json.decode(memoryview(data)[start:])
+    except msgspec.DecodeError as e:
+        raise json.JSONDecodeError(str(e), "", 0) from e
+
+
+DECODERS = {"stdlib": Decoder("stdlib", _stdlib_decode, text=True)}
+if msgspec is not None:
+    DECODERS["msgspec"] = Decoder("msgspec", _msgspec_decode)
+if orjson is not None:
+    DECODERS["orjson"] = Decoder("orjson", _orjson_decode)
+
+# fastest installed backend
+_backend = DECODERS.get("orjson") or DECODERS.get("msgspec") or DECODERS["stdlib"]
+
+
+def use_decoder(decoder=None) -> Decoder:
+    """
+    Select the JSON backend of every client.
+
+    :param decoder: "orjson", "msgspec", "stdlib", a Decoder, or None for the fastest installed one
+    :return: the previous backend, to restore it later
+    """
+    global _backend
+    previous = _backend
+    if decoder is None:
+        decoder = DECODERS.get("orjson") or DECODERS.get("msgspec") or DECODERS["stdlib"]
+    elif isinstance(decoder, str):
+        if decoder not in DECODERS:
+            raise ValueError(f"JSON decoder {decoder!r} is not installed, available: {list(DECODERS)}")
+        decoder = DECODERS[decoder]
+    _backend = decoder
+    return previous
+
+
+def get_decoder() -> Decoder:
+    return _backend
+
+
+def accept_encoding(brotli: bool = False, zstd: bool = False) -> str:
+    """
+    Accept-Encoding value for a client that can decode gzip and deflate, and br / zstd when its decoders
+    are installed. Advertising an encoding the client cannot decode would get an unreadable body back.
+    """
+    encodings = (["zstd"] if zstd else []) + (["br"] if brotli else []) + ["gzip", "deflate"]
+    return ", ".join(encodings)
+
+
+# what requests (urllib3) decodes here: gzip, deflate, plus br with brotli and zstd with zstandard installed
+REQUESTS_ACCEPT_ENCODING = accept_encoding(brotli="br" in ACCEPT_ENCODING, zstd="zstd" in ACCEPT_ENCODING)
+
+
+def _decode(data, start):
+    return _backend.decode(data, start)
+
+
+@contextmanager
+def gc_paused():
+    """
+    Pause the cyclic garbage collector for a batch of requests, e.g. a whole search.
+
+    Parsing a search page allocates ~100k lists; with the gc on, each batch of allocations triggers a collection
+    scanning the growing (acyclic) result again, which can take longer than the parse itself. The gc is global to
+    the process, so pausing it is left to the caller: nothing else collects cycles while the block runs.
+
+        with gc_paused():
+            places = list(maps.search("restaurant"))
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _prefix_end(data, prefix: bytes) -> int:
+    """
+    :return: index right after `prefix` (and the whitespace before it) when `data` starts with it, else 0
+    """
+    if isinstance(data, str):
+        start = WHITESPACE.match(data, 0).end()
+        return start + len(prefix) if data.startswith(prefix.decode(), start) else 0
+    head = bytes(memoryview(data)[:len(prefix) + 8])
+    start = len(head) - len(head.lstrip())
+    return start + len(prefix) if head.startswith(prefix, start) else 0
+
+
+def loads(data):
+    """
+    json.loads for a Google response body (bytes, bytearray or str) with or without the `)]}'` prefix,
+    without slicing the prefix off first.
+    """
+    return _decode(data, _prefix_end(data, XSSI_PREFIX))
+
+
+def loads_envelope(data, key: str = "d"):
+    """
+    Parse a `/*""*/{"d": ")]}'\\n[...]"}` body: the outer object and then the json string in its `d` member,
+    the inner `)]}'` skipped like in loads.
+
+    :return: the inner object, or None when `d` is missing or empty
+    """
+    outer = _decode(data, _prefix_end(data, ENVELOPE_PREFIX))
+    inner = outer.get(key) if isinstance(outer, dict) else None
+    if not inner or not inner.strip():
+        return None
+    return loads(inner)
+
+
+class JSONStreamReader:
+    """
+    Collects the chunks of one response body, dropping the XSSI prefix as soon as the first bytes arrive.
+
+        reader = JSONStreamReader()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            reader.feed(chunk)
+        data = reader.close()
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._head = True
+
+    def _strip_prefix(self):
+        if self._buffer.startswith(XSSI_PREFIX):
+            del self._buffer[:len(XSSI_PREFIX)]
+        self._head = False
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        if self._head and len(self._buffer) >= len(XSSI_PREFIX):
+            self._strip_prefix()
+
+    def close(self):
+        if self._head:
+            self._strip_prefix()
+        data, self._buffer = self._buffer, bytearray()
+        if _backend.text:
+            # decode to text and drop the bytes before parsing, so the peak is one copy of the body plus the objects
+            data = str(data, "utf-8")
+        return _decode(data, 0)
+
+
+def read_json(response, chunk_size: int = CHUNK_SIZE):
+    """
+    Parse a response body chunk by chunk; with `stream=True` the chunks come straight from the socket,
+    decompressed by the transport.
+
+    :param response: requests.Response, or anything with iter_content(chunk_size) or content
+    """
+    iter_content = getattr(response, "iter_content", None)
+    if iter_content is None:
+        return loads(response.content)
+    reader = JSONStreamReader()
+    for chunk in iter_content(chunk_size):
+        reader.feed(chunk)
+    return reader.close()
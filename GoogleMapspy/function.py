@@ -1,9 +1,16 @@
-from urllib.parse import unquote
+from types import MappingProxyType
+from urllib.parse import quote, unquote
 import requests
-import random
-import json
-import numpy as np
+import functools
 import math
+import time
+from GoogleMapspy.decoding import loads_envelope
+from GoogleMapspy.headers import HeaderRotator
+from GoogleMapspy.proxy_pool import ProxyPool
+from GoogleMapspy.retry import is_blocked
+from GoogleMapspy import schema
+
+header_rotator = HeaderRotator()
 
 # --- Constants for geographic calculations (from your original) ---
 earth_radius = 6370.856
@@ -25,19 +32,6 @@ def lng_km2degree(dis_km=1, center_lat=22):
     real_radius = earth_radius * math.cos(center_lat * pis_per_degree)
     return lat_km2degree(dis_km, real_radius)
 
-# --- User Agents (from your original) ---
-agents = [
-    'Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/60.0.3112.101 Safari/537.36',
-    'Mozilla/5.0 (Windows; U; Windows NT 6.1; en-US) AppleWebKit/532.5 (KHTML, like Gecko) Chrome/4.0.249.0 Safari/532.5',
-    'Mozilla/5.0 (Windows; U; Windows NT 5.2; en-US) AppleWebKit/532.9 (KHTML, like Gecko) Chrome/5.0.310.0 Safari/532.9',
-    'Mozilla/5.0 (Windows; U; Windows NT 5.1; en-US) AppleWebKit/534.7 (KHTML, like Gecko) Chrome/7.0.514.0 Safari/534.7',
-    'Mozilla/5.0 (Windows; U; Windows NT 6.0; en-US) AppleWebKit/534.14 (KHTML, like Gecko) Chrome/9.0.601.0 Safari/534.14',
-    'Mozilla/5.0 (Windows; U; Windows NT 6.1; en-US) AppleWebKit/534.14 (KHTML, like Gecko) Chrome/10.0.601.0 Safari/534.14',
-    'Mozilla/5.0 (Windows; U; Windows NT 6.1; en-US) AppleWebKit/534.20 (KHTML, like Gecko) Chrome/11.0.672.2 Safari/534.20', # Removed extra quote
-    'Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/534.27 (KHTML, like Gecko) Chrome/12.0.712.0 Safari/534.27',
-    'Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/535.1 (KHTML, like Gecko) Chrome/13.0.782.24 Safari/535.1'
-]
-
 # --- Country Dictionaries (from your original) ---
 google_country_dict = {'afghanistan': 'Afghanistan', 'åland islands': 'Åland Islands', 'albania': 'Albania',
                        'algeria': 'Algeria', 'american samoa': 'American Samoa', 'andorra': 'Andorra',
@@ -188,17 +182,14 @@ country_suffix_dict = {'af': 'Afghanistan', 'fk': 'land Islands', 'al': 'Albania
                        'zw': 'Zimbabwe', 'la': 'Lao Peoples Democratic Republic', 'ci': 'COTE DIVOIRE'}
 
 # --- Data Extraction Function (from your original, with minor original pathing fixes) ---
+_company = schema.compile_record(schema.COMPANY, "company")
+
+
 def get_allcom(response):
-    page_source = response.text
     result_list = list()
     try:
-        # Original parsing logic
-        big_dict = json.loads(page_source.replace('/*""*/', ''))
-        d_str = big_dict.get('d', '').replace(")]}'", '').strip() # Added .get for safety
-        if not d_str:
-            return result_list
-        
-        d_list_outer = json.loads(d_str)
+        # /*""*/{"d": ")]}'\n[...]"}: both levels parsed by the selected JSON backend, no replace() copies
+        d_list_outer = loads_envelope(getattr(response, "content", None) or response.text)
         if not (isinstance(d_list_outer, list) and len(d_list_outer) > 0 and 
                 isinstance(d_list_outer[0], list) and len(d_list_outer[0]) > 1 and
                 d_list_outer[0][1] is not None):
@@ -216,84 +207,104 @@ def get_allcom(response):
             if not isinstance(company_data, list):
                 continue
 
+            # field paths are in schema.COMPANY; a malformed company is skipped, not the rest of the page
             try:
+                company = _company(company_data)
+                if not company['companyName']: # Only add if company name exists
+                    continue
+
                 temp_dict = dict()
-                # Accessing elements safely
-                temp_dict['companyName'] = company_data[11] if len(company_data) > 11 and company_data[11] else None
-                
-                url_info = company_data[7] if len(company_data) > 7 and company_data[7] and isinstance(company_data[7], list) and company_data[7] else None
-                temp_dict['url'] = url_info[0] if url_info else None
-                if temp_dict['url']:
-                    temp_dict['url'] = unquote(temp_dict['url'])
-
-                temp_dict['address'] = company_data[39] if len(company_data) > 39 and company_data[39] else None
-                if not temp_dict['address'] and len(company_data) > 18 and company_data[18]:
-                    temp_dict['address'] = company_data[18]
-                
-                phone_val = None
-                phone_info_178 = company_data[178] if len(company_data) > 178 and company_data[178] and isinstance(company_data[178], list) and company_data[178] else None
-                if phone_info_178 and isinstance(phone_info_178[0], list) and phone_info_178[0]:
-                    phone_val = phone_info_178[0][0]
-                
-                if not phone_val:
-                    phone_info_3 = company_data[3] if len(company_data) > 3 and company_data[3] and isinstance(company_data[3], list) and company_data[3] else None
-                    if phone_info_3:
-                        phone_val = phone_info_3[0]
-                temp_dict['phone'] = phone_val
-
-                category_list = company_data[13] if len(company_data) > 13 and company_data[13] and isinstance(company_data[13], list) else None
-                temp_dict['category'] = '>'.join(category_list) if category_list else None
-                
+                temp_dict['companyName'] = company['companyName']
+                temp_dict['url'] = unquote(company['url']) if company['url'] else None
+                temp_dict['address'] = company['address'] or None
+                temp_dict['phone'] = company['phone'] or None
+                category_list = company['category']
+                temp_dict['category'] = '>'.join(map(str, category_list)) if isinstance(category_list, list) and category_list else None
+
                 temp_dict['countryEn'] = None
-                if temp_dict['address']:
+                if isinstance(temp_dict['address'], str):
                     addr_lower = temp_dict['address'].lower()
                     for google_country_val in google_country_dict.values():
                         if google_country_val.lower() in addr_lower:
                             temp_dict['countryEn'] = google_country_val
                             break
-                
-                if not temp_dict['countryEn']:
-                    addr_info_183 = company_data[183] if len(company_data) > 183 and company_data[183] and isinstance(company_data[183], list) else None
-                    if addr_info_183 and len(addr_info_183) > 1 and isinstance(addr_info_183[1], list) and addr_info_183[1] and addr_info_183[-1]: # Checking path to country code
-                        country_code_key = addr_info_183[-1].lower() # Assuming last element is country code
-                        if country_code_key in country_suffix_dict:
-                             temp_dict['countryEn'] = country_suffix_dict[country_code_key]
-
-                temp_dict['city'] = company_data[14] if len(company_data) > 14 and company_data[14] else None
-                
-                if temp_dict['companyName']: # Only add if company name exists
-                    # yield temp_dict # If streaming was intended
-                    result_list.append(temp_dict)
-            except (IndexError, TypeError) as e_parse:
-                # print(f"Error parsing specific company: {e_parse}, Data: {str(company_data)[:100]}")
-                continue # Skip this company entry on error
-    except json.JSONDecodeError:
-        # print(f"JSON Decode Error. Response Preview: {page_source[:200]}")
-        pass # Or handle as needed
-    except Exception as e:
-        # print(f"General error_in_get_allcom: {e}. Response Preview: {page_source[:200]}")
-        pass # Or handle as needed
-        
+
+                if not temp_dict['countryEn'] and isinstance(company['country_code'], str):
+                    temp_dict['countryEn'] = country_suffix_dict.get(company['country_code'].lower())
+
+                temp_dict['city'] = company['city'] or None
+                result_list.append(temp_dict)
+            except (IndexError, TypeError):
+                continue
+    except Exception:
+        # not a search response, e.g. a captcha page: no companies
+        pass
+
     return result_list
 
 
 # --- Functions to calculate map parameters (from your original) ---
-def get_1d(module=1, offset=0.01):
+# '1d' of zoom 2, in meters; every zoom level halves it
+D1_ZOOM2 = 94618532.08008283
+MIN_ZOOM = 2
+MAX_ZOOM = 21
+
+
+@functools.lru_cache(maxsize=None)
+def _d1_table(module, offset):
     a = []
-    ori = 94618532.08008283
+    ori = D1_ZOOM2
     a.append([2, ori])
     for i_zoom in range(2, 22): # Renamed i to i_zoom
         if i_zoom > 2:
             ori = (ori / 2)
         # else: ori is correct for i_zoom = 2
         if module == 1:
-            for j_offset in np.arange(0, 1, offset): # Renamed j to j_offset
+            # same values as numpy.arange(0, 1, offset), without importing numpy for it
+            for j_offset in (k * offset for k in range(math.ceil(1 / offset))): # Renamed j to j_offset
                 if (i_zoom + j_offset) > 2 and (i_zoom + j_offset) <= 21:
                     a.append([(i_zoom + j_offset), ori - ori * j_offset / 2]) # Original formula
         elif module == 0:
             if [i_zoom, ori] not in a: # To avoid duplicate for i_zoom=2 if already added
                 a.append([i_zoom, ori])
-    return dict(a)
+    return MappingProxyType(dict(a))
+
+
+def get_1d(module=1, offset=0.01):
+    """
+    {zoom: '1d' value} of the search urls; module=0 for the integer zooms 2-21, module=1 adds the zooms in steps of
+    `offset` between them. Built once per (module, offset) and shared: the mapping is read-only.
+    """
+    return _d1_table(module, offset)
+
+
+def zoom_to_1d(zoom):
+    """
+    '1d' value of a zoom, fractional zooms interpolated as in get_1d(1); clamped to zooms 2-21.
+    """
+    zoom = min(max(zoom, MIN_ZOOM), MAX_ZOOM)
+    level = int(zoom)
+    return D1_ZOOM2 / 2 ** (level - MIN_ZOOM) * (1 - (zoom - level) / 2)
+
+
+def d1_to_zoom(d1):
+    """
+    Zoom of a '1d' value (a viewport of about `d1` meters), the inverse of zoom_to_1d; clamped to zooms 2-21.
+    """
+    if d1 <= 0:
+        raise ValueError(f"1d must be positive, got {d1}")
+    if d1 >= D1_ZOOM2:
+        return float(MIN_ZOOM)
+    if d1 <= zoom_to_1d(MAX_ZOOM):
+        return float(MAX_ZOOM)
+    level = MIN_ZOOM + int(math.log2(D1_ZOOM2 / d1))
+    # log2 can land one level off at the exact power-of-two boundaries
+    while zoom_to_1d(level) < d1:
+        level -= 1
+    while zoom_to_1d(level + 1) >= d1:
+        level += 1
+    return level + 2 * (1 - d1 / zoom_to_1d(level))
+
 
 def get_23d(d2, d3, dis=5775.056889653493):
     # lat_range = [-85.05112877980659, 85.05112877980659] # Informational
@@ -318,133 +329,69 @@ def get_23d(d2, d3, dis=5775.056889653493):
     return [coord for coord in [up, down, left, right] if coord is not None]
 
 
-# --- Main Company Scraping Function with PROXY SUPPORT ---
-def get_com(d2_lon, d3_lat, proxies=None): # <<< MODIFIED: Added proxies parameter (defaults to None)
+# --- Company search of one map tile, with PROXY SUPPORT ---
+_SEARCH_URL = 'https://www.google.com/search?tbm=map&authuser=0&hl=en&pb=!4m12!1m3!1d{}!2d{}!3d{}'
+_SEARCH_PB = ( # the pb part that doesn't change with pagination; placeholders for the page id and the keyword
+    '!2m3!1f0!2f0!3f0!3m2!1i784!2i644!4f13.1!7i20{}!10b1!12m8!1m1!18b1!2m3!5m1!6e2!20e3!10b1!16b1'
+    '!19m4!2m3!1i360!2i120!4i8!20m57!2m2!1i203!2i100!3m2!2i4!5b1!6m6!1m2!1i86!2i86!1m2!1i408!2i240'
+    '!7m42!1m3!1e1!2b0!3e3!1m3!1e2!2b1!3e2!1m3!1e2!2b0!3e3!1m3!1e3!2b0!3e3!1m3!1e8!2b0!3e3!1m3!1e3'
+    '!2b1!3e2!1m3!1e9!2b1!3e2!1m3!1e10!2b0!3e3!1m3!1e10!2b1!3e2!1m3!1e10!2b0!3e4!2b1!4b1!9b0'
+    '!22m5!1s5mKzXrHAJNSXr7wP5u-akAQ!4m1!2i5600!7e81!12e30!24m46!1m12!13m6!2b1!3b1!4b1!6i1!8b1!9b1'
+    '!18m4!3b1!4b1!5b1!6b1!2b1!5m5!2b1!3b1!5b1!6b1!7b1!10m1!8e3!14m1!3b1!17b1!20m2!1e3!1e6!24b1'
+    '!25b1!26b1!30m1!2b1!36b1!43b1!52b1!55b1!56m2!1b1!3b1!65m5!3m4!1m3!1m2!1i224!2i298!26m4!2m3'
+    '!1i80!2i92!4i8!30m28!1m6!1m2!1i0!2i0!2m2!1i458!2i644!1m6!1m2!1i734!2i0!2m2!1i784!2i644!1m6!1m2'
+    '!1i0!2i0!2m2!1i784!2i20!1m6!1m2!1i0!2i624!2m2!1i784!2i644!31b1!34m13!2b1!3b1!4b1!6b1!8m3!1b1'
+    '!3b1!4b1!9b1!12b1!14b1!20b1!23b1!37m1!1e81!42b1!46m1!1e2!47m0!49m1!3b1!50m13!1m8!3m6!1u17!2m4'
+    '!1m2!17m1!1e2!2z6Led56a7!4BIAE!2e2!3m2!1b1!3b0!59BQ2dBd0Fn!65m0&q={}&tch=1&ech=4'
+    '&psi=5mKzXrHAJNSXr7wP5u-akAQ.1588814569168.1' # psi is likely a session/request token
+)
+
+
+def get_companies(d2_lon, d3_lat, d1, offset=0, proxies=None, keyword='company', timeout=15):
     """
-    Crawls Google Maps for company data.
+    One page (20 companies) of a keyword search around a point, parsed by get_allcom.
     d2_lon: Longitude
     d3_lat: Latitude
+    d1: the '1d' value of the zoom, see get_1d
+    offset: index of the first company, a multiple of 20
     proxies: Optional dictionary for requests proxies. e.g., {"http": "...", "https": "..."}
+             or a ProxyPool, then the request goes through the healthiest free proxy of the pool.
+    Raises requests.RequestException when the request fails.
     """
-    com_num = {}
-    d1_dict = get_1d(0)
-
-    for d1_multiple in d1_dict:
-        d1 = d1_dict[d1_multiple]
-        print('目前倍数%d：' % d1_multiple)
-        
-        # Original URL and pb string structure
-        url_template = 'https://www.google.com/search?tbm=map&authuser=0&hl=en&pb=!4m12!1m3!1d{}!2d{}!3d{}'
-        pb_fixed_part = ( # The pb part that doesn't change with pagination, but has one placeholder for page_id
-            '!2m3!1f0!2f0!3f0!3m2!1i784!2i644!4f13.1!7i20{}!10b1!12m8!1m1!18b1!2m3!5m1!6e2!20e3!10b1!16b1'
-            '!19m4!2m3!1i360!2i120!4i8!20m57!2m2!1i203!2i100!3m2!2i4!5b1!6m6!1m2!1i86!2i86!1m2!1i408!2i240'
-            '!7m42!1m3!1e1!2b0!3e3!1m3!1e2!2b1!3e2!1m3!1e2!2b0!3e3!1m3!1e3!2b0!3e3!1m3!1e8!2b0!3e3!1m3!1e3'
-            '!2b1!3e2!1m3!1e9!2b1!3e2!1m3!1e10!2b0!3e3!1m3!1e10!2b1!3e2!1m3!1e10!2b0!3e4!2b1!4b1!9b0'
-            '!22m5!1s5mKzXrHAJNSXr7wP5u-akAQ!4m1!2i5600!7e81!12e30!24m46!1m12!13m6!2b1!3b1!4b1!6i1!8b1!9b1'
-            '!18m4!3b1!4b1!5b1!6b1!2b1!5m5!2b1!3b1!5b1!6b1!7b1!10m1!8e3!14m1!3b1!17b1!20m2!1e3!1e6!24b1'
-            '!25b1!26b1!30m1!2b1!36b1!43b1!52b1!55b1!56m2!1b1!3b1!65m5!3m4!1m3!1m2!1i224!2i298!26m4!2m3'
-            '!1i80!2i92!4i8!30m28!1m6!1m2!1i0!2i0!2m2!1i458!2i644!1m6!1m2!1i734!2i0!2m2!1i784!2i644!1m6!1m2'
-            '!1i0!2i0!2m2!1i784!2i20!1m6!1m2!1i0!2i624!2m2!1i784!2i644!31b1!34m13!2b1!3b1!4b1!6b1!8m3!1b1'
-            '!3b1!4b1!9b1!12b1!14b1!20b1!23b1!37m1!1e81!42b1!46m1!1e2!47m0!49m1!3b1!50m13!1m8!3m6!1u17!2m4'
-            '!1m2!17m1!1e2!2z6Led56a7!4BIAE!2e2!3m2!1b1!3b0!59BQ2dBd0Fn!65m0&q=company&tch=1&ech=4'
-            '&psi=5mKzXrHAJNSXr7wP5u-akAQ.1588814569168.1' # psi is likely a session/request token
-        )
-        
-        page_offset = 0 # Renamed 'page' for clarity as it's an offset
-        all_result_for_zoom = [] # Renamed 'all_result'
-        
-        while True:
-            page_id_str = '!8i%d' % page_offset # Example: !8i0, !8i20, etc.
-            headers = {'User-Agent': random.choice(agents)}
-            
-            # Construct the full URL
-            current_base_url = url_template.format(d1, d2_lon, d3_lat)
-            current_pb_part = pb_fixed_part.format(page_id_str) # Insert page_id into pb string
-            full_url = current_base_url + current_pb_part
-            
-            try:
-                # >>> MODIFIED: Pass proxies to requests.get()
-                response = requests.get(full_url, headers=headers, proxies=proxies, timeout=15) # Added timeout
-                response.raise_for_status() # Check for HTTP errors
-                
-                # Assuming get_allcom always returns a list (even if empty)
-                # and doesn't raise exceptions that aren't caught internally.
-                results_from_page = get_allcom(response)
-                
-                if not results_from_page: # No more results on this page
-                    break
-                
-                all_result_for_zoom.extend(results_from_page)
-                page_offset += 20 # Standard pagination step
-            except requests.exceptions.RequestException as e:
-                print(f"Request error for {full_url[:100]}...: {e}")
-                break # Exit this while loop (for this zoom level) on request error
-            except Exception as e_general:
-                print(f"Unexpected error during request for {full_url[:100]}...: {e_general}")
-                break # Exit this while loop on other errors
-
-
-        print(f"For d1 (zoom key) {d1_multiple}, 1d value {d1:.2f}, found {len(all_result_for_zoom)} companies.")
-        com_num[d1_multiple] = len(all_result_for_zoom)
-
-    if not com_num: # No data collected at all
-        print("No company data collected for any zoom level. Cannot proceed with this branch.")
-        return
-
-    # Original logic for choosing the next step
-    # This part is sensitive to the keys and values in com_num (zoom levels 2-21)
-    # The slice [12:19] assumes com_num.keys() are sorted and correspond to zoom levels.
-    # get_1d(0) produces keys: 2, 3, ..., 21.
-    # list(com_num.values())[12:19] would correspond to values for keys 14 through 20.
-    # list(com_num.keys())[12:19] would correspond to keys 14 through 20.
-    
-    values_list = list(com_num.values())
-    keys_list = list(com_num.keys()) # These are zoom levels e.g. 2, 3, ..., 21
+    full_url = _SEARCH_URL.format(d1, d2_lon, d3_lat) + _SEARCH_PB.format('!8i%d' % offset, quote(keyword))
 
-    # Slicing directly like this from list(dict.values()) or list(dict.keys())
-    # assumes Python 3.7+ where dict insertion order is preserved,
-    # or that d1_dict was iterated in a specific sorted order for com_num population.
-    # For robustness, it's better to filter keys and then get values.
-    
-    # Original slicing indices (12 to 18, since 19 is exclusive)
-    # If keys_list is [2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,21] (20 elements)
-    # Keys at index 12 to 18 are: 14,15,16,17,18,19,20
-    
-    target_keys_for_best_zoom = [k for k in keys_list if 14 <= k <= 20] # Example relevant zoom levels
-    
-    max_num_in_target = 0
-    if target_keys_for_best_zoom:
-        values_in_target = [com_num[k] for k in target_keys_for_best_zoom if k in com_num]
-        if values_in_target:
-            max_num_in_target = max(values_in_target)
-    
-    new_list_coords = []
-    if max_num_in_target == 0:
-        new_list_coords = get_23d(d2_lon, d3_lat) # Default distance
-        print(f'没有最优倍数 (max_num_in_target is 0), 取默认值. Coords: {new_list_coords}')
-    else:
-        best_d1_multiples_for_max = [
-            k for k in target_keys_for_best_zoom if k in com_num and com_num[k] == max_num_in_target
-        ]
-        if not best_d1_multiples_for_max: # Fallback if something went wrong
-             best_d1_multiples_for_max = [k for k in keys_list if k in com_num and com_num[k] == max_num_in_target]
-
-
-        if best_d1_multiples_for_max: # Should have at least one
-            chosen_best_d1_multiple = best_d1_multiples_for_max[0] # Take the first one
-            print(f'最优倍数为： {chosen_best_d1_multiple} (from {best_d1_multiples_for_max}) with {max_num_in_target} companies.')
-            distance_for_step = d1_dict[chosen_best_d1_multiple] # This is the '1d' value
-            new_list_coords = get_23d(d2_lon, d3_lat, dis=distance_for_step)
-        else: # Should not happen if max_num_in_target > 0
-             new_list_coords = get_23d(d2_lon, d3_lat) # Default distance
-             print(f'逻辑错误: max_num > 0 但未找到 best_d1_multiple. 取默认值. Coords: {new_list_coords}')
-
-
-    print(f'移动后的四个坐标 (for {d2_lon},{d3_lat}): {new_list_coords}')
-    for i_coord in new_list_coords: # Renamed 'i' to 'i_coord'
-        if i_coord: # i_coord is a tuple (lon, lat)
-            # >>> MODIFIED: Pass proxies in recursive call
-            get_com(i_coord[0], i_coord[1], proxies=proxies)
+    pool_proxy = proxies.acquire() if isinstance(proxies, ProxyPool) else None
+    # one browser profile per proxy
+    headers = header_rotator.headers_for(pool_proxy or (proxies or {}).get("https"))
+    try:
+        start = time.monotonic()
+        response = requests.get(full_url, headers=headers, timeout=timeout,
+                                proxies=ProxyPool.as_dict(pool_proxy) if pool_proxy else proxies)
+    except Exception:
+        if pool_proxy:
+            proxies.release(pool_proxy, ok=False)
+        raise
+    if pool_proxy:
+        proxies.release(pool_proxy, latency=time.monotonic() - start, ok=response.ok, blocked=is_blocked(response))
+    response.raise_for_status() # Check for HTTP errors
+    return get_allcom(response)
+
+
+def get_com(d2_lon, d3_lat, proxies=None, **kwargs):
+    """
+    Crawls Google Maps for company data around a starting point, tile by tile, see crawler.GeoCrawler.
+    d2_lon: Longitude
+    d3_lat: Latitude
+    proxies: Optional dictionary for requests proxies, or a ProxyPool.
+    kwargs: GeoCrawler parameters (bbox, polygon, max_tiles, zoom, keyword, ...); without bbox, polygon or
+            max_tiles the crawl stops after 1000 tiles.
+    Yields company dicts, each company once.
+    """
+    from GoogleMapspy.crawler import GeoCrawler
+
+    if kwargs.get('bbox') is None and kwargs.get('polygon') is None:
+        kwargs.setdefault('max_tiles', 1000)
+    return GeoCrawler(proxies=proxies, **kwargs).crawl(d2_lon, d3_lat)
 
 
 if __name__ == '__main__':
@@ -465,11 +412,10 @@ if __name__ == '__main__':
     
     # To run WITH proxies:
     # get_com(d2_start_lon, d3_start_lat, proxies=test_proxies)
-    
-    # To run WITHOUT proxies (original behavior):
-    get_com(d2_start_lon, d3_start_lat, proxies=None) # Or simply get_com(d2_start_lon, d3_start_lat)
-    # For your specific request to use the Webshare proxy:
-    # get_com(d2_start_lon, d3_start_lat, proxies=test_proxies)
+
+    # To run WITHOUT proxies, at most 100 tiles around the starting point:
+    for company in get_com(d2_start_lon, d3_start_lat, proxies=None, max_tiles=100):
+        print(company)
 
 
     print("Crawler finished.")
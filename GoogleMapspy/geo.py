@@ -0,0 +1,121 @@
+"""
+Array versions of the coordinate helpers of function.py, for planning sweeps of many tiles at once.
+
+Every function takes scalars or numpy arrays (broadcast together) and returns numpy arrays, with the same sphere
+and formulas as function.lat_km2degree / lng_km2degree / lat_degree2km / lng_degree2km / get_23d, so a million
+tile centres or the pairwise distances of a few thousand places take milliseconds instead of a python loop.
+
+    lng, lat = grid((114.00, 22.20, 114.30, 22.50), step_m=500)
+    km = pairwise_distances(lng, lat)
+
+numpy is loaded on first use: `pip install GoogleMapsPY[geo]`.
+"""
+from GoogleMapspy.function import earth_radius, pis_per_degree
+
+# latitude limits of the web mercator map, as get_23d
+MAX_LATITUDE = 85.05112877980659
+
+np = None
+
+
+def _import_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy as module
+        except ImportError:
+            raise ImportError("GoogleMapspy.geo requires numpy, install it with `pip install GoogleMapsPY[geo]`")
+        np = module
+    return np
+
+
+def lat_degree2km(dif_degree, radius=earth_radius):
+    return radius * _import_numpy().asarray(dif_degree, dtype=float) * pis_per_degree
+
+
+def lat_km2degree(dis_km, radius=earth_radius):
+    return _import_numpy().asarray(dis_km, dtype=float) / radius / pis_per_degree
+
+
+def lng_degree2km(dif_degree, center_lat):
+    np = _import_numpy()
+    return lat_degree2km(dif_degree, earth_radius * np.cos(np.asarray(center_lat, dtype=float) * pis_per_degree))
+
+
+def lng_km2degree(dis_km, center_lat):
+    np = _import_numpy()
+    return lat_km2degree(dis_km, earth_radius * np.cos(np.asarray(center_lat, dtype=float) * pis_per_degree))
+
+
+def neighbours(longitude, latitude, dis=5775.056889653493):
+    """
+    The four points one step `dis` (meters) up, down, left and right of every point, as get_23d.
+
+    :return: (longitudes, latitudes, valid), arrays of shape (n, 4) in get_23d's order; `valid` is False for the
+        up / down points beyond MAX_LATITUDE, which get_23d drops
+    """
+    np = _import_numpy()
+    longitude = np.atleast_1d(np.asarray(longitude, dtype=float))
+    latitude = np.atleast_1d(np.asarray(latitude, dtype=float))
+    dlat = lat_km2degree(dis / 1000.0)
+    dlng = lng_km2degree(dis / 1000.0, latitude)
+    lngs = np.stack([longitude, longitude, longitude - dlng, longitude + dlng], axis=-1)
+    lats = np.stack([latitude + dlat, latitude - dlat, latitude, latitude], axis=-1)
+    valid = np.abs(lats) <= MAX_LATITUDE
+    valid[..., 2:] = True
+    return lngs, lats, valid
+
+
+def grid(bbox, step_m):
+    """
+    Centres of tiles of `step_m` meters covering a bounding box, row by row from the south west corner.
+    The longitude step of a row is taken at its latitude, so tiles stay square towards the poles.
+
+    :param bbox: (min_longitude, min_latitude, max_longitude, max_latitude)
+    :return: (longitudes, latitudes), 1-d arrays
+    """
+    np = _import_numpy()
+    min_lng, min_lat, max_lng, max_lat = bbox
+    step_km = step_m / 1000.0
+    dlat = float(lat_km2degree(step_km))
+    rows = max(1, int(np.ceil((max_lat - min_lat) / dlat)))
+    row_lat = min_lat + (np.arange(rows) + 0.5) * dlat
+    dlng = lng_km2degree(step_km, row_lat)
+    columns = np.maximum(1, np.ceil((max_lng - min_lng) / dlng)).astype(np.int64)
+    # column index of every tile: 0..columns-1 within each row
+    starts = np.repeat(np.cumsum(columns) - columns, columns)
+    column = np.arange(columns.sum()) - starts
+    return min_lng + (column + 0.5) * np.repeat(dlng, columns), np.repeat(row_lat, columns)
+
+
+def haversine(lng1, lat1, lng2, lat2, radius=earth_radius):
+    """
+    Great circle distance in km, broadcast over the inputs.
+    """
+    np = _import_numpy()
+    lng1, lat1, lng2, lat2 = (np.asarray(v, dtype=float) * pis_per_degree for v in (lng1, lat1, lng2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * radius * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def pairwise_distances(longitude, latitude, radius=earth_radius):
+    """
+    :return: (n, n) array of the distances in km between every two points, e.g. to find the same place
+        listed twice a few meters apart; n x n floats, so a few thousand points at a time
+    """
+    np = _import_numpy()
+    longitude, latitude = np.asarray(longitude, dtype=float), np.asarray(latitude, dtype=float)
+    return haversine(longitude[:, None], latitude[:, None], longitude[None, :], latitude[None, :], radius)
+
+
+def bounding_boxes(longitude, latitude, half_km):
+    """
+    :return: (n, 4) array of (min_longitude, min_latitude, max_longitude, max_latitude) of the squares of side
+        2 * `half_km` around every point, e.g. the bbox of QuadTreeCrawler or the viewport of a search
+    """
+    np = _import_numpy()
+    longitude, latitude = np.asarray(longitude, dtype=float), np.asarray(latitude, dtype=float)
+    dlat = lat_km2degree(half_km)
+    dlng = lng_km2degree(half_km, latitude)
+    return np.stack(np.broadcast_arrays(longitude - dlng, latitude - dlat, longitude + dlng, latitude + dlat),
+                    axis=-1)
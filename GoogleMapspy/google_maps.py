@@ -1,18 +1,30 @@
-import json
 import logging
 import re
-from time import sleep
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import requests
 import os
+import queue
+import threading
+from GoogleMapspy.cursors import ReviewCursor, SORT_HIGHEST, SORT_LOWEST, SORT_NEWEST, SORT_RELEVANT, search_key
+from GoogleMapspy.decoding import REQUESTS_ACCEPT_ENCODING, read_json
 from GoogleMapspy.function import get_1d, country_suffix_dict
-from GoogleMapspy.var import Place, Review, get_index
+from GoogleMapspy.headers import HeaderRotator
+from GoogleMapspy.paging import PageSize, page_size
+from GoogleMapspy.proxy_pool import ProxyPool
+from GoogleMapspy.rate_limit import RateLimiter, DEFAULT_RATES
+from GoogleMapspy.retry import RetryPolicy, is_blocked
+from GoogleMapspy import schema
+from GoogleMapspy.transport import make_transport
+from GoogleMapspy.var import Place, PlaceError, Review, get_index
 from urllib.parse import quote_plus
-from fake_useragent import UserAgent
-
-ua = UserAgent()
 
 GOOGLE_URL = 'https://www.google.com'
 
+_images = schema.compile_record(schema.IMAGES, "images")
+_image_url = schema.compile_field(schema.IMAGE_URL, "image_url")
+_image_category = schema.compile_record(schema.IMAGE_CATEGORY, "image_category")
+
 # Define standard environment variable names the library will check
 ENV_PROXY_HTTP = "GOOGLEMAPSPY_PROXY_HTTP_URL"
 ENV_PROXY_HTTPS = "GOOGLEMAPSPY_PROXY_HTTPS_URL"
@@ -20,7 +32,29 @@ ENV_PROXY_HTTPS = "GOOGLEMAPSPY_PROXY_HTTPS_URL"
 class GoogleMaps:
 
     def __init__(self, latitude: str = "-200", longitude: str = "-200", lang: str = "en", country_code: str = "eg",
-                 zoom: float = None, zoom_index: int = 9, session: requests.Session = None, proxies: dict = None):
+                 zoom: float = None, zoom_index: int = 9, session: requests.Session = None,
+                 proxies: "dict | ProxyPool" = None,
+                 base_url: str = GOOGLE_URL, rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None,
+                 transport="requests", header_rotator: HeaderRotator = None, keep_raw: bool = True,
+                 keep_results: bool = True, cursor_store=None):
+        """
+        :param session: requests.Session (or any transport) to send requests with, overrides `transport`
+        :param proxies: requests-style proxies dict or a ProxyPool
+        :param base_url:
+        :param rate_limiter: RateLimiter shared by every request, default DEFAULT_RATES in memory
+        :param retry_policy: RetryPolicy shared by every request
+        :param transport: "requests" (HTTP/1.1 PooledSession, default), "http2" (httpx, multiplexed)
+            or a transport object
+        :param header_rotator: picks the browser headers (User-Agent, client hints) per proxy,
+            default a sticky HeaderRotator
+        :param keep_raw: keep the raw array in every Place; False decodes the fields up front and drops it,
+            which takes much less memory on long crawls (Place.data is then None)
+        :param keep_results: also collect the results of search / get_reviews in self.places / self.reviews;
+            False keeps memory flat on long crawls, results are then only yielded (see sinks.py to store them)
+        :param cursor_store: cursors.MemoryCursorStore / SQLiteCursorStore keeping the review paging of every
+            place, for get_reviews(resume=True) after a crash and get_reviews(new_only=True) refreshes, and the
+            offset of every search, for search(resume=True) and search_many
+        """
 
         logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%d-%b-%y %H:%M:%S')
         self.logger = logging.getLogger(name="GoogleMapsPy")
@@ -33,15 +67,29 @@ class GoogleMaps:
         # if country_code not in country_suffix_dict:
         #     raise Exception("Not Valid country_code")
         self.gl = country_code
-        self.session = session or requests.Session()
+        self.base_url = base_url.rstrip("/")
+        self.transport = transport
+        self.session = session if session is not None else self._new_session()
+        self.rate_limiter = rate_limiter or self._new_rate_limiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.header_rotator = header_rotator or HeaderRotator()
+        self.keep_raw = keep_raw
+        self.keep_results = keep_results
+        self.cursor_store = cursor_store
         self.places = []
         self.reviews = []
+        self.proxy_pool = None
 
-        if proxies is not None:
+        if isinstance(proxies, ProxyPool):
+            self.proxy_pool = proxies
+            self.proxies = None
+            self.logger.info(f"Using proxy pool: {proxies}")
+        elif proxies is not None:
             self.proxies = proxies
             self.logger.info("Using explicitly passed proxies.")
         else:
             # Try to load from environment variables
+            self.proxy_pool = ProxyPool.from_env()
             http_proxy_url = os.environ.get(ENV_PROXY_HTTP)
             https_proxy_url = os.environ.get(ENV_PROXY_HTTPS)
 
@@ -51,76 +99,292 @@ class GoogleMaps:
             if https_proxy_url:
                 loaded_proxies['https'] = https_proxy_url
 
-            if loaded_proxies:
+            if self.proxy_pool is not None:
+                self.proxies = None
+                self.logger.info(f"Loaded proxy pool from environment variables: {self.proxy_pool}")
+            elif loaded_proxies:
                 self.proxies = loaded_proxies
                 self.logger.info(f"Loaded proxies from environment variables: {', '.join(loaded_proxies.keys())}")
             else:
                 self.proxies = None # No proxies passed and none in environment
                 self.logger.info("No proxies provided or found in environment variables.")
 
+    def _new_session(self):
+        return make_transport(self.transport)
+
+    def _new_rate_limiter(self):
+        return RateLimiter(rates=DEFAULT_RATES)
+
+    @property
+    def proxy(self):
+        # the proxy url requests go through, used as the per-proxy key of the rate limiter
+        if not self.proxies:
+            return None
+        return self.proxies.get("https") or self.proxies.get("http")
+
+    def _throttle(self, endpoint, sleep_time=None, proxy=None):
+        """
+        Wait for the rate limiter before a request to `endpoint` through `proxy` (default self.proxy).
+        `sleep_time` is the legacy per-call pace: seconds between requests, 0 for no limit, None for the limiter rate.
+        """
+        wait = self.rate_limiter.acquire(endpoint, proxy or self.proxy, self._rate(sleep_time))
+        if wait:
+            self.logger.info(f"sleep: {wait:.2f} ({endpoint})")
+
+    @staticmethod
+    def _rate(sleep_time):
+        return None if sleep_time is None else (1 / sleep_time if sleep_time > 0 else 0)
+
+    def _retry_key(self, used):
+        """
+        Circuit breaker / on_block key of the retry policy: self.proxy, or with a pool the proxy each attempt
+        took, which send() appends to `used`. Before an attempt no pool proxy is chosen yet (None); after it the
+        proxy is handed over once, so a blocked proxy trips its own breaker and not the whole pool's.
+        """
+        if self.proxy_pool is None:
+            return lambda: self.proxy
+        return lambda: used.pop() if used else None
+
+    def _request(self, endpoint, url, sleep_time=None, stats: dict = None, retry_timeouts: bool = True,
+                 **kwargs) -> requests.Response:
+        """
+        GET `url` through the rate limiter and the retry policy; every request method goes through here.
+
+        :param endpoint: "search", "place", "review" or "images", the rate limiter bucket
+        :param url:
+        :param sleep_time: see _throttle
+        :param stats: dict receiving "latency", the seconds of the last attempt without the rate limit wait
+        :param retry_timeouts: False raises a read timeout at once instead of retrying it, see RetryPolicy.call
+        :param kwargs: passed to session.request (timeout, ...)
+        :return: a successful response
+        """
+        used = []
+
+        def send():
+            if self.proxy_pool is None:
+                self._throttle(endpoint, sleep_time)
+                start = time.monotonic()
+                r = self.session.request("GET", url, headers=self.headers, proxies=self.proxies, **kwargs)
+                if stats is not None:
+                    stats["latency"] = time.monotonic() - start
+                return r
+
+            # the proxy whose rate limit and circuit breaker free up first, its token reserved with it
+            proxy, wait = self.proxy_pool.acquire_for(self.rate_limiter, endpoint, self._rate(sleep_time),
+                                                      cooldown=self.retry_policy.circuit_breaker.remaining)
+            used.append(proxy)
+            try:
+                if wait:
+                    self.logger.info(f"sleep: {wait:.2f} ({endpoint})")
+                    time.sleep(wait)
+                start = time.monotonic()
+                r = self.session.request("GET", url, headers=self._headers(proxy), proxies=ProxyPool.as_dict(proxy),
+                                         **kwargs)
+            except Exception:
+                self.proxy_pool.release(proxy, ok=False)
+                raise
+            latency = time.monotonic() - start
+            if stats is not None:
+                stats["latency"] = latency
+            self.proxy_pool.release(proxy, latency=latency, ok=r.ok, blocked=is_blocked(r))
+            return r
+
+        r = self.retry_policy.call(send, key=self._retry_key(used), retry_timeouts=retry_timeouts)
+        if not r.ok and hasattr(r, "close"):
+            # the body of a (streamed) error response is never read, give its connection back before raising
+            r.close()
+        r.raise_for_status()
+        return r
+
+    def _get_json(self, endpoint, url, sleep_time=None, stats: dict = None, retry_timeouts: bool = True, **kwargs):
+        """
+        _request + read_json: the body is decompressed and parsed as it streams in, without the `)]}'` prefix.
+
+        :param stats: dict receiving "latency" (request sent to body parsed, rate limit wait excluded)
+            and "bytes" (body size on the wire, None when the response does not say)
+        """
+        if isinstance(self.session, requests.Session):
+            kwargs.setdefault("stream", True)
+        r = self._request(endpoint, url, sleep_time=sleep_time, stats=stats, retry_timeouts=retry_timeouts, **kwargs)
+        self.logger.info(f"request: {r}")
+        start = time.monotonic()
+        data = read_json(r)
+        if stats is not None:
+            stats["latency"] = stats.get("latency", 0) + time.monotonic() - start
+            stats["bytes"] = int(r.headers.get("content-length") or 0) or None
+        return data
+
     def get_images(self, ids=[]):
         if ids:
             id1, id2 = ids
         else:
             raise
         self.__set_latitude()
-        r = self.session.request("GET", self._get_images_url(id1_=id1, id2_=id2), headers=self.headers, proxies=self.proxies)
-        r.raise_for_status()
-        list_data = json.loads(r.text[5:])
-        images = []
-        l = []
-        for image in list_data[0]:
-            l.append(image[6][0])
-        var = {"name": "all_image", "images": l}
-        images.append(var)
-
-        for cat in list_data[12][0]:
-            l = []
-            for image in cat[3]:
-                if len(image) > 6:
-                    l.append(image[6][0])
-            var = {"name": cat[2], "images": l}
-            images.append(var)
+        return self._parse_images(self._get_json("images", self._get_images_url(id1_=id1, id2_=id2)))
 
+    @staticmethod
+    def _parse_images(list_data):
+        sections = _images(list_data)
+        images = [{"name": "all_image", "images": [url for url in map(_image_url, sections["all"]) if url]}]
+        for category in map(_image_category, sections["categories"]):
+            images.append({"name": category["name"], "images": [url for url in map(_image_url, category["images"])
+                                                                if url]})
         return images
 
-    def get_reviews(self, ids=[], url="", clear_old=True, streem=True, sleep_time: int = 5):
-        if ids:
-            id1, id2 = ids
-        elif url:
-            id1, id2 = self.__get_ids_from_url(url)
-            if not id1:
-                raise Exception("not valid url")
-        else:
-            raise Exception("pass ids or url")
+    def get_reviews(self, ids=[], url="", clear_old=True, streem=True, sleep_time: float = None, sort: int = None,
+                    resume: bool = False, new_only: bool = False, page: "int | PageSize" = 200):
+        """
+        :param sort: cursors.SORT_RELEVANT (default), SORT_NEWEST, SORT_HIGHEST or SORT_LOWEST
+        :param resume: with a cursor_store, continue an unfinished crawl of this place and sort from its cursor,
+            e.g. after a crash; off by default, so a crawl stopped early on purpose (the first N reviews) does
+            not make the next call start mid-stream
+        :param new_only: with a cursor_store, only the reviews newer than those crawled before: pages newest
+            first and stops at the first known review
+        :param page: reviews per request, or a paging.AdaptivePageSize tuning it as the crawl goes
+        """
+        sort = sort or (SORT_NEWEST if new_only else SORT_RELEVANT)
+        pager = page_size(page)
+        pager.reset()
+        id1, id2 = self._review_ids(ids, url)
 
+        crawl = ReviewCursor(self.cursor_store, id1, id2, sort, resume=resume, new_only=new_only)
         self.reviews = []
-        last_id = ""
+        last_id = crawl.start
         self.__set_latitude()
         tr = True
         while tr:
-            r = self.session.request("GET", self._url_get_review(id1, id2, last_id), headers=self.headers, proxies=self.proxies)
-            r.raise_for_status()
-            list_data = json.loads(r.text[5:])
+            size, stats = pager.size, {}
+            try:
+                # a timeout goes straight to the pager while it can still ask for a smaller page
+                list_data = self._get_json("review", self._url_get_review(id1, id2, last_id, page=size, sort=sort),
+                                           sleep_time=sleep_time, stats=stats, retry_timeouts=not pager.can_shrink)
+            except requests.Timeout:
+                if not pager.timed_out():
+                    raise
+                self.logger.info(f"Timeout, Page:{size} >> {pager.size}")
+                continue
 
             if len(list_data[2]) == 0:
                 break
+            pager.record(size, len(list_data[2]), stats.get("latency"), stats.get("bytes"))
 
             for ll in list_data[2]:
                 review = Review(ll)
+                if not crawl.accept(review.id):
+                    tr = False
+                    break
                 last_id = review.id
-                self.reviews.append(review)
+                if self.keep_results:
+                    self.reviews.append(review)
                 if streem:
                     yield review
                 if not last_id:
                     tr = False
                     break
+            crawl.page_done(last_id)
 
-            sleep(sleep_time)
+        crawl.finish()
         return self.reviews
 
+    def get_reviews_parallel(self, ids=[], url="", sorts=(SORT_HIGHEST, SORT_LOWEST), total: int = None,
+                             sleep_time: float = None, page: "int | PageSize" = 200, stop_at_known: bool = False):
+        """
+        Crawl the reviews of one place as several streams at once, one per sort order, merged and deduplicated
+        by Review.id as they arrive.
+
+        Highest rating first and lowest rating first walk the same reviews from both ends: with `total`, the
+        streams stop once that many distinct reviews arrived, so each does about half the pages of get_reviews,
+        at the same time. The streams share the "review" rate limit of their proxy: with the default rate
+        limiter and no ProxyPool they take turns on one bucket and the crawl is no faster than get_reviews.
+        The speedup needs a ProxyPool (a bucket per proxy) or a higher "review" rate.
+
+        :param sorts: sort order of each stream, see cursors.SORT_*
+        :param total: number of reviews of the place (Place.reviews_count): the streams stop once that many
+            distinct reviews arrived; without it every stream runs to its end
+        :param sleep_time:
+        :param page: reviews per request, or a paging.AdaptivePageSize shared by the streams
+        :param stop_at_known: also stop a stream at its first page made only of reviews already received.
+            Only safe when the orders are exact reverses: Google orders the reviews of one rating its own way
+            in both, so reviews in the middle can be missed
+        :return: generator of Review, each review once, in arrival order
+        """
+        id1, id2 = self._review_ids(ids, url)
+        pager = page_size(page)
+        pager.reset()
+        self.reviews = []
+        seen = set()
+        lock = threading.Lock()
+        stop = threading.Event()
+        results = queue.Queue()
+        done = object()
+
+        def stream(sort):
+            last_id = ""
+            try:
+                while not stop.is_set():
+                    with lock:
+                        size, can_shrink = pager.size, pager.can_shrink
+                    stats = {}
+                    try:
+                        list_data = self._get_json("review", self._url_get_review(id1, id2, last_id, size, sort),
+                                                   sleep_time=sleep_time, stats=stats, retry_timeouts=not can_shrink)
+                    except requests.Timeout:
+                        with lock:
+                            if not pager.timed_out():
+                                raise
+                        continue
+                    reviews = [Review(ll) for ll in list_data[2] or ()]
+                    if not reviews:
+                        break
+                    with lock:
+                        pager.record(size, len(reviews), stats.get("latency"), stats.get("bytes"))
+                        new = [r for r in reviews if r.id is None or r.id not in seen]
+                        seen.update(r.id for r in new)
+                        complete = total is not None and len(seen) >= total
+                    for review in new:
+                        results.put(review)
+                    last_id = reviews[-1].id
+                    if complete:
+                        stop.set()
+                    if not last_id or (stop_at_known and not new):
+                        break
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(done)
+
+        with ThreadPoolExecutor(max_workers=len(sorts)) as pool:
+            for sort in sorts:
+                pool.submit(stream, sort)
+            running = len(sorts)
+            try:
+                while running:
+                    item = results.get()
+                    if item is done:
+                        running -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        if self.keep_results:
+                            self.reviews.append(item)
+                        yield item
+            finally:
+                # the other streams end after their current request
+                stop.set()
+
+    def _review_ids(self, ids=(), url=""):
+        if ids:
+            id1, id2 = ids
+        elif url:
+            id1, id2 = self._get_ids_from_url(url)
+            if not id1:
+                raise Exception("not valid url")
+        else:
+            raise Exception("pass ids or url")
+        return id1, id2
+
     @staticmethod
-    def __get_ids_from_url(url, hex_=False):
+    def _get_ids_from_url(url, hex_=False):
         if not hex_:
             res = re.findall(r"1s(\w+):(\w+)!", url)
 
@@ -133,40 +397,110 @@ class GoogleMaps:
                 return res[0]
 
     @staticmethod
-    def __get_name_from_url(url):
+    def _get_name_from_url(url):
         res = re.findall(r"/place/(.*)/@", url)
         if res:
             return res[0]
         return ""
 
-    def get_place(self, keyword="", url="", offset=0, p=100) -> Place:
+    def get_place(self, keyword="", url="", offset=0, p=100, fields=None, as_tuple: bool = False) -> Place:
+        """
+        :param fields: return only these fields (names of schema.PLACE) as a dict instead of a Place
+        :param as_tuple: with `fields`, a namedtuple instead of a dict
+        """
+        parse = self._parser(fields, as_tuple)
         self.__set_latitude(keyword)
         if keyword:
-            r = self.session.request("GET", url=search_params["url"], headers=self.headers, proxies=self.proxies)
-            r.raise_for_status()
-
-            list_data = json.loads(r.text[5:])
-
-            data, type_ = self.__prepare_data(list_data)
-            if type_ == "place":
-                place = Place(data[14])
-            elif type_ == "list":
-                place = Place(data[0][14])
-            else:
-                return None
+            place = self._place_from_search(self._get_json("search", self._url_search(keyword, p, offset)["url"]),
+                                            parse)
         elif url:
-            r = self.session.request("GET", self._url_get_place(url), headers=self.headers, proxies=self.proxies)
-            r.raise_for_status()
-
-            list_data = json.loads(r.text[5:])
-            place = Place(list_data[6])
+            list_data = self._get_json("place", self._url_get_place(url))
+            place = parse(list_data[6])
         else:
             raise
 
         return place
 
+    def get_places(self, urls=(), keywords=(), workers: int = 8, ordered: bool = False, queue_size: int = None,
+                   fields=None, as_tuple: bool = False):
+        """
+        Fetch many places with a thread pool, yielding each Place as soon as it is ready.
+
+        :param urls: google maps place urls, fetched like get_place(url=...)
+        :param keywords: place names, fetched like get_place(keyword=...)
+        :param workers: number of threads
+        :param ordered: yield in input order (urls first, then keywords) instead of completion order
+        :param queue_size: max items submitted but not yielded yet, default workers * 2
+        :param fields: yield only these fields of each place, see get_place
+        :param as_tuple: with `fields`, namedtuples instead of dicts
+        :return: generator of Place, or PlaceError for the items that failed
+        """
+        items = [(url, "") for url in urls] + [("", keyword) for keyword in keywords]
+        queue_size = max(queue_size or workers * 2, workers)
+
+        def fetch(index, url, keyword):
+            try:
+                place = self.get_place(keyword=keyword, url=url, fields=fields, as_tuple=as_tuple)
+            except Exception as e:
+                self.logger.error(f"get_places: {index=}, {url=}, {keyword=}: {e}")
+                return PlaceError(index, url=url or None, keyword=keyword or None, error=e)
+            if place is None:
+                return PlaceError(index, url=url or None, keyword=keyword or None,
+                                  error=LookupError("no place found"))
+            return place
+
+        todo = iter(enumerate(items))
+        pending = {}
+        done_out_of_order = {}
+        next_index = 0
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            def fill():
+                while len(pending) + len(done_out_of_order) < queue_size:
+                    item = next(todo, None)
+                    if item is None:
+                        return
+                    index, (url, keyword) = item
+                    pending[pool.submit(fetch, index, url, keyword)] = index
+
+            fill()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = pending.pop(future)
+                    if ordered:
+                        done_out_of_order[index] = future.result()
+                    else:
+                        yield future.result()
+
+                while next_index in done_out_of_order:
+                    yield done_out_of_order.pop(next_index)
+                    next_index += 1
+                fill()
+
+    def _place(self, data) -> Place:
+        return Place(data, keep_raw=self.keep_raw)
+
+    def _parser(self, fields=None, as_tuple=False):
+        """
+        :return: function(data) -> Place, or with `fields` -> dict / namedtuple of only those fields,
+                 read straight from the array without building a Place (see schema.projection)
+        """
+        if fields is None:
+            return self._place
+        return schema.projection(fields, as_tuple)
+
+    def _place_from_search(self, list_data, parse=None):
+        parse = parse or self._place
+        data, type_ = self._prepare_data(list_data)
+        if type_ == "place":
+            return parse(data[14])
+        elif type_ == "list":
+            return parse(data[0][14])
+        return None
+
     @staticmethod
-    def __prepare_data(data):
+    def _prepare_data(data):
         if data[0][3] == 0 and len(data[0][1]) > 0:
             # print("place return ")
             return data[0][1][0], "place"
@@ -175,105 +509,133 @@ class GoogleMaps:
             return data[0][1][1:], 'list'
         return [], None
 
+    @staticmethod
+    def _results_ended(data) -> bool:
+        """
+        :return: the search response is well formed but has no place: the page after the last one
+        """
+        kind, rows = get_index(data, 0, 3), get_index(data, 0, 1)
+        return isinstance(rows, list) and (kind == 0 and not rows or kind == 1 and len(rows) <= 1)
+
     def search(self, keyword: str, all_: bool = True, clear_old: bool = True, offset: int = 0, per_page: int = 100,
-               streem: bool = True, sleep_time: float = 4,
-               add_oq: bool = True) -> list[Place]:
+               streem: bool = True, sleep_time: float = None,
+               add_oq: bool = True, fields=None, as_tuple: bool = False, resume: bool = True) -> list[Place]:
         """
 
         :param keyword:
         :param all_:
         :param clear_old:
-        :param offset:
-        :param per_page:
+        :param offset: index of the first place; with a cursor_store pass resume=False to use it
+        :param per_page: places per request, or a paging.AdaptivePageSize tuning it as the crawl goes
         :param streem:
         :param sleep_time:
         :param add_oq:
+        :param fields: yield only these fields (names of schema.PLACE) of every result as dicts, e.g.
+                       ["title", "google_place_id", "latitude", "longitude", "phone"]
+        :param as_tuple: with `fields`, namedtuples instead of dicts
+        :param resume: with a cursor_store, continue an unfinished search of this keyword from its checkpoint
         :return:
         """
+        store = self.cursor_store
+        if offset and resume and store is not None:
+            raise ValueError("search: the checkpoint of resume=True sets the offset, pass resume=False to give one")
+        parse = self._parser(fields, as_tuple)
+        pager = page_size(per_page)
+        pager.reset()
 
         # auto minus per_page to get all data
         # 100/v(4) >> 25/v >> ... >> 1 or 0
         def minus_per_page(v=4):
             nonlocal per_page
-            per_page = per_page // v
+            per_page = pager.shrink(v)
             return per_page
 
         if clear_old:
             self.places = []
         self.keyword = keyword
+        key = self._search_key(keyword)
+        if store is not None and resume:
+            saved = store.get_search(key)
+            if saved is not None and not saved[2]:
+                offset, pager.size = saved[0], saved[1]
+                self.logger.info(f"Resume search, Keyword:{keyword}, Offset:{offset}, Per Page:{pager.size}")
 
         if not self.latitude or not self.longitude:
             self.logger.info("Set Latitude And Longitude")
             self.__set_latitude(keyword)
 
-        error = 0
+        # set when the results end; all_=False or an unexpected response leave the checkpoint open
+        done = False
         while True:
             len_data = 0
+            per_page = pager.size
+
+            # the places of the previous page were consumed: a crash from here on resumes at this page
+            if store is not None:
+                store.set_search(key, offset, per_page)
 
             if per_page <= 0:
+                done = True
                 break
 
-            # HTTPError: 429 Client Error: Too Many Requests for url: https://www.google.com/sorry/index?continue=...
-            # TODO: Solve Google Captcha
+            # 429 / https://www.google.com/sorry/index (captcha) are retried by self.retry_policy,
+            # GoogleBlockedError is raised once its retries run out
+            self.logger.info(f"request:{'GET'}, Per Page:{per_page}, Offset:{offset}, Keyword:{keyword}")
+            stats = {}
             try:
-                self.logger.info(f"sleep: {sleep_time}")
-                sleep(sleep_time)
-                self.logger.info(f"request:{'GET'}, Per Page:{per_page}, Offset:{offset}, Keyword:{keyword}")
-                r = self.session.request("GET",
-                                         **self._url_search(keyword, per_page, offset, add_oq=add_oq),
-                                         headers=self.headers, proxies=self.proxies, timeout=60)
-                self.logger.info(f"request: {r}")
-            except (requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout) as e:
-                self.logger.error(e)
-                self.logger.info(f"wait 10")
-                sleep(10)
-                error += 1
-                continue
-            except Exception as e:
-                self.logger.error(e)
-                self.logger.info("wait 10")
-                sleep(10)
-                error += 1
+                list_data = self._get_json("search", self._url_search(keyword, per_page, offset, add_oq=add_oq)["url"],
+                                           sleep_time=sleep_time, stats=stats, retry_timeouts=not pager.can_shrink,
+                                           timeout=60)
+            except requests.Timeout:
+                if not pager.timed_out():
+                    raise
+                self.logger.info(f"Timeout, Per Page:{per_page} >> {pager.size}")
                 continue
-
-            error = 0
-            r.raise_for_status()
-            list_data = json.loads(r.text[5:])
-            data, type_ = self.__prepare_data(list_data)
+            data, type_ = self._prepare_data(list_data)
             try:
                 if type_ == "place":
                     len_data = 1
                     if data[-1][-1] == 0 or not get_index(data, 14):
                         self.logger.info(f"No Place, {per_page} {type_}", )
                         if per_page <= 1:
+                            done = True
                             break
                         minus_per_page()
                         continue
 
-                    place = Place(data[14])
+                    place = parse(data[14])
 
-                    self.places.append(place)
+                    if self.keep_results:
+                        self.places.append(place)
                     yield place
 
+                    done = True
                     break
 
                 elif type_ == "list":
 
                     len_data = len(data)
                     self.logger.info(f"{len_data=}", )
+                    pager.record(per_page, len_data, stats.get("latency"), stats.get("bytes"))
                     for ii, ll in enumerate(data, 1):
                         if data[-1][-1] == 0 or not get_index(ll, 14) or not get_index(get_index(ll, 14), 11):
                             self.logger.info(f"No Place, {per_page} {type_}", )
 
                             continue
 
-                        place = Place(ll[14])
-                        self.places.append(place)
+                        place = parse(ll[14])
+                        if self.keep_results:
+                            self.places.append(place)
                         if streem:
                             yield place
 
+                elif self._results_ended(list_data):
+                    self.logger.info(f"No more places, Offset:{offset}, Keyword:{keyword}")
+                    done = True
+                    break
+
                 else:
-                    self.logger.error(f"{type_=}, {per_page=}, {data=}")
+                    self.logger.error(f"{type_=}, {per_page=}, {list_data=}")
 
                     break
 
@@ -287,8 +649,41 @@ class GoogleMaps:
             # offset += per_page
             offset += len_data
 
+        if store is not None and done:
+            store.set_search(key, offset, per_page, done=True)
         return self.places
 
+    def _search_key(self, keyword):
+        return search_key(keyword, self.latitude, self.longitude, self.zoom, self.hl, self.gl)
+
+    def search_done(self, keyword) -> bool:
+        """
+        :return: the cursor_store has a completed search of `keyword` with the current location and language
+        """
+        saved = self.cursor_store.get_search(self._search_key(keyword)) if self.cursor_store is not None else None
+        return bool(saved and saved[2])
+
+    def search_many(self, keywords, skip_done: bool = True, **kwargs):
+        """
+        Search keywords one after the other, e.g. a batch job of thousands of keywords.
+        With a cursor_store the batch can be restarted: completed keywords are skipped and an interrupted one
+        resumes at its checkpoint.
+
+        :param keywords: iterable of keywords
+        :param skip_done: skip the keywords the cursor_store has as completed
+        :param kwargs: passed to search, e.g. per_page, fields
+        :return: generator of the places of every keyword, and a PlaceError for each keyword whose search failed
+        """
+        for index, keyword in enumerate(keywords):
+            if skip_done and self.search_done(keyword):
+                self.logger.info(f"search_many: skip done keyword {keyword!r}")
+                continue
+            try:
+                yield from self.search(keyword, **kwargs)
+            except Exception as e:
+                self.logger.error(f"search_many: {index=}, {keyword=}: {e}")
+                yield PlaceError(index, keyword=keyword, error=e)
+
     def __set_latitude(self, keyword=""):
         ...
 
@@ -313,12 +708,21 @@ class GoogleMaps:
     #         else:
     #             raise error
 
+    @property
+    def accept_encoding(self):
+        # only advertise what the transport can decode (br / zstd need optional packages)
+        return getattr(self.session, "accept_encoding", REQUESTS_ACCEPT_ENCODING)
+
     @property
     def headers(self):
+        return self._headers(self.proxy)
+
+    def _headers(self, proxy=None):
         return {
             "accept": "*/*",
+            "accept-encoding": self.accept_encoding,
             "referrer": "https://www.google.com/",
-            "User-Agent": ua.random
+            **self.header_rotator.headers_for(proxy),
         }
 
     def _url_search(self, keyword, p, offset, add_oq=True):
@@ -332,7 +736,7 @@ class GoogleMaps:
 
         """
         return {"url": (
-            f"{GOOGLE_URL}/search?tbm=map&authuser=0&hl={self.hl}&gl={self.gl}&q={keyword}&"
+            f"{self.base_url}/search?tbm=map&authuser=0&hl={self.hl}&gl={self.gl}&q={keyword}&"
             # f'{"oq={keyword}&" if add_oq else ""}'
             f"pb=!4m12!1m3!1d{self.zoom}!2d{self.longitude}!3d{self.latitude}!2m3!1f0!2f0!3f0!3m2!1i1536!2i686!4f13.1!7i{p}!8i{offset}"
             "!10b1!12m16!1m1!18b1!2m3!5m1!6e2!20e3!10b1!12b1!13b1!16b1!17m1!3e1!20m3!5e2!6b1!14b1!19m4!2m3!1i360!2i120!4i8"
@@ -350,12 +754,12 @@ class GoogleMaps:
         )}
 
     def _url_get_place(self, url):
-        id1_id2 = self.__get_ids_from_url(url, hex_=True)
+        id1_id2 = self._get_ids_from_url(url, hex_=True)
         if not id1_id2:
             raise Exception("not valid url")
-        place_name = self.__get_name_from_url(url)
+        place_name = self._get_name_from_url(url)
         return (
-            f"{GOOGLE_URL}/maps/preview/place?authuser=0&hl={self.hl}&gl={self.gl}&q={quote_plus(place_name)}&pb=!1m11!1s{id1_id2}!3m9!1m3"
+            f"{self.base_url}/maps/preview/place?authuser=0&hl={self.hl}&gl={self.gl}&q={quote_plus(place_name)}&pb=!1m11!1s{id1_id2}!3m9!1m3"
             f"!1d{self.zoom}!2d{self.longitude}!3d{self.latitude}!2m0!3m2!1i1536!2i686!4f13.1!12m4!2m3!1i360!2i120!4i8!13m57!2m2"
             "!1i203!2i100!3m2!2i4!5b1!6m6!1m2!1i86!2i86!1m2!1i408!2i240!7m42!1m3!1e1!2b0!3e3!1m3!1e2!2b1!3e2!1m3!1e2!2b0!3e3"
             "!1m3!1e8!2b0!3e3!1m3!1e10!2b0!3e3!1m3!1e10!2b1!3e2!1m3!1e9!2b1!3e2!1m3!1e10!2b0!3e3!1m3!1e10!2b1!3e2!1m3!1e10"
@@ -367,12 +771,13 @@ class GoogleMaps:
             "!1m2!1i0!2i666!2m2!1i1536!2i686!22m1!1e81!29m0!30m5!3b1!6m1!2b1!7m1!2b1!34m2!7b1!10b1!37i657"
             "!39z2K3ZhNmI2YrYp9iqINin2YTYqNiv2LHZiiDZg9mI2LHZhtmK2LQg2KfZhNmG2YrZhA")
 
-    def _url_get_review(self, id1, id2, last_id="", page=200):
+    def _url_get_review(self, id1, id2, last_id="", page=200, sort=SORT_RELEVANT):
         """
         :param id1:
         :param id2:
         :param last_id:
         :param page:
+        :param sort: 1 most relevant, 2 newest, 3 highest rating, 4 lowest rating (cursors.SORT_*)
         :return:
         url
          hl: language
@@ -391,12 +796,12 @@ class GoogleMaps:
             ...
         """
         return (
-            f"{GOOGLE_URL}/maps/preview/review/listentitiesreviews?authuser=0&hl={self.hl}&gl={self.gl}&"
-            f"pb=!1m2!1y{id1}!2y{id2}!{'2m2' if last_id else '2m1'}!2i{page}{('!3s' + last_id) if last_id else ''}!3e1!4m5!3b1!4b1!6b1!7b1!20b1!5m2!1sJavSZPiQCfGqkdUPx469kA4!7e81")
+            f"{self.base_url}/maps/preview/review/listentitiesreviews?authuser=0&hl={self.hl}&gl={self.gl}&"
+            f"pb=!1m2!1y{id1}!2y{id2}!{'2m2' if last_id else '2m1'}!2i{page}{('!3s' + last_id) if last_id else ''}!3e{sort}!4m5!3b1!4b1!6b1!7b1!20b1!5m2!1sJavSZPiQCfGqkdUPx469kA4!7e81")
 
     def _get_images_url(self, id1_, id2_):
         return (
-            f"{GOOGLE_URL}/maps/preview/photo?authuser=0&hl={self.hl}&gl={self.gl}&pb=!1e2!3m3!"
+            f"{self.base_url}/maps/preview/photo?authuser=0&hl={self.hl}&gl={self.gl}&pb=!1e2!3m3!"
             f"1s{hex(int(id1_))}:{hex(int(id2_))}!9e0!11s/g/11rn4ndyt8!5m50!2m2!1i203!2i100!3m2!2i20!5b1!7m42!1m3!1e1!2b0!3e3!1m3!1e2"
             "!2b1!3e2!1m3!1e2!2b0!3e3!1m3!1e8!2b0!3e3!1m3!1e10!2b0!3e3!1m3!1e10!2b1!3e2!1m3!1e9!2b1!3e2!1m3!1e10!2b0"
             "!3e3!1m3!1e10!2b1!3e2!1m3!1e10!2b0!3e4!2b1!4b1!9b0!6m3!1sfBnWZJe_L5GjkdUPnfi7-AQ!7e81!15i16698!16m2!2b1"
@@ -0,0 +1,99 @@
+"""
+Browser header profiles for the requests GoogleMaps sends.
+
+A profile is a User-Agent together with the client hints the same browser would send, so the headers of one
+client never mix a Chrome User-Agent with Firefox hints. Profiles are plain in-memory dicts built at import time:
+no network access and no data file, unlike fake_useragent.
+"""
+import random
+import threading
+
+_CHROME = "Mozilla/5.0 ({os}) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/{version}.0.0.0 Safari/537.36"
+_EDGE = _CHROME + " Edg/{version}.0.0.0"
+_FIREFOX = "Mozilla/5.0 ({os}; rv:{version}.0) Gecko/20100101 Firefox/{version}.0"
+_SAFARI = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+           "Version/{version} Safari/605.1.15")
+
+_OS = {
+    "Windows": "Windows NT 10.0; Win64; x64",
+    "macOS": "Macintosh; Intel Mac OS X 10_15_7",
+    "Linux": "X11; Linux x86_64",
+}
+
+
+def _chromium(template, brand, version, platform):
+    return {
+        "User-Agent": template.format(os=_OS[platform], version=version),
+        "sec-ch-ua": f'"{brand}";v="{version}", "Chromium";v="{version}", "Not.A/Brand";v="99"',
+        "sec-ch-ua-mobile": "?0",
+        "sec-ch-ua-platform": f'"{platform}"',
+    }
+
+
+def _firefox(version, platform):
+    # Firefox writes the macOS version with dots and sends no client hints
+    os_ = _OS[platform].replace("10_15_7", "10.15")
+    return {"User-Agent": _FIREFOX.format(os=os_, version=version)}
+
+
+DEFAULT_PROFILES = tuple(
+    [_chromium(_CHROME, "Google Chrome", v, p) for v in (138, 139, 140, 141) for p in ("Windows", "macOS", "Linux")]
+    + [_chromium(_EDGE, "Microsoft Edge", v, "Windows") for v in (140, 141)]
+    + [_firefox(v, p) for v in (143, 144) for p in ("Windows", "macOS", "Linux")]
+    + [{"User-Agent": _SAFARI.format(version=v)} for v in ("18.6", "26.0")]
+)
+
+
+class HeaderRotator:
+    """
+    Picks a header profile per key (usually the proxy url, None for direct requests).
+
+    With `sticky=True` a key keeps the profile it got first, so every request through one proxy looks like
+    the same browser; with `sticky=False` every call picks a random profile.
+    Any object with a `headers_for(key)` method returning a dict can be passed to GoogleMaps instead.
+
+    :param profiles: header dicts, see DEFAULT_PROFILES
+    :param sticky: keep one profile per key
+    :param seed: seed for the random choices, for reproducible runs
+    """
+
+    def __init__(self, profiles=DEFAULT_PROFILES, sticky: bool = True, seed=None):
+        self.profiles = tuple(dict(p) for p in profiles)
+        if not self.profiles:
+            raise ValueError("HeaderRotator needs at least one profile")
+        self.sticky = sticky
+        self._random = random.Random(seed)
+        self._assigned = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"HeaderRotator({len(self.profiles)} profiles, sticky={self.sticky})"
+
+    @classmethod
+    def from_user_agents(cls, user_agents, **kwargs):
+        """
+        Profiles with only a User-Agent, e.g. from a list kept in a file, or sampled once from fake_useragent:
+
+            HeaderRotator.from_user_agents(UserAgent().random for _ in range(50))
+        """
+        return cls([{"User-Agent": ua} for ua in dict.fromkeys(user_agents)], **kwargs)
+
+    def headers_for(self, key=None) -> dict:
+        """
+        :param key: the proxy url the request goes through
+        :return: the profile headers; shared, do not modify
+        """
+        if not self.sticky:
+            return self._random.choice(self.profiles)
+        profile = self._assigned.get(key)
+        if profile is None:
+            with self._lock:
+                profile = self._assigned.setdefault(key, self._random.choice(self.profiles))
+        return profile
+
+    def forget(self, key=None):
+        """
+        Drop the profile of `key`, e.g. after its proxy got blocked; the next request picks a new one.
+        """
+        with self._lock:
+            self._assigned.pop(key, None)
@@ -0,0 +1,136 @@
+"""
+Page sizes of the paginated calls (search per_page, get_reviews page).
+
+A plain int keeps the old behaviour. An AdaptivePageSize tunes the size between requests from what each
+page cost: it grows while pages come back full and fast, backs off when a request gets slow, too large or
+times out, and follows the server when it returns fewer items than asked for.
+
+    maps.get_reviews(url=url, page=AdaptivePageSize(200, maximum=400, target_latency=3))
+"""
+
+
+class PageSize:
+    """
+    Fixed page size, what an int page size becomes.
+    """
+
+    def __init__(self, size: int, minimum: int = 1, maximum: int = None):
+        self.size = size
+        self.minimum = minimum
+        self.maximum = maximum or size
+
+    def __repr__(self):
+        return f"{type(self).__name__}(size={self.size})"
+
+    @property
+    def can_shrink(self) -> bool:
+        """
+        timed_out() would reduce the size: a timeout is then retried by the caller with a smaller page instead of
+        by the RetryPolicy with the same one.
+        """
+        return False
+
+    def shrink(self, factor: int = 4) -> int:
+        """
+        Divide the size, e.g. search retrying a page Google answered empty; can reach 0.
+        """
+        self.size = self.size // factor
+        return self.size
+
+    def record(self, requested: int, received: int, latency: float = None, nbytes: int = None):
+        """
+        Called after every page.
+
+        :param requested: page size of the request
+        :param received: items in the response
+        :param latency: seconds from sending the request to the parsed body (rate limit waits excluded)
+        :param nbytes: body size on the wire, when known
+        """
+
+    def reset(self):
+        """
+        Called at the start of every crawl, so what was learned about another place or keyword does not stick.
+        """
+
+    def timed_out(self) -> bool:
+        """
+        Called when a request timed out.
+
+        :return: the size was reduced and the page can be requested again
+        """
+        return False
+
+
+class AdaptivePageSize(PageSize):
+    """
+    :param size: first page size
+    :param minimum: never below
+    :param maximum: never above, default `size`
+    :param target_latency: seconds a request should take; slower pages shrink the size in proportion,
+        full pages under half of it double the size
+    :param max_bytes: largest body wanted, the size is capped from the bytes per item seen so far
+    :param cap_after: pages in a row answered with the same count below the size asked for before that count is
+        taken as the server's cap; a single short page is usually the last one
+    """
+
+    def __init__(self, size: int = 200, minimum: int = 10, maximum: int = None, target_latency: float = 5.0,
+                 max_bytes: int = None, cap_after: int = 2):
+        super().__init__(size, minimum=min(minimum, size), maximum=maximum)
+        self.target_latency = target_latency
+        self.max_bytes = max_bytes
+        self.cap_after = cap_after
+        self._maximum = self.maximum
+        self._bytes_per_item = None
+        self._short = (None, 0)
+
+    def reset(self):
+        # a cap learned on one crawl may not hold on the next, start from the configured maximum again
+        self.maximum = self._maximum
+        self._short = (None, 0)
+
+    def _set(self, size):
+        self.size = max(self.minimum, min(self.maximum, int(size)))
+
+    def record(self, requested, received, latency=None, nbytes=None):
+        if not received:
+            # an empty page is the end of the results (or a search shrink), not a signal about the size
+            return
+        if nbytes:
+            per_item = nbytes / received
+            self._bytes_per_item = per_item if self._bytes_per_item is None else (self._bytes_per_item + per_item) / 2
+
+        size = requested
+        if received < requested:
+            # the same short count again and again is the server capping the page: asking for more only makes
+            # responses bigger to wait for, and growing back would be capped again
+            repeats = self._short[1] + 1 if self._short[0] == received else 1
+            self._short = (received, repeats)
+            if repeats >= self.cap_after:
+                self.maximum = max(self.minimum, received)
+                size = received
+        else:
+            self._short = (None, 0)
+            if latency is not None and latency < self.target_latency / 2:
+                size = requested * 2
+        if latency is not None and latency > self.target_latency:
+            size = min(size, requested * self.target_latency / latency)
+        if self.max_bytes and self._bytes_per_item:
+            size = min(size, self.max_bytes / self._bytes_per_item)
+        self._set(size)
+
+    @property
+    def can_shrink(self):
+        return self.size > self.minimum
+
+    def timed_out(self):
+        if self.size <= self.minimum:
+            return False
+        self._set(self.size // 2)
+        return True
+
+
+def page_size(page) -> PageSize:
+    """
+    :param page: int or PageSize
+    """
+    return page if isinstance(page, PageSize) else PageSize(page)
@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import threading
+import time
+
+# requests per second for each endpoint, same pace as the old fixed sleeps (search: 4s, reviews: 5s)
+DEFAULT_RATES = {
+    "search": 1 / 4,
+    "review": 1 / 5,
+}
+
+
+class MemoryBackend:
+    """
+    Token buckets kept in this process, shared by every thread using the same RateLimiter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    @staticmethod
+    def now():
+        return time.monotonic()
+
+    def take(self, key, rate, capacity):
+        """
+        Take one token from bucket `key` and return how many seconds the caller must wait before using it.
+        The token is reserved even if the bucket is empty, so concurrent callers queue up behind each other.
+        """
+        with self._lock:
+            now = self.now()
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate) - 1
+            self._buckets[key] = (tokens, now)
+        return max(0.0, -tokens / rate)
+
+    def peek(self, key, rate, capacity):
+        """
+        Seconds `take` would make the caller wait right now, without taking a token.
+        """
+        with self._lock:
+            now = self.now()
+            tokens, updated = self._buckets.get(key, (capacity, now))
+        return max(0.0, (1 - min(capacity, tokens + (now - updated) * rate)) / rate)
+
+
+class SQLiteBackend(MemoryBackend):
+    """
+    Token buckets stored in a SQLite file, so every process pointing at the same file shares one budget.
+
+        limiter = RateLimiter(backend=SQLiteBackend("/tmp/googlemapspy-rate.db"))
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._conn = None
+        self._pid = None
+
+    @staticmethod
+    def now():
+        # wall clock, so timestamps written by other processes are comparable
+        return time.time()
+
+    def _connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+            self._pid = os.getpid()
+        return self._conn
+
+    def take(self, key, rate, capacity):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = self.now()
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row or (capacity, now)
+                tokens = min(capacity, tokens + max(0.0, now - updated) * rate) - 1
+                conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                             (key, tokens, now))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return max(0.0, -tokens / rate)
+
+    def peek(self, key, rate, capacity):
+        with self._lock:
+            now = self.now()
+            row = self._connection().execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+        tokens, updated = row or (capacity, now)
+        return max(0.0, (1 - min(capacity, tokens + max(0.0, now - updated) * rate)) / rate)
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter shared by every request GoogleMaps sends.
+
+    Each (endpoint, proxy) pair gets its own bucket, so two proxies can each run at the full rate.
+    Endpoints without a rate are not limited.
+
+    :param rates: requests per second per endpoint ("search", "place", "review", "images")
+    :param capacity: burst size, how many requests can go out back to back after an idle period
+    :param backend: MemoryBackend (default, one process) or SQLiteBackend (shared between processes)
+    """
+
+    def __init__(self, rates: dict = None, capacity: float = 1, backend=None):
+        self.rates = dict(rates or {})
+        self.capacity = capacity
+        self.backend = backend or MemoryBackend()
+
+    def delay(self, endpoint, proxy=None, rate=None):
+        """
+        Reserve a request slot and return the seconds to wait before sending it.
+
+        :param endpoint:
+        :param proxy: proxy url the request goes through, None for direct
+        :param rate: overrides the endpoint rate for this call
+        :return:
+        """
+        rate = self.rates.get(endpoint) if rate is None else rate
+        if not rate:
+            return 0.0
+        return self.backend.take(f"{endpoint}|{proxy or ''}", rate, self.capacity)
+
+    def ready_in(self, endpoint, proxy=None, rate=None):
+        """
+        Seconds a request would wait now, without reserving anything; ProxyPool ranks the proxies by it.
+        """
+        rate = self.rates.get(endpoint) if rate is None else rate
+        if not rate:
+            return 0.0
+        return self.backend.peek(f"{endpoint}|{proxy or ''}", rate, self.capacity)
+
+    def acquire(self, endpoint, proxy=None, rate=None):
+        wait = self.delay(endpoint, proxy, rate)
+        if wait:
+            time.sleep(wait)
+        return wait
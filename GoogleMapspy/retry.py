@@ -0,0 +1,234 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+logger = logging.getLogger(name="GoogleMapsPy")
+
+
+class GoogleBlockedError(requests.exceptions.HTTPError):
+    """
+    Google answered with 429 or redirected to the /sorry/ captcha page and the retries ran out.
+    """
+
+
+class CircuitOpenError(Exception):
+    """
+    Too many failures in a row on one key (proxy), and the circuit breaker is set to fail fast.
+    """
+
+
+def _status(response):
+    # requests.Response.status_code / aiohttp.ClientResponse.status
+    return getattr(response, "status_code", None) or getattr(response, "status", None)
+
+
+def is_blocked(response) -> bool:
+    """
+    True for a 429 or a redirect to https://www.google.com/sorry/index (the captcha page).
+    """
+    if _status(response) == 429:
+        return True
+    urls = [str(response.url)] + [str(getattr(r, "url", "")) for r in getattr(response, "history", ())]
+    urls += [r.headers.get("location", "") for r in getattr(response, "history", ())]
+    return any("/sorry/" in url for url in urls)
+
+
+def retry_after(response):
+    """
+    Seconds from the Retry-After header, which is either a number or an http date. None if missing.
+    """
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Stops sending through a key (usually a proxy url) after `failure_threshold` failures in a row.
+    After `reset_timeout` seconds one request is let through again (half open); success closes the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60, fail_fast: bool = False):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.fail_fast = fail_fast
+        self._lock = threading.Lock()
+        self._failures = {}
+        self._opened_at = {}
+
+    def remaining(self, key=None) -> float:
+        """
+        Seconds until `key` may be used again, 0 when the circuit is closed or half open.
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(key)
+            if opened_at is None:
+                return 0.0
+            return max(0.0, opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self, key=None):
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened_at.pop(key, None)
+
+    def record_failure(self, key=None):
+        with self._lock:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            if self._failures[key] >= self.failure_threshold:
+                self._opened_at[key] = time.monotonic()
+                logger.warning(f"circuit open for {key or 'direct'}: {self._failures[key]} failures in a row")
+
+
+class RetryPolicy:
+    """
+    One retry policy for every request GoogleMaps sends.
+
+    Retries connection errors, timeouts and `retry_statuses` with exponential backoff and full jitter,
+    honours Retry-After, and treats 429 / the /sorry/ captcha page as a block: `on_block(response, key)`
+    is called so the caller can cool down or rotate the proxy before the next attempt.
+
+    :param max_retries: retries after the first attempt, then the last error is raised
+    :param backoff: first backoff in seconds, doubled on every retry
+    :param max_backoff: cap for one backoff
+    :param jitter: pick a random wait in [0, backoff] instead of the full backoff
+    :param retry_statuses: http statuses worth retrying
+    :param circuit_breaker: CircuitBreaker shared by the requests, keyed by proxy
+    :param on_block: hook(response, key) called when Google blocks a request
+    :param on_retry: hook(attempt, wait, error_or_response) called before each retry
+    """
+    retry_exceptions = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+    def __init__(self, max_retries: int = 5, backoff: float = 2, max_backoff: float = 300, jitter: bool = True,
+                 retry_statuses=(429, 500, 502, 503, 504), circuit_breaker: CircuitBreaker = None,
+                 on_block=None, on_retry=None):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = set(retry_statuses)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.on_block = on_block
+        self.on_retry = on_retry
+
+    def wait_for(self, attempt, response=None) -> float:
+        wait = retry_after(response)
+        if wait is not None:
+            return min(wait, self.max_backoff)
+        wait = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return random.uniform(0, wait) if self.jitter else wait
+
+    def _should_retry(self, response) -> bool:
+        return is_blocked(response) or _status(response) in self.retry_statuses
+
+    def _circuit_wait(self, key):
+        wait = self.circuit_breaker.remaining(key)
+        if wait and self.circuit_breaker.fail_fast:
+            raise CircuitOpenError(f"circuit open for {key or 'direct'}, retry in {wait:.0f}s")
+        return wait
+
+    def _after_failure(self, attempt, key, error=None, response=None):
+        """
+        Bookkeeping for a failed attempt; returns the seconds to wait, or raises when out of retries.
+        """
+        if response is not None and hasattr(response, "close"):
+            # the body of a failed (streamed) response is never read, give its connection back to the pool
+            response.close()
+        self.circuit_breaker.record_failure(key)
+        blocked = response is not None and is_blocked(response)
+        if blocked and self.on_block:
+            self.on_block(response, key)
+
+        if attempt >= self.max_retries:
+            if error is not None:
+                raise error
+            if blocked:
+                raise GoogleBlockedError(f"blocked by google ({_status(response)}): {response.url}",
+                                         response=response)
+            response.raise_for_status()
+            return 0.0
+
+        wait = self.wait_for(attempt, response)
+        logger.warning(f"retry {attempt + 1}/{self.max_retries} in {wait:.1f}s: "
+                       f"{error if error is not None else _status(response)}")
+        if self.on_retry:
+            self.on_retry(attempt, wait, error if error is not None else response)
+        return wait
+
+    @staticmethod
+    def _read_timeout(error) -> bool:
+        # ConnectTimeout is also a ConnectionError: the proxy / network, not the size of the response
+        return isinstance(error, requests.exceptions.Timeout) and not isinstance(
+            error, requests.exceptions.ConnectionError)
+
+    def call(self, send, key=lambda: None, retry_timeouts: bool = True):
+        """
+        Run `send()` until it returns a response that needs no retry.
+
+        :param send: callable doing one request, returns a requests.Response
+        :param key: callable returning the circuit breaker key (the proxy in use), read before every attempt for
+            the circuit wait and again after it for the bookkeeping, so a `send` that picks its proxy itself
+            (from a ProxyPool) can report the one it used
+        :param retry_timeouts: False raises a read timeout at once, for callers that retry it themselves with
+            a smaller request (paged calls with an AdaptivePageSize)
+        :return: the response
+        """
+        attempt = 0
+        while True:
+            wait = self._circuit_wait(key())
+            if wait:
+                time.sleep(wait)
+            try:
+                response = send()
+            except self.retry_exceptions as e:
+                if not retry_timeouts and self._read_timeout(e):
+                    raise
+                time.sleep(self._after_failure(attempt, key(), error=e))
+                attempt += 1
+                continue
+
+            current = key()
+            if not self._should_retry(response):
+                self.circuit_breaker.record_success(current)
+                return response
+            time.sleep(self._after_failure(attempt, current, response=response))
+            attempt += 1
+
+    async def call_async(self, send, key=lambda: None, exceptions=(), retry_timeouts: bool = True):
+        """
+        Same as call for a coroutine `send`; `exceptions` are the transport errors to retry (aiohttp's).
+        With `retry_timeouts=False`, asyncio.TimeoutError is raised at once too.
+        """
+        import asyncio  # only the async client needs it, keep it off the sync import path
+
+        attempt = 0
+        while True:
+            wait = self._circuit_wait(key())
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                response = await send()
+            except self.retry_exceptions + tuple(exceptions) as e:
+                if not retry_timeouts and (self._read_timeout(e) or isinstance(e, asyncio.TimeoutError)):
+                    raise
+                await asyncio.sleep(self._after_failure(attempt, key(), error=e))
+                attempt += 1
+                continue
+
+            current = key()
+            if not self._should_retry(response):
+                self.circuit_breaker.record_success(current)
+                return response
+            await asyncio.sleep(self._after_failure(attempt, current, response=response))
+            attempt += 1
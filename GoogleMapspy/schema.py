@@ -0,0 +1,242 @@
+"""
+Where each field lives in Google's nested arrays, in one place.
+
+A schema maps a field name to a Field: the index path into the raw array, a fallback path, a type and a default.
+Schemas are compiled into plain python functions (one `try: data[a][b][c]` per field), so a short or missing
+branch gives the default instead of an IndexError, and reading a field costs a few subscripts instead of
+a loop over the path. When Google moves a field, fix its path here.
+"""
+from collections import namedtuple
+
+
+class Field:
+    """
+    :param path: indexes from the record root, e.g. Field(183, 1, 3) reads data[183][1][3]
+    :param fallback: Field read when this path gives a falsy value (empty string, empty list, None)
+    :param type: applied to the value when it is not None, e.g. float; a value it rejects gives the default
+    :param default: value for a missing path or None; a list or dict default is copied for every record
+    """
+
+    __slots__ = ("path", "fallback", "type", "default")
+
+    def __init__(self, *path, fallback: "Field" = None, type=None, default=None):
+        if not all(isinstance(i, int) for i in path):
+            raise TypeError(f"Field path must be ints, got {path!r}")
+        self.path = path
+        self.fallback = fallback
+        self.type = type
+        self.default = default
+
+    def __repr__(self):
+        return f"Field{self.path}"
+
+
+def _lookup(field, target, names, indent):
+    """
+    Source lines reading `field` into the local `target`.
+    """
+    pad = " " * indent
+    lines = [f"{pad}try:",
+             f"{pad}    {target} = data{''.join(f'[{i}]' for i in field.path)}",
+             f"{pad}except (IndexError, KeyError, TypeError):",
+             f"{pad}    {target} = None"]
+    if field.fallback is not None:
+        lines.append(f"{pad}if not {target}:")
+        lines += _lookup(field.fallback, target, names, indent + 4)
+    return lines
+
+
+def _convert(field, name, target, names, indent):
+    """
+    Source lines turning the raw value in `target` into the field value (type / default).
+    """
+    pad = " " * indent
+    default = f"_default_{name}"
+    names[default] = field.default
+    if isinstance(field.default, (list, dict)):
+        default += ".copy()"
+    if field.type is None:
+        return [f"{pad}if {target} is None:", f"{pad}    {target} = {default}"]
+    names[f"_type_{name}"] = field.type
+    return [f"{pad}if {target} is None:",
+            f"{pad}    {target} = {default}",
+            f"{pad}else:",
+            f"{pad}    try:",
+            f"{pad}        {target} = _type_{name}({target})",
+            f"{pad}    except (TypeError, ValueError):",
+            f"{pad}        {target} = {default}"]
+
+
+def _build(source, names, function):
+    code = compile("\n".join(source), f"<schema {function}>", "exec")
+    exec(code, names)
+    return names[function]
+
+
+def compile_field(field: Field, name: str = "field"):
+    """
+    :return: function(data) -> value of `field` in the record `data`
+    """
+    names = {}
+    source = [f"def get_{name}(data):"]
+    source += _lookup(field, "value", names, 4)
+    source += _convert(field, name, "value", names, 4)
+    source.append("    return value")
+    return _build(source, names, f"get_{name}")
+
+
+def compile_fields(schema: dict) -> dict:
+    """
+    :return: {name: function(data) -> value}, for records whose fields are read one at a time (Place)
+    """
+    return {name: compile_field(field, name) for name, field in schema.items()}
+
+
+def compile_record(schema: dict, name: str = "record", as_tuple: bool = False):
+    """
+    :param as_tuple: return a namedtuple with the schema's fields in order instead of a dict
+    :return: function(data) -> {name: value} reading every field of the schema in one call
+    """
+    names = {}
+    source = [f"def {name}(data):"]
+    for i, field in enumerate(schema.values()):
+        source += _lookup(field, f"v{i}", names, 4)
+        source += _convert(field, str(i), f"v{i}", names, 4)
+    values = [f"v{i}" for i in range(len(schema))]
+    if as_tuple:
+        # tuple.__new__ skips the namedtuple's python-level __new__
+        names["_row"], names["_new"] = namedtuple(name, schema, rename=True), tuple.__new__
+        source.append(f"    return _new(_row, ({', '.join(values)},))")
+    else:
+        source.append(f"    return {{{', '.join(f'{key!r}: {v}' for key, v in zip(schema, values))}}}")
+    return _build(source, names, name)
+
+
+_projections = {}
+
+
+def projection(fields, as_tuple: bool = False, schema: dict = None):
+    """
+    Extractor for a few fields of a record, for callers that do not need a full Place.
+    Compiled once per (fields, as_tuple) and reused.
+
+        row = projection(["title", "google_place_id", "latitude", "longitude", "phone"], as_tuple=True)(data)
+
+    :param fields: field names of `schema`
+    :param as_tuple: namedtuple rows instead of dicts
+    :param schema: default PLACE
+    :return: function(data) -> dict or namedtuple
+    """
+    schema = PLACE if schema is None else schema
+    fields = (fields,) if isinstance(fields, str) else tuple(fields)
+    key = (id(schema), fields, as_tuple)
+    extract = _projections.get(key)
+    if extract is None:
+        unknown = [f for f in fields if f not in schema]
+        if unknown or not fields:
+            raise ValueError(f"unknown fields {unknown}, choose from {list(schema)}")
+        extract = compile_record({f: schema[f] for f in fields}, "Row", as_tuple=as_tuple)
+        _projections[key] = extract
+    return extract
+
+
+PLACE = {
+    "rating": Field(4, 7, type=float),
+    "reviews_count": Field(4, 8, type=int),
+    "reviews_url": Field(4, 3, 0),
+    "reviews_count_text": Field(4, 3, 1),
+    "expensive": Field(4, 2),
+    "expensive_text": Field(4, 10),
+    "site_url": Field(7, 0),
+    "site_text": Field(7, 1),
+    "latitude": Field(9, 2, type=float),
+    "longitude": Field(9, 3, type=float),
+    "google_id": Field(10),
+    "hex_ids": Field(10),
+    "title": Field(11),
+    "type": Field(13, 0),
+    "subtypes": Field(13, default=[]),
+    "split_address": Field(2),
+    "address_district": Field(14),
+    "full_address_name": Field(18),
+    "time_zone": Field(30),
+    "description": Field(32, 1, 1),
+    "photos_count": Field(37, 1, type=int),
+    "main_image": Field(37, 0, 0, 6, 0),
+    "review_ids": Field(37, 0, 0, 29),
+    "full_address": Field(39),
+    "google_url": Field(42),
+    "type2": Field(76, default=[]),
+    "google_place_id": Field(78),
+    "address_split": Field(82, default=[]),
+    "tags": Field(100),
+    "language": Field(110),
+    "language_code": Field(117),
+    "short_tags": Field(142),
+    "category": Field(164, 0, 1),
+    "address_country_city": Field(166),
+    "search_google_url": Field(174),
+    "phone": Field(178, 0, 3, fallback=Field(3, 0)),
+    "phone_format": Field(178, 0, 0),
+    "all_phones": Field(178, fallback=Field(3)),
+    "all_address": Field(183),
+    "full_split": Field(183, 0, 0),
+    "district": Field(183, 1, 0),
+    "street": Field(183, 1, 1),
+    "street_": Field(183, 1, 2),
+    "city": Field(183, 1, 3),
+    "postal_code": Field(183, 1, 4),
+    "state": Field(183, 1, 5),
+    "country_code": Field(183, 1, 6),
+    "plus_code": Field(183, 2, 1, 0),
+    "opening_days": Field(203, 0, default=[]),
+}
+
+# one entry of PLACE["opening_days"]
+DAY = {
+    "day_name": Field(0),
+    "day_id": Field(1),
+    "date": Field(2),
+    "text": Field(3, 0, 0),
+    "from": Field(3, 0, 1, 0, 0),
+    "to": Field(3, 0, 1, 1, 0),
+}
+
+REVIEW = {
+    "contrib_url": Field(0, 0),
+    "contrib_name": Field(0, 1),
+    "contrib_profile": Field(0, 2),
+    "contrib_level": Field(12, 0, 0),
+    "contrib_reviews_count": Field(12, 1, 1),
+    "contrib_rate_count": Field(12, 1, 7),
+    "create_at": Field(1),
+    "review": Field(3, default=""),
+    "rate": Field(4),
+    "place_name": Field(14, 0, 21, 3, 7, 1),
+    "likes": Field(16),
+    "review_url": Field(18),
+    "lang": Field(32),
+    "id": Field(61),
+}
+
+# a place of the /search?tbm=map response as read by function.get_allcom
+COMPANY = {
+    "companyName": Field(11),
+    "url": Field(7, 0),
+    "address": Field(39, fallback=Field(18)),
+    "phone": Field(178, 0, 0, fallback=Field(3, 0)),
+    "category": Field(13),
+    "country_code": Field(183, 1, 6),
+    "city": Field(14),
+}
+
+# /maps/preview/photo response
+IMAGES = {
+    "all": Field(0, default=[]),
+    "categories": Field(12, 0, default=[]),
+}
+IMAGE_URL = Field(6, 0)
+IMAGE_CATEGORY = {
+    "name": Field(2),
+    "images": Field(3, default=[]),
+}
@@ -0,0 +1,450 @@
+"""
+Writing crawl results to files as they arrive.
+
+A sink takes Place and Review objects, or the dicts / namedtuples of `fields=[...]` projections, one at a time,
+so a crawl never has to hold all its results (or a DataFrame of them) in memory:
+
+    maps = GoogleMaps(keep_results=False)
+    with ArrowSink("places.parquet") as sink:
+        sink.write_many(maps.search("restaurant"))
+
+ArrowSink writes typed columns (Parquet / Arrow IPC), NDJSONSink and CSVSink write Place.json() / Review.json()
+one line at a time, gzip-compressed for paths ending in .gz.
+"""
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+
+from GoogleMapspy import schema
+from GoogleMapspy.var import Place, PlaceError, Review
+
+logger = logging.getLogger(name="GoogleMapsPy")
+
+pa = None
+
+# column types: "json" columns hold nested arrays as json text
+PLACE_COLUMNS = {
+    "title": "string",
+    "url": "string",
+    "google_place_id": "string",
+    "google_id": "string",
+    "category": "string",
+    "type": "string",
+    "subtypes": "list<string>",
+    "phone": "string",
+    "phone_format": "string",
+    "description": "string",
+    "full_address": "string",
+    "full_address_name": "string",
+    "district": "string",
+    "street": "string",
+    "city": "string",
+    "postal_code": "string",
+    "state": "string",
+    "country_code": "string",
+    "plus_code": "string",
+    "latitude": "float64",
+    "longitude": "float64",
+    "rating": "float64",
+    "reviews_count": "int64",
+    "expensive": "string",
+    "site_url": "string",
+    "site_text": "string",
+    "main_image": "string",
+    "photos_count": "int64",
+    "language": "string",
+    "language_code": "string",
+    "time_zone": "string",
+    "search_google_url": "string",
+    "tags": "json",
+    "opening_days": "json",
+}
+
+REVIEW_COLUMNS = {
+    "id": "string",
+    "contrib_url": "string",
+    "contrib_name": "string",
+    "contrib_profile": "string",
+    "contrib_level": "string",
+    "contrib_reviews_count": "int64",
+    "contrib_rate_count": "int64",
+    "create_at": "string",
+    "review": "string",
+    "rate": "int64",
+    "likes": "int64",
+    "place_name": "string",
+    "review_url": "string",
+    "lang": "string",
+}
+
+# type of a column given by name only (columns=["title", "latitude"]): PLACE / REVIEW types, "string" otherwise
+COLUMN_TYPES = {**{name: "json" for name in schema.PLACE}, **PLACE_COLUMNS, **REVIEW_COLUMNS}
+
+
+def _import_pyarrow():
+    global pa
+    if pa is None:
+        try:
+            import pyarrow as module
+        except ImportError:
+            raise ImportError("ArrowSink requires pyarrow, install it with `pip install GoogleMapsPY[arrow]`")
+        pa = module
+    return pa
+
+
+def _string(value):
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def _float64(value):
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int64(value):
+    try:
+        return None if value is None else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _list_string(value):
+    return [_string(v) for v in value] if isinstance(value, (list, tuple)) else None
+
+
+def _json(value):
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+
+# column type: (python value -> value of that type or None, arrow type name)
+CONVERTERS = {
+    "string": (_string, "string"),
+    "float64": (_float64, "float64"),
+    "int64": (_int64, "int64"),
+    "list<string>": (_list_string, "list<string>"),
+    "json": (_json, "string"),
+}
+
+
+def _arrow_type(name):
+    if name == "list<string>":
+        return pa.list_(pa.string())
+    return getattr(pa, name)()
+
+
+def columns_for(record, columns=None) -> dict:
+    """
+    :param record: the first record written
+    :param columns: None for the defaults of the record type, a list of names, or {name: type}
+    :return: {name: type} with types from CONVERTERS
+    """
+    if isinstance(columns, dict):
+        unknown = {t for t in columns.values() if t not in CONVERTERS}
+        if unknown:
+            raise ValueError(f"unknown column types {unknown}, choose from {list(CONVERTERS)}")
+        return dict(columns)
+    if columns is None:
+        if isinstance(record, Place):
+            return dict(PLACE_COLUMNS)
+        if isinstance(record, Review):
+            return dict(REVIEW_COLUMNS)
+        columns = list(record.keys() if isinstance(record, dict) else record._fields)
+    return {name: COLUMN_TYPES.get(name, "string") for name in columns}
+
+
+def row_getter(names):
+    """
+    :return: function(record) -> [value of every column], for Place, Review, dicts and namedtuples.
+             Schema fields of a Place / Review are read from the raw array without filling the object's cache.
+    """
+    names = list(names)
+    extractors = {}
+    for cls, record_schema in ((Place, schema.PLACE), (Review, schema.REVIEW)):
+        in_schema = [n for n in names if n in record_schema]
+        extractors[cls] = schema.projection(in_schema, schema=record_schema) if in_schema else None
+
+    def get(record):
+        if isinstance(record, dict):
+            return [record.get(n) for n in names]
+        project = extractors.get(type(record))
+        values = project(record.data) if project is not None and getattr(record, "data", None) is not None else {}
+        return [values[n] if n in values else getattr(record, n, None) for n in names]
+
+    return get
+
+
+def record_json(record) -> dict:
+    """
+    :return: the dict a record is serialised as: Place.json() / Review.json(), a row's own fields
+    """
+    if isinstance(record, dict):
+        return record
+    if hasattr(record, "_asdict"):
+        return record._asdict()
+    return record.json()
+
+
+class Sink(ABC):
+    """
+    Base of the sinks: write(record), write_many(records), flush(), close(); usable as a context manager.
+    Subclasses implement write.
+    """
+
+    rows = 0
+    skipped = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @abstractmethod
+    def write(self, record):
+        ...
+
+    def write_many(self, records) -> int:
+        """
+        Write every record of an iterable (e.g. maps.search(...) or maps.get_places(...)), skipping PlaceError.
+        Records are pulled one by one, so the crawl runs at the speed the sink writes.
+
+        :return: number of rows written
+        """
+        count = 0
+        for record in records:
+            if isinstance(record, PlaceError):
+                logger.warning(f"{self!r}: skip {record!r}")
+                self.skipped += 1
+                continue
+            self.write(record)
+            count += 1
+        return count
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class ArrowSink(Sink):
+    """
+    Appends records into typed column buffers and writes them as a Parquet file or an Arrow IPC file,
+    one row group / record batch every `chunk_rows` rows, so memory stays bounded whatever the crawl size.
+
+    Values that do not fit their column type are written as null instead of failing the chunk.
+
+    :param path: file path or writable binary file; ".parquet" writes Parquet, anything else Arrow IPC
+                 (".arrow", ".feather"), unless `format` is given
+    :param columns: None for PLACE_COLUMNS / REVIEW_COLUMNS (chosen by the first record), a list of
+                    column names, or {name: type} with types from CONVERTERS
+    :param chunk_rows: rows buffered before a write
+    :param format: "parquet" or "ipc"
+    :param compression: codec of the Parquet file or the IPC batches, e.g. "zstd", "snappy", None
+    """
+
+    def __init__(self, path, columns=None, chunk_rows: int = 50_000, format: str = None,
+                 compression: str = "zstd"):
+        _import_pyarrow()
+        if format is None:
+            format = "parquet" if str(getattr(path, "name", path)).endswith(".parquet") else "ipc"
+        if format not in ("parquet", "ipc"):
+            raise ValueError(f"format must be 'parquet' or 'ipc', got {format!r}")
+        self.path = path
+        self.format = format
+        self.compression = compression
+        self.chunk_rows = max(1, chunk_rows)
+        self.rows = 0
+        self.skipped = 0
+        self._columns = columns
+        self._names = None
+        self._converters = None
+        self._get = None
+        self._buffers = None
+        self._schema = None
+        self._writer = None
+
+    def __repr__(self):
+        return f"ArrowSink({self.path!r}, format={self.format!r}, rows={self.rows})"
+
+    @property
+    def schema(self):
+        """
+        pyarrow.Schema of the file, known once the first record is written.
+        """
+        return self._schema
+
+    def _bind(self, record):
+        columns = columns_for(record, self._columns)
+        self._names = list(columns)
+        self._converters = [CONVERTERS[t][0] for t in columns.values()]
+        self._get = row_getter(self._names)
+        self._buffers = [[] for _ in self._names]
+        self._schema = pa.schema([(name, _arrow_type(CONVERTERS[t][1])) for name, t in columns.items()])
+
+    def write(self, record):
+        """
+        :param record: Place, Review, or a dict / namedtuple row
+        """
+        if self._buffers is None:
+            self._bind(record)
+        for buffer, convert, value in zip(self._buffers, self._converters, self._get(record)):
+            buffer.append(convert(value))
+        self.rows += 1
+        if len(self._buffers[0]) >= self.chunk_rows:
+            self.flush()
+
+    def _open(self):
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.path, self._schema, compression=self.compression or "none")
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(self.path, self._schema, options=options)
+
+    def flush(self):
+        """
+        Write the buffered rows as one row group / record batch.
+        """
+        if not self._buffers or not self._buffers[0]:
+            return
+        arrays = [pa.array(buffer, type=field.type) for buffer, field in zip(self._buffers, self._schema)]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._open()
+        self._writer.write_batch(batch)
+        for buffer in self._buffers:
+            buffer.clear()
+
+    def close(self):
+        """
+        Flush and finish the file. A sink that got no record writes nothing.
+        """
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class _TextSink(Sink):
+    """
+    Text file behind a write buffer, gzip-compressed when asked, flushed and fsync-ed every `fsync_every` rows
+    so a crash loses at most that many rows (a gzip file stays readable up to the last sync).
+    """
+
+    newline = None
+
+    def __init__(self, path, compress: bool = None, append: bool = False, buffer_size: int = 1 << 20,
+                 fsync_every: int = 10_000):
+        self.path = path
+        self.compress = str(path).endswith(".gz") if compress is None else compress
+        self.fsync_every = fsync_every
+        self.rows = 0
+        self.skipped = 0
+        self._unsynced = 0
+        mode = "ab" if append else "wb"
+        self._raw = open(path, mode, buffering=buffer_size)
+        self._empty = self._raw.tell() == 0
+        binary = self._raw
+        self._gzip = None
+        if self.compress:
+            # a new gzip member when appending; readers decompress the members one after the other
+            self._gzip = gzip.GzipFile(fileobj=self._raw, mode=mode)
+            binary = io.BufferedWriter(self._gzip, buffer_size)
+        self._file = io.TextIOWrapper(binary, encoding="utf-8", newline=self.newline)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({str(self.path)!r}, rows={self.rows})"
+
+    def _written(self):
+        self.rows += 1
+        self._unsynced += 1
+        if self.fsync_every and self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def flush(self):
+        """
+        Hand the buffered rows to the OS (the gzip stream is flushed to a readable point).
+        """
+        if self._file.closed:
+            return
+        self._file.flush()
+        if self._gzip is not None:
+            self._gzip.flush()
+        self._raw.flush()
+
+    def sync(self):
+        """
+        flush and fsync: the rows written so far survive a crash of the process or the machine.
+        """
+        self.flush()
+        if not self._file.closed:
+            os.fsync(self._raw.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+        self._raw.close()
+
+
+class NDJSONSink(_TextSink):
+    """
+    One json object per line: Place.json(), Review.json(), or the row of a `fields=[...]` search.
+
+    :param path: file path; ".gz" paths are gzip-compressed unless `compress` says otherwise
+    :param compress: gzip the file
+    :param append: add to an existing file instead of replacing it
+    :param buffer_size: bytes buffered before a write to the file
+    :param fsync_every: rows between fsyncs, 0 to fsync only on close
+    """
+
+    def write(self, record):
+        self._file.write(json.dumps(record_json(record), ensure_ascii=False, default=str))
+        self._file.write("\n")
+        self._written()
+
+
+class CSVSink(_TextSink):
+    """
+    One row per record; nested values (dicts, lists) are written as json text.
+
+    :param path: file path; ".gz" paths are gzip-compressed unless `compress` says otherwise
+    :param columns: column names, default the keys of the first record
+    :param compress: gzip the file
+    :param append: add to an existing file, the header is written only to an empty one
+    :param buffer_size: bytes buffered before a write to the file
+    :param fsync_every: rows between fsyncs, 0 to fsync only on close
+    """
+
+    newline = ""
+
+    def __init__(self, path, columns=None, compress: bool = None, append: bool = False,
+                 buffer_size: int = 1 << 20, fsync_every: int = 10_000):
+        super().__init__(path, compress=compress, append=append, buffer_size=buffer_size, fsync_every=fsync_every)
+        self.columns = list(columns) if columns is not None else None
+        self._writer = None
+
+    @staticmethod
+    def _cell(value):
+        if isinstance(value, (dict, list, tuple)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+        return value
+
+    def write(self, record):
+        data = record_json(record)
+        if self._writer is None:
+            if self.columns is None:
+                self.columns = list(data)
+            self._writer = csv.writer(self._file)
+            if self._empty:
+                self._writer.writerow(self.columns)
+        self._writer.writerow([self._cell(data.get(name)) for name in self.columns])
+        self._written()
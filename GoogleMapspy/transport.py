@@ -0,0 +1,366 @@
+"""
+Transports behind GoogleMaps.session.
+
+A transport is anything with the `requests.Session.request(method, url, headers=..., proxies=..., timeout=...)`
+signature returning an object that looks like `requests.Response` (status_code, ok, url, headers, history,
+text, content, raise_for_status). `PooledSession`, a tuned `requests.Session`, is the default one.
+"""
+import ipaddress
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import proxy_from_url
+
+from GoogleMapspy import decoding
+
+# optional dependency (pip install GoogleMapsPY[http2]), imported by the first HTTPXTransport:
+# it takes longer to import than the rest of the package
+httpx = None
+
+
+def _import_httpx():
+    global httpx
+    if httpx is None:
+        try:
+            import httpx as module
+        except ImportError:
+            raise ImportError("HTTPXTransport requires httpx, install it with `pip install httpx[http2]`")
+        httpx = module
+    return httpx
+
+
+class DNSCache:
+    """
+    Thread safe host -> ip cache, so new connections to www.google.com skip the resolver.
+
+    :param ttl: seconds an address is kept
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get((host, port))
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+        with self._lock:
+            self._cache[(host, port)] = (address, now + self.ttl)
+        return address
+
+    def invalidate(self, host, port):
+        with self._lock:
+            self._cache.pop((host, port), None)
+
+
+class ConnectionStats:
+    """
+    Requests sent vs connections opened by a PooledSession; every new https connection is a TLS handshake.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (f"ConnectionStats(requests={self.requests}, connections={self.connections}, "
+                f"reuse_rate={self.reuse_rate:.2f})")
+
+    @property
+    def reused(self):
+        return max(0, self.requests - self.connections)
+
+    @property
+    def reuse_rate(self):
+        return self.reused / self.requests if self.requests else 0.0
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def json(self):
+        return {"requests": self.requests, "connections": self.connections, "reused": self.reused,
+                "reuse_rate": self.reuse_rate}
+
+
+class _PooledConnection:
+    # mixed into urllib3's HTTP(S)Connection by PooledAdapter, which sets these two
+    stats = None
+    dns_cache = None
+
+    def _new_conn(self):
+        self.stats.count_connection()
+        if self.dns_cache is None:
+            return super()._new_conn()
+        host = self._dns_host
+        try:
+            # only the tcp connect uses the cached address, SNI and certificate checks still use the host name
+            self._dns_host = self.dns_cache.resolve(host, self.port)
+        except OSError:
+            return super()._new_conn()
+        try:
+            return super()._new_conn()
+        except Exception:
+            self.dns_cache.invalidate(host, self.port)
+            raise
+        finally:
+            self._dns_host = host
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with pool sizes per host and per proxy, TCP keep-alive, an optional DNS cache
+    and connection counting.
+
+    :param pool_connections: hosts (or proxies) kept in the pool manager before the least used is dropped
+    :param pool_maxsize: idle keep-alive connections kept per host; with fewer than the threads sending requests
+        the extra connections are closed after each response and the next request pays a new handshake
+    :param proxy_pool_maxsize: same as pool_maxsize for each proxy, defaults to pool_maxsize
+    :param pool_block: wait for a free connection instead of opening one over pool_maxsize
+    :param keepalive: enable TCP keep-alive probes on the sockets
+    :param dns_cache: DNSCache shared by the connections, None to resolve on every new connection
+    :param stats: ConnectionStats to count into
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 32, proxy_pool_maxsize: int = None,
+                 pool_block: bool = False, keepalive: bool = True, dns_cache: DNSCache = None,
+                 stats: ConnectionStats = None, max_retries=0):
+        self.proxy_pool_maxsize = proxy_pool_maxsize or pool_maxsize
+        self.keepalive = keepalive
+        self.dns_cache = dns_cache
+        self.stats = stats or ConnectionStats()
+        attrs = {"stats": self.stats, "dns_cache": dns_cache}
+        http = type("PooledHTTPConnection", (_PooledConnection, HTTPConnection), attrs)
+        https = type("PooledHTTPSConnection", (_PooledConnection, HTTPSConnection), attrs)
+        self._pool_classes = {
+            "http": type("PooledHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": http}),
+            "https": type("PooledHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": https}),
+        }
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries,
+                         pool_block=pool_block)
+
+    def _socket_options(self):
+        options = list(HTTPConnection.default_socket_options)
+        if self.keepalive:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        return options
+
+    def _install(self, manager):
+        manager.pool_classes_by_scheme = self._pool_classes
+        return manager
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", self._socket_options())
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self._install(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        if proxy not in self.proxy_manager and not proxy.lower().startswith("socks"):
+            proxy_kwargs.setdefault("socket_options", self._socket_options())
+            self.proxy_manager[proxy] = self._install(proxy_from_url(
+                proxy, proxy_headers=self.proxy_headers(proxy), num_pools=self._pool_connections,
+                maxsize=self.proxy_pool_maxsize, block=self._pool_block, **proxy_kwargs))
+        return super().proxy_manager_for(proxy, **proxy_kwargs)
+
+    def send(self, request, **kwargs):
+        self.stats.count_request()
+        return super().send(request, **kwargs)
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session tuned for many threads sending to the same host through one or more proxies:
+    keep-alive connections are kept per host and per proxy (see PooledAdapter), so a batch crawl pays
+    a TLS handshake per connection instead of per request.
+
+        session = PooledSession(pool_maxsize=64)
+        maps = GoogleMaps(session=session)
+        ...
+        print(session.stats)
+
+    :param pool_connections: see PooledAdapter
+    :param pool_maxsize: see PooledAdapter, keep it >= the get_places workers
+    :param proxy_pool_maxsize: see PooledAdapter
+    :param pool_block: see PooledAdapter
+    :param keepalive: see PooledAdapter
+    :param dns_ttl: seconds resolved addresses are cached, 0 to disable the cache
+    """
+    accept_encoding = decoding.REQUESTS_ACCEPT_ENCODING
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 32, proxy_pool_maxsize: int = None,
+                 pool_block: bool = False, keepalive: bool = True, dns_ttl: float = 300):
+        super().__init__()
+        self.stats = ConnectionStats()
+        self.dns_cache = DNSCache(dns_ttl) if dns_ttl else None
+        adapter = PooledAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                proxy_pool_maxsize=proxy_pool_maxsize, pool_block=pool_block, keepalive=keepalive,
+                                dns_cache=self.dns_cache, stats=self.stats)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+
+class HTTPXResponse:
+    """
+    requests.Response-like view of an httpx.Response, so GoogleMaps, RetryPolicy and ProxyPool
+    do not need to know which transport sent the request.
+    """
+
+    def __init__(self, response):
+        self.raw = response
+        self.status_code = response.status_code
+        self.reason = response.reason_phrase
+        self.headers = response.headers
+        self.url = str(response.url)
+        self.http_version = response.http_version
+        self.history = [HTTPXResponse(r) for r in response.history]
+
+    def __repr__(self):
+        return f"<Response [{self.status_code}] {self.http_version}>"
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        return self.raw.content
+
+    @property
+    def text(self):
+        return self.raw.text
+
+    def json(self, **kwargs):
+        return self.raw.json(**kwargs)
+
+    def iter_content(self, chunk_size=1):
+        # the body was read (and decompressed) on the event loop thread
+        return self.raw.iter_bytes(chunk_size)
+
+    def raise_for_status(self):
+        if not self.ok:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.exceptions.HTTPError(f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}",
+                                                response=self)
+
+
+class HTTPXTransport:
+    """
+    HTTP/2 transport on top of httpx: requests to www.google.com share a few multiplexed connections
+    instead of one TCP + TLS connection per request in flight.
+
+    The connections live on one background event loop (httpx.AsyncClient); `request` may be called from any
+    number of threads and blocks until its response is read. The sync httpx client is not used because its
+    HTTP/2 connections are not safe to share between threads.
+    httpx binds the proxy to the client, so one client (and its connection pool) is kept per proxy.
+
+    :param http2: negotiate HTTP/2 (ALPN) on https connections
+    :param http1: allow HTTP/1.1; with http1=False plain http urls use HTTP/2 prior knowledge (h2c)
+    :param max_connections: connections per client (per proxy)
+    :param verify: verify TLS certificates, or a path to a CA bundle
+    :param timeout: default timeout in seconds
+    """
+
+    def __init__(self, http2: bool = True, http1: bool = True, max_connections: int = 10, verify=True,
+                 timeout: float = 60):
+        decoders = _import_httpx()._decoders.SUPPORTED_DECODERS
+        # encodings httpx can decode here: brotli and zstd need the brotli / zstandard packages
+        self.accept_encoding = decoding.accept_encoding(brotli="br" in decoders, zstd="zstd" in decoders)
+        self.http2 = http2
+        self.http1 = http1
+        self.max_connections = max_connections
+        self.verify = verify
+        self.timeout = timeout
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def _get_loop(self):
+        import asyncio  # like httpx, kept off the import path of the default transport
+
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="GoogleMapsPy-http2", daemon=True).start()
+            return self._loop
+
+    def _client(self, proxy=None):
+        # only called on the event loop thread
+        client = self._clients.get(proxy)
+        if client is None:
+            client = httpx.AsyncClient(http2=self.http2, http1=self.http1, proxy=proxy, verify=self.verify,
+                                       timeout=self.timeout, follow_redirects=True,
+                                       limits=httpx.Limits(max_connections=self.max_connections))
+            self._clients[proxy] = client
+        return client
+
+    async def _request(self, method, url, proxy, **kwargs):
+        r = await self._client(proxy).request(method, url, **kwargs)
+        await r.aread()
+        return r
+
+    def request(self, method, url, headers=None, proxies=None, timeout=None, stream=False, **kwargs):
+        proxy = None
+        if proxies:
+            proxy = proxies.get("https" if url.startswith("https") else "http")
+        import asyncio
+
+        coro = self._request(method, url, proxy, headers=headers,
+                             timeout=timeout if timeout is not None else self.timeout, **kwargs)
+        try:
+            r = asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e)
+        return HTTPXResponse(r)
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        import asyncio
+
+        async def close_clients():
+            for client in self._clients.values():
+                await client.aclose()
+            self._clients = {}
+
+        asyncio.run_coroutine_threadsafe(close_clients(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+
+TRANSPORTS = {
+    "requests": PooledSession,
+    "http2": HTTPXTransport,
+}
+
+
+def make_transport(transport="requests"):
+    """
+    :param transport: a name from TRANSPORTS, or an already built transport which is returned as is
+    """
+    if not isinstance(transport, str):
+        return transport
+    if transport not in TRANSPORTS:
+        raise ValueError(f"unknown transport {transport!r}, expected one of {', '.join(TRANSPORTS)}")
+    return TRANSPORTS[transport]()
@@ -1,5 +1,7 @@
 from urllib.parse import quote_plus
 
+from GoogleMapspy import schema
+
 
 def get_index(data: list, *args, default=None):
     val = data
@@ -10,142 +12,172 @@ def get_index(data: list, *args, default=None):
     return val
 
 
+class lazy:
+    """
+    cached_property for __slots__ classes: computed on first access and kept in the slot `_<name>`,
+    which `lazy_slots` adds to the class __slots__.
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.slot = f"_{func.__name__}"
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            value = self.compute(obj)
+            setattr(obj, self.slot, value)
+            return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
+
+    def compute(self, obj):
+        return self.func(obj)
+
+
+class field(lazy):
+    """
+    lazy field read from the raw array `obj.data` by a compiled schema extractor.
+    """
+
+    def __init__(self, get, name):
+        self.func = get
+        self.name = name
+        self.slot = f"_{name}"
+        self.__doc__ = None
+
+    def compute(self, obj):
+        return self.func(obj.data)
+
+
+def schema_fields(record_schema) -> dict:
+    """
+    {name: field} for a class body: `locals().update(schema_fields(schema.PLACE))`.
+    """
+    return {name: field(get, name) for name, get in schema.compile_fields(record_schema).items()}
+
+
+def lazy_slots(namespace) -> tuple:
+    """
+    Slot names for the lazy fields of a class body: `__slots__ = (...) + lazy_slots(locals())`.
+    """
+    return tuple(v.slot for v in namespace.values() if isinstance(v, lazy))
+
+
+_day = schema.compile_record(schema.DAY, "day")
+
+
 class Place:
-    def __init__(self, data):
-        """
-        Index 2>0: street
-        Index 2>1: district
-        Index 2>2: city
-        Index 2>3: ... last part address
-
-        Index 3: phones ???
-
-        Index 4: reviews
-        Index 4>2: expensive
-        Index 4>3: reviews url, text, ...
-        Index 4>7: rating
-        Index 4>8: reviews_count
-        Index 4>10: expensive text
-
-
-        Index 7: site
-        Index 7>0: site url
-        Index 7>1: site title
-
-        Index 9: latitude(9>2),longitude(9>3)
-        Index 10: google_id, hex_ids
-        Index 11: name
-        Index 13 > 0: type
-        Index 13: subtypes list 'Pizza restaurant', 'Fast food restaurant', 'Restaurant']
-        Index 14: district
-        Index 18: full address + name
-        Index 30: Time Zone: 'Asia/Riyadh'
-        Index 32>1>1: description
-        Index 33: Service Options
-        Index 34>1: working_hours
-
-        Index 37>0: images
-        Index 37>0>0>29: review_ids
-        Index 37>1: photos_count
-
-        Index 39: full_address
-        Index 42: url
-        Index 52>3: reviews_per_score
-
-        Index 57: owner(https://www.google.com/maps/contrib/owner_id)
-        Index 76: type2  list[list[str]] >> [['pizza_restaurant', 'Pizza'], ['fast_food_restaurant', 'Fast Food'], ['restaurant']]
-        Index 78: google_place_id
-
-        Index 82: address_split:list
-
-        Index 84>0>0: popular_times
-
-        Index 100: about (Serves brunch, Service options), tags
-        Index 107: language
-        Index 110: language_code
-        Index 117: typical_time_spent
-
-
-        Index 142: short_tags
-
-        Index 153>0: reviews(tags) list
-        Index 164>0>1: category
-        Index 166: address_country_city:str
-
-        Index 174: search_google_url
-
-        Index 178: phones
-        Index 178>0>0: phones text '+20 55 2366951'
-        Index 178>0>1: list phones list[list[str, index]] with + and without +
-        Index 178>0>3: phones '+20552366951'
-        Index 178>0>5>0: phones 'tel:+20552366951'
-
-        Index 183: address
-        Index 183>1>0: district
-        Index 183>1>1: street ???
-        Index 183>1>2: street ???
-        Index 183>1>3: city
-        Index 183>1>4: postal_code ???
-        Index 183>1>5: state
-        Index 183>1>6: country_code
-        Index 183>2>1>0: plus_code
-        Index 203>0: working_hours, days
-        """
+    """
+    Index 2>0: street
+    Index 2>1: district
+    Index 2>2: city
+    Index 2>3: ... last part address
+
+    Index 3: phones ???
+
+    Index 4: reviews
+    Index 4>2: expensive
+    Index 4>3: reviews url, text, ...
+    Index 4>7: rating
+    Index 4>8: reviews_count
+    Index 4>10: expensive text
+
+
+    Index 7: site
+    Index 7>0: site url
+    Index 7>1: site title
+
+    Index 9: latitude(9>2),longitude(9>3)
+    Index 10: google_id, hex_ids
+    Index 11: name
+    Index 13 > 0: type
+    Index 13: subtypes list 'Pizza restaurant', 'Fast food restaurant', 'Restaurant']
+    Index 14: district
+    Index 18: full address + name
+    Index 30: Time Zone: 'Asia/Riyadh'
+    Index 32>1>1: description
+    Index 33: Service Options
+    Index 34>1: working_hours
+
+    Index 37>0: images
+    Index 37>0>0>29: review_ids
+    Index 37>1: photos_count
+
+    Index 39: full_address
+    Index 42: url
+    Index 52>3: reviews_per_score
+
+    Index 57: owner(https://www.google.com/maps/contrib/owner_id)
+    Index 76: type2  list[list[str]] >> [['pizza_restaurant', 'Pizza'], ['fast_food_restaurant', 'Fast Food'], ['restaurant']]
+    Index 78: google_place_id
+
+    Index 82: address_split:list
+
+    Index 84>0>0: popular_times
+
+    Index 100: about (Serves brunch, Service options), tags
+    Index 107: language
+    Index 110: language_code
+    Index 117: typical_time_spent
+
+
+    Index 142: short_tags
+
+    Index 153>0: reviews(tags) list
+    Index 164>0>1: category
+    Index 166: address_country_city:str
+
+    Index 174: search_google_url
+
+    Index 178: phones
+    Index 178>0>0: phones text '+20 55 2366951'
+    Index 178>0>1: list phones list[list[str, index]] with + and without +
+    Index 178>0>3: phones '+20552366951'
+    Index 178>0>5>0: phones 'tel:+20552366951'
+
+    Index 183: address
+    Index 183>1>0: district
+    Index 183>1>1: street ???
+    Index 183>1>2: street ???
+    Index 183>1>3: city
+    Index 183>1>4: postal_code ???
+    Index 183>1>5: state
+    Index 183>1>6: country_code
+    Index 183>2>1>0: plus_code
+    Index 203>0: working_hours, days
+
+    Fields are decoded from `data` the first time they are read. With keep_raw=False every field is decoded
+    at once and `data` is dropped, which keeps a long crawl from holding every raw place array.
+    """
+
+    def __init__(self, data, keep_raw: bool = True):
         self.data = data
+        if not keep_raw:
+            self.drop_raw()
 
-        self.rating: float = get_index(self.data, 4, 7, )
-        self.reviews_count: int = get_index(self.data, 4, 8, )
-        self.expensive_text: str = get_index(self.data, 4, 10, )
-
-        self.site_url: str = get_index(self.data, 7, 0, )
-        self.site_text: str = get_index(self.data, 7, 1, )
-
-        self.latitude: float = get_index(self.data, 9, 2, )
-        self.longitude: float = get_index(self.data, 9, 3, )
-        self.google_id: str = get_index(self.data, 10, )
-        self.hex_ids: str = get_index(self.data, 10, )
-
-        self.title: str = get_index(self.data, 11, )
-        self.type: str = get_index(self.data, 13, 0, )
-        self.subtypes: list[str] = get_index(self.data, 13, default=[])
-        self.full_address_name: str = get_index(self.data, 18, )
-        self.time_zone: str = get_index(self.data, 30, )
-        self.description: str = get_index(self.data, 32, 1, 1, )
-        # TODO: Service
-        # TODO: working_hours
-        # TODO: images
-        self.photos_count: int = get_index(self.data, 37, 1, )
-        self.full_address: str = get_index(self.data, 39, )
-        self.url: str = (
-                get_index(self.data, 42, ) or
-                f"https://www.google.com/maps/place/{quote_plus(self.title)}/@{self.latitude},{self.longitude},{15.25}z/data=!4m6!3m5!1s{self.hex_ids}!8m2!3d{self.latitude}!4d{self.longitude}!16s/g/1tj70ytd?entry=ttu")
-
-        # TODO: reviews_per_score
-        # TODO: owner
-        self.type2: list[list[str]] = get_index(self.data, 76, default=[])
-        self.google_place_id: str = get_index(self.data, 78, )
-        self.address_split: list = get_index(self.data, 82, default=[])
-        # TODO: popular_times
-        # TODO: about (Serves brunch, Service options), tags
-        self.language: str = get_index(self.data, 110, )
-        self.language_code: str = get_index(self.data, 117, )
-        # TODO: typical_time_spent
-        self.short_tags: list = get_index(self.data, 142, )
-        # TODO: reviews(tags) list
-        self.category: str = get_index(self.data, 164, 0, 1, )
-        self.address_country_city: str = get_index(self.data, 166, )
-        self.search_google_url: str = get_index(self.data, 174, )
-        self.phone: str = get_index(self.data, 178, 0, 3, ) or get_index(self.data, 3, 0, )
-        self.phone_format: str = get_index(self.data, 178, 0, 0)
-        self.district: str = get_index(self.data, 183, 1, 0, )
-        self.street: str = get_index(self.data, 183, 1, 1, )
-        self.street_: str = get_index(self.data, 183, 1, 2, )
-        self.city: str = get_index(self.data, 183, 1, 3, )
-        self.postal_code: str = get_index(self.data, 183, 1, 4, )
-        self.state: str = get_index(self.data, 183, 1, 5, )
-        self.country_code: str = get_index(self.data, 183, 1, 6, )
-        self.plus_code: str = get_index(self.data, 183, 2, 1, 0, )
-        # TODO: working_hours, days
+    def drop_raw(self):
+        """
+        Decode every field, then release the raw array. A field whose part of the array does not have
+        the expected shape is kept as None, since it cannot be decoded later.
+        """
+        if self.data is not None:
+            for name in self.fields():
+                try:
+                    getattr(self, name)
+                except (IndexError, KeyError, TypeError):
+                    setattr(self, name, None)
+            self.data = None
+
+    @classmethod
+    def fields(cls):
+        return [name for name, value in vars(cls).items() if isinstance(value, lazy)]
 
     def __repr__(self):
         return ('Place('
@@ -161,139 +193,78 @@ class Place:
                 f'street_="{self.street_}" ,'
                 ')')
 
-    @property
+    # every plain field (title, phone, city, ...) is a path in schema.PLACE
+    locals().update(schema_fields(schema.PLACE))
+
+    @lazy
+    def url(self) -> str:
+        if self.google_url or self.title is None:
+            return self.google_url
+        return f"https://www.google.com/maps/place/{quote_plus(self.title)}/@{self.latitude},{self.longitude},{15.25}z/data=!4m6!3m5!1s{self.hex_ids}!8m2!3d{self.latitude}!4d{self.longitude}!16s/g/1tj70ytd?entry=ttu"
+
+    @lazy
     def name(self):
-        return self.data[11]
-
-    # @property
-    # def phone(self):
-    #     if self.data[178]:
-    #         return self.data[178][0][3]
-    #     elif self.data[3]:
-    #         return self.data[3][0]
-
-    @property
-    def all_phones(self):
-        if self.data[178]:
-            return self.data[178]
-        elif self.data[3]:
-            return self.data[3]
-
-    @property
-    def reviews(self) -> dict:
-        if self.data[4]:
-            return {
-                "reviews_url": self.data[4][3][0],
-                "reviews_count:str": self.data[4][3][1],
-                "reviews_count:int": self.data[4][8],
-            }
-        return {}
-
-    @property
-    def expensive(self):
-        return self.data[4][2] if self.data[4] else None
-
-    @property
+        return self.title
+
+    @lazy
     def rate(self):
-        return self.data[4][7] if self.data[4] else None
+        return self.rating
+
+    @lazy
+    def reviews(self) -> dict:
+        if self.reviews_url is None and self.reviews_count is None:
+            return {}
+        return {
+            "reviews_url": self.reviews_url,
+            "reviews_count:str": self.reviews_count_text,
+            "reviews_count:int": self.reviews_count,
+        }
 
-    @property
+    @lazy
     def website(self) -> dict:
-        if self.data[7]:
-            return {
-                "url": self.data[7][0],
-                "title": self.data[7][1],
-            }
-        return {}
-
-    @property
+        if self.site_url is None and self.site_text is None:
+            return {}
+        return {
+            "url": self.site_url,
+            "title": self.site_text,
+        }
+
+    @lazy
     def location(self) -> dict:
-        if self.data[9]:
-            return {
-                "latitude": self.data[9][2],
-                "longitude": self.data[9][3],
-            }
-        return {}
-
-    @property
-    # def category(self) -> list:
-    #     return self.data[13]
-
-    # @property
-    # def type2(self) -> list:
-    #     return self.data[76]
-
-    @property
+        if self.latitude is None and self.longitude is None:
+            return {}
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+        }
+
+    @lazy
     def address(self) -> dict:
         return {
-            "split_address:list": self.data[2],
-            "full": self.data[18],
-            "full_split:list": self.data[183][0][0],
-            "address": self.data[39],
-            "district": self.data[14],
-            "continent": self.data[30],
-            "address_split:list": self.data[82],
-            "address_country_city:str": self.data[166],
-            "all_address_list": self.data[183]
+            "split_address:list": self.split_address,
+            "full": self.full_address_name,
+            "full_split:list": self.full_split,
+            "address": self.full_address,
+            "district": self.address_district,
+            "continent": self.time_zone,
+            "address_split:list": self.address_split,
+            "address_country_city:str": self.address_country_city,
+            "all_address_list": self.all_address
         }
 
-    @property
+    @lazy
     def images(self) -> dict:
         return {
-            "main": get_index(self.data, 37, 0, 0, 6, 0)
+            "main": self.main_image
         }
-    @property
-    def main_image(self) -> str:
-        return get_index(self.data, 37, 0, 0, 6, 0)
 
-
-    @property
-    def tags(self):
-        return self.data[100]
-
-    # @property
-    # def short_tags(self):
-    #     return self.data[142]
-
-    @property
-    # def language(self):
-    #     return self.data[107]
-    #
-    # @property
-    # def language_code(self):
-    #     return self.data[110]
-
-    # @property
-    # def search_google_url(self):
-    #     return self.data[174]
-
-    # @property
-    # def google_place_id(self):
-    #     return self.data[78]
-
-    @property
-    def review_ids(self):
-        return self.data[37][0][0][29]
-
-    # @property
-    # def hex_ids(self):
-    #     return self.data[10]
-
-    # @property
-    # def url(self):
-    #     return self.data[42]
-
-    @property
+    @lazy
     def days(self):
-        d = []
-        __days = get_index(self.data, 203, 0, default=[])
-        if __days:
-            for day in __days:
-                var = {"day_name": day[0], "day_id": day[1], "date": day[2],
-                       "from_to": {"text": get_index(day, 3, 0, 0), "from": get_index(day, 3, 0, 1, 0, 0),
-                                   "to": get_index(day, 3, 0, 1, 1, 0)}}
-                d.append(var)
-        return d
+        return [{"day_name": day["day_name"], "day_id": day["day_id"], "date": day["date"],
+                 "from_to": {"text": day["text"], "from": day["from"], "to": day["to"]}}
+                for day in map(_day, self.opening_days)]
+
+    __slots__ = ("data",) + lazy_slots(locals())
 
     def json(self):
         return {
@@ -327,64 +298,8 @@ class Review:
     def __repr__(self):
         return f"Review(contrib_name={self.contrib_name}, review={self.review[:500]})"
 
-    @property
-    def contrib_url(self):
-        return self.data[0][0]
-
-    @property
-    def contrib_name(self):
-        return self.data[0][1]
-
-    @property
-    def contrib_profile(self):
-        return self.data[0][2]
-
-    @property
-    def contrib_level(self):
-        return self.data[12][0][0] if self.data[12][0] else None
-
-    @property
-    def contrib_reviews_count(self):
-        return self.data[12][1][1]
-
-    @property
-    def contrib_rate_count(self):
-        return self.data[12][1][7]
-
-    @property
-    def create_at(self):
-        return self.data[1]
-
-    @property
-    def review(self):
-        if self.data[3]:
-            return self.data[3]
-
-        return ''
-
-    @property
-    def rate(self):
-        return self.data[4]
-
-    @property
-    def review_url(self):
-        return self.data[18]
-
-    @property
-    def lang(self):
-        return self.data[32]
-
-    @property
-    def place_name(self):
-        return self.data[14][0][21][3][7][1] if self.data[14] else None
-
-    @property
-    def likes(self):
-        return self.data[16]
-
-    @property
-    def id(self):
-        return self.data[61] if len(self.data) > 61 else None
+    locals().update(schema_fields(schema.REVIEW))
+    __slots__ = ("data",) + lazy_slots(locals())
 
     def json(self):
         return {
@@ -403,3 +318,27 @@ class Review:
             "likes": self.likes,
             "id": self.id,
         }
+
+
+class PlaceError:
+    """
+    Returned by GoogleMaps.get_places in place of a Place when one item of the batch fails.
+    `index` is the position of the item in the batch (urls first, then keywords).
+    """
+
+    def __init__(self, index, url=None, keyword=None, error=None):
+        self.index = index
+        self.url = url
+        self.keyword = keyword
+        self.error = error
+
+    def __repr__(self):
+        return f"PlaceError(index={self.index}, url={self.url}, keyword={self.keyword}, error={self.error!r})"
+
+    def json(self):
+        return {
+            "index": self.index,
+            "url": self.url,
+            "keyword": self.keyword,
+            "error": f"{type(self.error).__name__}: {self.error}",
+        }
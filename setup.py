@@ -20,9 +20,15 @@ setup(
     project_urls={"Bug Report": "https://github.com/3mora2/GoogleMapsPY/issues/new"},
     install_requires=[
         "requests",
-        "numpy",
-        "fake-useragent",
     ],
+    extras_require={
+        "async": ["aiohttp"],
+        "http2": ["httpx[http2]"],
+        "compression": ["brotli", "zstandard"],
+        "fast-json": ["orjson"],
+        "arrow": ["pyarrow"],
+        "geo": ["numpy"],
+    },
     long_description=long_description,
     long_description_content_type="text/markdown",
     package_dir={"": "."},
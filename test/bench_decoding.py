@@ -0,0 +1,56 @@
+"""
+Bytes on the wire and peak memory for one large search page: the old `json.loads(r.text[5:])`
+on an uncompressed response vs GoogleMaps._get_json (gzip negotiated, streamed, prefix dropped from the bytes).
+
+    python test/bench_decoding.py [places] [repeat]
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+import requests
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.rate_limit import RateLimiter
+from stub_server import StubGoogle
+
+
+def measure(name, server, fetch, repeat):
+    sent = server.bytes_sent
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fetch()
+    elapsed = time.perf_counter() - start
+    sent = server.bytes_sent - sent
+
+    tracemalloc.start()
+    data = fetch()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<10} {sent / repeat / 1024:8.1f} KiB/page on the wire  "
+          f"peak {peak / 2 ** 20:6.1f} MiB  {elapsed / repeat * 1000:6.1f} ms/page")
+    return data
+
+
+def main(places=2000, repeat=5):
+    print(f"search page with {places} places")
+    with StubGoogle(places=places, compress=False) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        url = maps._url_search("restaurant", places, 0)["url"]
+        session = requests.Session()
+        # what GoogleMaps did before: identity body, text, sliced copy of the text
+        old = measure("r.text[5:]", server, lambda: json.loads(
+            session.get(url, headers={"accept-encoding": "identity"}).text[5:]), repeat)
+
+    with StubGoogle(places=places) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        url = maps._url_search("restaurant", places, 0)["url"]
+        new = measure("_get_json", server, lambda: maps._get_json("search", url), repeat)
+
+    assert old == new
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 2000, int(args[1]) if len(args) > 1 else 5)
@@ -0,0 +1,58 @@
+"""
+Tile grid and pairwise distances with the scalar helpers of function.py versus the numpy ones of geo.py.
+
+    python test/bench_geo.py [tiles] [points]
+"""
+import math
+import sys
+import time
+
+from GoogleMapspy import function, geo
+
+
+def scalar_grid(bbox, step_m):
+    min_lng, min_lat, max_lng, max_lat = bbox
+    dlat = function.lat_km2degree(step_m / 1000)
+    centres = []
+    for row in range(max(1, math.ceil((max_lat - min_lat) / dlat))):
+        lat = min_lat + (row + 0.5) * dlat
+        dlng = function.lng_km2degree(step_m / 1000, lat)
+        for column in range(max(1, math.ceil((max_lng - min_lng) / dlng))):
+            centres.append((min_lng + (column + 0.5) * dlng, lat))
+    return centres
+
+
+def scalar_distances(lng, lat):
+    return [[scalar_haversine(lng[i], lat[i], lng[j], lat[j]) for j in range(len(lng))] for i in range(len(lng))]
+
+
+def scalar_haversine(lng1, lat1, lng2, lat2):
+    p = function.pis_per_degree
+    a = math.sin((lat2 - lat1) * p / 2) ** 2 + math.cos(lat1 * p) * math.cos(lat2 * p) * math.sin((lng2 - lng1) * p / 2) ** 2
+    return 2 * function.earth_radius * math.asin(math.sqrt(min(a, 1.0)))
+
+
+def timed(call, *args):
+    start = time.perf_counter()
+    result = call(*args)
+    return time.perf_counter() - start, result
+
+
+def main(tiles=1_000_000, points=2000):
+    # a square bbox at 30N holding about `tiles` tiles of 100 m
+    side = math.sqrt(tiles) * 0.1
+    bbox = (31.0, 30.0, 31.0 + function.lng_km2degree(side, 30.0), 30.0 + function.lat_km2degree(side))
+    geo.grid(bbox, 10_000)  # numpy is imported on first use
+    python, centres = timed(scalar_grid, bbox, 100)
+    vector, (lng, lat) = timed(geo.grid, bbox, 100)
+    print(f"grid of {len(centres)} tiles ({len(lng)}): python {python * 1000:8.1f} ms   numpy {vector * 1000:8.1f} ms")
+
+    lng, lat = lng[:points].tolist(), lat[:points].tolist()
+    python, _ = timed(scalar_distances, lng, lat)
+    vector, _ = timed(geo.pairwise_distances, lng, lat)
+    print(f"pairwise distances of {points} points: python {python * 1000:8.1f} ms   numpy {vector * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 1_000_000, int(args[1]) if len(args) > 1 else 2000)
@@ -0,0 +1,30 @@
+"""
+Throughput of GoogleMaps.get_places against the local stub server.
+
+    python test/bench_get_places.py [items] [delay]
+
+Each stub response waits `delay` seconds, so with enough items places/s should grow
+roughly linearly with the number of workers.
+"""
+import sys
+import time
+
+from GoogleMapspy import GoogleMaps
+from stub_server import StubGoogle
+
+
+def main(items=200, delay=0.05):
+    urls = [f"https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x{i:x}:0x1!8m2" for i in range(items)]
+    with StubGoogle(delay=delay) as server:
+        maps = GoogleMaps(base_url=server.url)
+        print(f"{items} places, {delay * 1000:.0f} ms per response")
+        for workers in (1, 2, 4, 8, 16, 32):
+            start = time.perf_counter()
+            count = sum(1 for _ in maps.get_places(urls=urls, workers=workers))
+            elapsed = time.perf_counter() - start
+            print(f"workers={workers:<3} {count / elapsed:8.1f} places/s  ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 200, float(args[1]) if len(args) > 1 else 0.05)
@@ -0,0 +1,49 @@
+"""
+Cold import time of the package, each statement in a fresh interpreter (median of `repeat` runs,
+minus the time of an empty interpreter).
+
+    python test/bench_import.py [repeat] [budget_ms]
+
+Exits with status 1 when `import GoogleMapspy` costs more than `budget_ms` (default 20 ms),
+so it can run in CI to catch an eager import creeping back in.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = [
+    "pass",
+    "import GoogleMapspy",
+    "from GoogleMapspy import GoogleMaps",
+    "from GoogleMapspy import AsyncGoogleMaps",
+]
+
+
+def cold_time(statement, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(repeat=15, budget_ms=20.0):
+    base = cold_time(STATEMENTS[0], repeat)
+    print(f"python startup {base * 1000:7.1f} ms")
+    costs = {}
+    for statement in STATEMENTS[1:]:
+        costs[statement] = (cold_time(statement, repeat) - base) * 1000
+        print(f"{statement:<42} +{costs[statement]:7.1f} ms")
+    if costs["import GoogleMapspy"] > budget_ms:
+        print(f"import GoogleMapspy is over the {budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 15, float(args[1]) if len(args) > 1 else 20.0)
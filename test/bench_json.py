@@ -0,0 +1,79 @@
+"""
+JSON decoding throughput (MB/s of response body) per backend, over search, place, review and photo responses
+and the `/*""*/{"d": ...}` envelope get_allcom reads. "json.loads(text[5:])" is the parsing done before
+decoding.py: decode the bytes to text, slice the prefix off, parse.
+
+    python test/bench_json.py [directory of saved responses]
+
+Saved responses are raw bodies named after the endpoint (search*.json, place*.json, review*.json,
+photo*.json, envelope*.json); without a directory they come from the stub server's payloads.
+"""
+import glob
+import json
+import os
+import sys
+import time
+
+from GoogleMapspy.decoding import DECODERS, loads, loads_envelope, use_decoder
+from bench_place_memory import padded_place, search_page
+from stub_server import PREFIX, images_payload, review_payload
+
+ENDPOINTS = ("search", "place", "review", "photo", "envelope")
+
+
+def generated():
+    search = search_page(1000)
+    return {
+        "search": PREFIX.encode() + search,
+        "place": (PREFIX + json.dumps([None] * 6 + [padded_place(1)])).encode(),
+        "review": (PREFIX + json.dumps(review_payload(200, 0, 200))).encode(),
+        "photo": (PREFIX + json.dumps(images_payload(500))).encode(),
+        "envelope": ('/*""*/' + json.dumps({"d": PREFIX + search.decode(), "e": "x"})).encode(),
+    }
+
+
+def saved(directory):
+    bodies = {}
+    for endpoint in ENDPOINTS:
+        for path in sorted(glob.glob(os.path.join(directory, f"{endpoint}*.json"))):
+            with open(path, "rb") as f:
+                bodies[f"{endpoint} {os.path.basename(path)}"] = f.read()
+    return bodies
+
+
+def old_loads(body):
+    text = str(body, "utf-8")
+    if text.startswith('/*""*/'):
+        return json.loads(json.loads(text.replace('/*""*/', ''))["d"].replace(")]}'", "").strip())
+    return json.loads(text[5:])
+
+
+def throughput(parse, body, seconds=0.5):
+    parse(body)
+    runs, start = 0, time.perf_counter()
+    while True:
+        parse(body)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return len(body) * runs / elapsed / 1e6
+
+
+def main(directory=None):
+    bodies = saved(directory) if directory else generated()
+    parsers = {"json.loads(text[5:])": old_loads}
+    for name in DECODERS:
+        def parse(body, name=name):
+            use_decoder(name)
+            return loads_envelope(body) if body.startswith(b'/*""*/') else loads(body)
+        parsers[name] = parse
+
+    print(f"{'':<22}" + "".join(f"{name:>22}" for name in parsers))
+    for label, body in bodies.items():
+        results = [throughput(parse, body) for parse in parsers.values()]
+        print(f"{label:<12}{len(body) / 1e6:7.2f} MB" + "".join(f"{mbs:16.1f} MB/s" for mbs in results))
+    use_decoder()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,85 @@
+"""
+Memory held per Place after a crawl: the old eager model (every field in __dict__ plus the raw array),
+the __slots__ model keeping the raw array, and keep_raw=False.
+
+    python test/bench_place_memory.py [places] [recorded_search.json]
+
+Without a recorded search response (the body of a /search?tbm=map request) the page comes from the stub
+server, with the place arrays padded to the size of real ones (popular times, photos, review snippets...).
+"""
+import json
+import sys
+import tracemalloc
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.decoding import loads
+from GoogleMapspy.var import Place
+from stub_server import make_place, search_payload
+
+
+class EagerPlace:
+    """
+    The Place before the __slots__ rewrite: every field decoded in __init__ into the instance __dict__.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        place = Place(data)
+        for name in Place.fields():
+            try:
+                self.__dict__[name] = getattr(place, name)
+            except (IndexError, KeyError, TypeError):
+                self.__dict__[name] = None
+
+
+def padded_place(i):
+    data = make_place(i)
+    data[2] = [f"Street {i}", "Downtown", "Cairo"]
+    data[37][0] = data[37][0] * 10
+    data[84] = [[[day, [[hour, (i * hour) % 100, f"{hour} PM", "Usually not busy", None] for hour in range(24)]]
+                 for day in range(1, 8)], None, None, None, None, None, "Usually a little busy"]
+    data[100] = [None, [[f"group {g}", [[f"attribute {g}.{a}", None, [True]] for a in range(8)]] for g in range(6)]]
+    data[153] = [[[f"tag {t}", t, [None, f"/m/{t:05d}"], f"tag {t} text"] for t in range(10)]]
+    data[175] = [[f"review snippet {i}.{r} " * 8, None, [f"https://example.com/u/{r}.jpg"]] for r in range(3)]
+    return data
+
+
+def search_page(places, path=None):
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    payload = search_payload(places, 0, places)
+    for entry in payload[0][1][1:]:
+        entry[14] = padded_place(int(entry[14][11].split()[-1]))
+    return json.dumps(payload).encode()
+
+
+def held(build, body):
+    """
+    Bytes still allocated after parsing the page, building the places and dropping the parsed page.
+    """
+    tracemalloc.start()
+    places = build(GoogleMaps._prepare_data(loads(body))[0])
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, places
+
+
+def main(places=1000, path=None):
+    body = search_page(places, path)
+    models = {
+        "eager dict": lambda data: [EagerPlace(ll[14]) for ll in data if ll[14]],
+        "slots": lambda data: [Place(ll[14]) for ll in data if ll[14]],
+        "slots, 5 fields read": lambda data: [p for p in (Place(ll[14]) for ll in data if ll[14])
+                                              if (p.title, p.phone, p.rating, p.latitude, p.url)],
+        "keep_raw=False": lambda data: [Place(ll[14], keep_raw=False) for ll in data if ll[14]],
+    }
+    print(f"{len(body) / 1024:.0f} KiB search page")
+    for name, build in models.items():
+        size, result = held(build, body)
+        print(f"{name:<22} {size / len(result):9.0f} bytes/place  ({len(result)} places)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 1000, args[1] if len(args) > 1 else None)
@@ -0,0 +1,48 @@
+"""
+CPU time and memory per result of a search page turned into full Places (and their json()) versus
+`fields=[...]` projections.
+
+    python test/bench_projection.py [places] [recorded_search.json]
+"""
+import sys
+import time
+
+from GoogleMapspy.decoding import loads
+from GoogleMapspy.google_maps import GoogleMaps
+from GoogleMapspy.schema import projection
+from GoogleMapspy.var import Place
+from bench_place_memory import held, search_page
+
+FIELDS = ["title", "google_place_id", "latitude", "longitude", "phone"]
+
+
+def timed(build, data, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(places=1000, path=None):
+    body = search_page(places, path)
+    data = GoogleMaps._prepare_data(loads(body))[0]
+    as_dict, as_tuple = projection(FIELDS), projection(FIELDS, as_tuple=True)
+    models = {
+        "Place.json()": lambda data: [Place(ll[14]).json() for ll in data if ll[14]],
+        "Place, 5 fields read": lambda data: [(p.title, p.google_place_id, p.latitude, p.longitude, p.phone)
+                                              for p in (Place(ll[14]) for ll in data if ll[14])],
+        "fields=, dict": lambda data: [as_dict(ll[14]) for ll in data if ll[14]],
+        "fields=, as_tuple": lambda data: [as_tuple(ll[14]) for ll in data if ll[14]],
+    }
+    print(f"{len(body) / 1024:.0f} KiB search page, {len(data)} places, fields={FIELDS}")
+    for name, build in models.items():
+        seconds = timed(build, data)
+        size, result = held(build, body)
+        print(f"{name:<22} {seconds / len(result) * 1e6:7.2f} us/place {size / len(result):9.0f} bytes/place")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 1000, args[1] if len(args) > 1 else None)
@@ -0,0 +1,90 @@
+"""
+HTTP/1.1 (plain requests.Session and PooledSession) vs HTTP/2 (httpx) transport: TLS handshakes and latency
+for the same batch of get_place requests sent by get_places with N threads against local TLS stub servers.
+
+    python test/bench_transport.py [requests] [workers] [delay]
+
+Needs httpx[http2] and the openssl command line tool (for a throwaway certificate).
+"""
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.transport import HTTPXTransport, PooledSession
+from h2_server import StubGoogleH2
+from stub_server import StubGoogle
+
+import requests
+
+
+class Timed:
+    """
+    Transport wrapper recording the duration of every request.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.durations = []
+
+    def request(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.transport.request(*args, **kwargs)
+        finally:
+            self.durations.append(time.perf_counter() - start)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def make_cert(directory):
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+                    "-addext", "subjectAltName=IP:127.0.0.1", "-keyout", key, "-out", cert],
+                   check=True, capture_output=True)
+    return cert, key
+
+
+def run(name, server, transport, count, workers):
+    connections = server.connections
+    timed = Timed(transport)
+    maps = GoogleMaps(base_url=server.url, session=timed, rate_limiter=RateLimiter())
+    urls = [f"https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x{i:x}:0x1!8m2" for i in range(count)]
+    start = time.perf_counter()
+    done = sum(1 for _ in maps.get_places(urls=urls, workers=workers))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {done:>5} req  {server.connections - connections:>4} handshakes  "
+          f"p50 {percentile(timed.durations, 50) * 1000:7.1f} ms  p99 {percentile(timed.durations, 99) * 1000:7.1f} ms  "
+          f"{done / elapsed:7.1f} req/s")
+
+
+def main(count=500, workers=32, delay=0.02):
+    print(f"{count} requests, {workers} workers, {delay * 1000:.0f} ms server delay")
+    with tempfile.TemporaryDirectory() as directory:
+        cert, key = make_cert(directory)
+
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert, key)
+        with StubGoogle(delay=delay, ssl_context=context) as server:
+            for name, session in (("http/1.1", requests.Session()), ("pooled", PooledSession(pool_maxsize=workers))):
+                session.verify = cert
+                session.trust_env = False  # REQUESTS_CA_BUNDLE would override verify
+                run(name, server, session, count, workers)
+
+        with StubGoogleH2(cert, key, delay=delay) as server:
+            transport = HTTPXTransport(http2=True, max_connections=4, verify=cert)
+            run("http/2", server, transport, count, workers)
+            transport.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 500, int(args[1]) if len(args) > 1 else 32,
+         float(args[2]) if len(args) > 2 else 0.02)
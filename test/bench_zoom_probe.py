@@ -0,0 +1,57 @@
+"""
+Requests per tile of the zoom choice of GeoCrawler: sweeping every zoom as get_com did versus ZoomSearch.
+
+The responses are replayed from a synthetic city (seeded, dense centre, sparse outskirts): a search returns the
+companies of its viewport nearest the centre first, at most 120, 20 a page, like /search?tbm=map.
+
+    python test/bench_zoom_probe.py [companies] [max_tiles]
+"""
+import random
+import sys
+
+from GoogleMapspy.crawler import GeoCrawler, ZoomSearch, ZoomSweep
+from GoogleMapspy.function import get_1d, lat_degree2km, lng_degree2km
+
+CENTRE = (114.15, 22.35)
+BBOX = (114.00, 22.20, 114.30, 22.50)
+
+
+class City:
+    def __init__(self, companies, seed=1):
+        rnd = random.Random(seed)
+        self.points = [(rnd.gauss(CENTRE[0], 0.04), rnd.gauss(CENTRE[1], 0.04)) for _ in range(companies)]
+        self.km = [(lng_degree2km(lng, lat), lat_degree2km(lat)) for lng, lat in self.points]
+        self.recorded = {}
+        self.requests = 0
+
+    def __call__(self, longitude, latitude, d1, offset):
+        self.requests += 1
+        key = (longitude, latitude, d1)
+        if key not in self.recorded:
+            x, y, half = lng_degree2km(longitude, latitude), lat_degree2km(latitude), d1 / 2000
+            inside = [(abs(px - x) + abs(py - y), i) for i, (px, py) in enumerate(self.km)
+                      if abs(px - x) <= half and abs(py - y) <= half]
+            self.recorded[key] = [{"companyName": f"company {i}", "address": None, "phone": None}
+                                  for _, i in sorted(inside)[:120]]
+        return self.recorded[key][offset:offset + 20]
+
+
+def main(companies=20000, max_tiles=200):
+    print(f"{companies} companies, at most {max_tiles} tiles, zoom 1d: {get_1d(0)[14]:.0f} m (14) .. "
+          f"{get_1d(0)[20]:.0f} m (20)")
+    strategies = {
+        "sweep zooms 2-21 (get_com)": lambda: ZoomSweep(range(2, 22)),
+        "sweep zooms 14-20": lambda: ZoomSweep(range(14, 21)),
+        "ZoomSearch 14-20": lambda: ZoomSearch(range(14, 21)),
+    }
+    for name, probe in strategies.items():
+        city = City(companies)
+        crawler = GeoCrawler(probe=probe(), bbox=BBOX, max_tiles=max_tiles, fetch=city)
+        found = sum(1 for _ in crawler.crawl(*CENTRE))
+        print(f"{name:<28} {city.requests:7d} requests {city.requests / crawler.tiles:7.1f} per tile "
+              f"{found:6d} companies {found / city.requests:6.2f} per request")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 20000, int(args[1]) if len(args) > 1 else 200)
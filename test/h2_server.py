@@ -0,0 +1,116 @@
+"""
+HTTP/2 (TLS + ALPN h2) version of stub_server.StubGoogle, used by bench_transport.py.
+
+Needs the `h2` package (installed with httpx[http2]).
+"""
+import asyncio
+import json
+import ssl
+import threading
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+
+from stub_server import PREFIX, route
+
+
+class _H2Protocol(asyncio.Protocol):
+
+    def __init__(self, server):
+        self.server = server
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        self.transport = None
+        self.pending = {}
+
+    def connection_made(self, transport):
+        self.server.connections += 1
+        self.transport = transport
+        self.conn.initiate_connection()
+        self.transport.write(self.conn.data_to_send())
+
+    def data_received(self, data):
+        try:
+            events = self.conn.receive_data(data)
+        except h2.exceptions.ProtocolError:
+            self.transport.close()
+            return
+        for event in events:
+            if isinstance(event, h2.events.RequestReceived):
+                path = dict(event.headers)[":path"]
+                self.server.requests.append(path)
+                asyncio.get_running_loop().call_later(self.server.delay, self.respond, event.stream_id, path)
+            elif isinstance(event, h2.events.WindowUpdated):
+                for stream_id in list(self.pending):
+                    self.send_pending(stream_id)
+            elif isinstance(event, h2.events.StreamReset):
+                self.pending.pop(event.stream_id, None)
+        self.transport.write(self.conn.data_to_send())
+
+    def respond(self, stream_id, path):
+        payload = route(path, self.server.places, self.server.reviews)
+        if payload is None:
+            self.conn.send_headers(stream_id, [(":status", "404")], end_stream=True)
+        else:
+            body = (PREFIX + json.dumps(payload)).encode()
+            self.conn.send_headers(stream_id, [(":status", "200"), ("content-length", str(len(body))),
+                                               ("content-type", "application/json; charset=UTF-8")])
+            self.pending[stream_id] = body
+            self.send_pending(stream_id)
+        self.transport.write(self.conn.data_to_send())
+
+    def send_pending(self, stream_id):
+        # respect flow control: send what the window allows, the rest after a WindowUpdated
+        body = self.pending[stream_id]
+        while body:
+            window = min(self.conn.local_flow_control_window(stream_id), self.conn.max_outbound_frame_size)
+            if window <= 0:
+                break
+            chunk, body = body[:window], body[window:]
+            self.conn.send_data(stream_id, chunk)
+        if body:
+            self.pending[stream_id] = body
+        else:
+            del self.pending[stream_id]
+            self.conn.end_stream(stream_id)
+        self.transport.write(self.conn.data_to_send())
+
+
+class StubGoogleH2:
+
+    def __init__(self, certfile, keyfile, places=10, reviews=10, delay=0.0):
+        self.places = places
+        self.reviews = reviews
+        self.delay = delay
+        self.requests = []
+        self.connections = 0
+        self.ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.ssl_context.load_cert_chain(certfile, keyfile)
+        self.ssl_context.set_alpn_protocols(["h2"])
+        self.loop = asyncio.new_event_loop()
+        self.port = None
+        self._started = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def url(self):
+        return f"https://127.0.0.1:{self.port}"
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        server = self.loop.run_until_complete(
+            self.loop.create_server(lambda: _H2Protocol(self), "127.0.0.1", 0, ssl=self.ssl_context))
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        self.loop.run_forever()
+        server.close()
+
+    def __enter__(self):
+        self.thread.start()
+        self._started.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
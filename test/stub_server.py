@@ -0,0 +1,235 @@
+"""
+Local stand-in for www.google.com used by the tests and benchmarks.
+
+It answers the four endpoints GoogleMaps talks to with small payloads shaped like the real ones
+(same `)]}'` prefix, same index layout for the fields Place/Review read).
+
+    with StubGoogle(places=250) as server:
+        maps = GoogleMaps(base_url=server.url)
+"""
+import gzip
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PREFIX = ")]}'\n"
+
+
+def make_place(i):
+    data = [None] * 204
+    data[4] = [None, None, "$$", ["https://example.com/reviews", f"{i} reviews"], None, None, None, 4.5, i]
+    data[7] = [f"https://example.com/{i}", f"example.com/{i}"]
+    data[9] = [None, None, 30.0 + i / 1000, 31.0 + i / 1000]
+    data[10] = f"0x{i:x}:0x{i + 1:x}"
+    data[11] = f"Place {i}"
+    data[13] = ["Restaurant", "Cafe"]
+    data[18] = f"Place {i}, Street {i}, Cairo"
+    data[37] = [[[None] * 6 + [[f"https://example.com/{i}.jpg"]] + [None] * 22 + [[str(i), str(i + 1)]]], 3]
+    data[39] = f"Street {i}, Cairo"
+    data[78] = f"ChIJ{i}"
+    data[178] = [[f"+20 55 {i:07d}", None, None, f"+2055{i:07d}"]]
+    data[183] = [[[f"Street {i}"]], ["Downtown", f"Street {i}", None, "Cairo", "11511", "Cairo", "EG"], [None, ["7GXH+XX"]]]
+    data[203] = [[["Monday", 1, [2026, 10, 19], [["9 AM–5 PM", [[9], [17]]]]]]]
+    return data
+
+
+def make_review(i):
+    data = [None] * 62
+    data[0] = [f"https://example.com/contrib/{i}", f"User {i}", f"https://example.com/u/{i}.jpg"]
+    data[1] = "a week ago"
+    data[3] = f"review {i}"
+    data[4] = 5
+    data[12] = [[f"Local Guide"], [None, i, None, None, None, None, None, i]]
+    data[16] = i % 3
+    data[61] = f"review-{i}"
+    return data
+
+
+def search_payload(total, offset, per_page):
+    rows = [[None] * 14 + [make_place(i)] for i in range(offset, min(total, offset + per_page))]
+    return [[None, [None] + rows, None, 1]]
+
+
+def geo_search_payload(points, pb, offset, per_page, cap=120):
+    """
+    Search among places at (latitude, longitude) `points`: those inside the square viewport of side !1d meters
+    around !3d / !2d, nearest first and at most `cap` of them, as Google truncates a crowded viewport.
+    """
+    side = float(re.search(r"!1d([\d.e+-]+)", pb).group(1)) / 1000
+    lng = float(re.search(r"!2d([\d.e+-]+)", pb).group(1))
+    lat = float(re.search(r"!3d([\d.e+-]+)", pb).group(1))
+    km_lat, km_lng = 111.195, 111.195 * math.cos(math.radians(lat))
+    inside = sorted((abs(p_lat - lat) * km_lat + abs(p_lng - lng) * km_lng, i)
+                    for i, (p_lat, p_lng) in enumerate(points)
+                    if abs(p_lat - lat) * km_lat <= side / 2 and abs(p_lng - lng) * km_lng <= side / 2)[:cap]
+    rows = []
+    for _, i in inside[offset:offset + per_page]:
+        place = make_place(i)
+        place[9] = [None, None, points[i][0], points[i][1]]
+        rows.append([None] * 14 + [place])
+    return [[None, [None] + rows, None, 1]]
+
+
+def review_payload(total, start, page):
+    return [None, None, [make_review(i) for i in range(start, min(total, start + page))]]
+
+
+def newest_review_payload(total, start, page):
+    # newest first: review-{total - 1} is the newest, new reviews get higher numbers
+    return [None, None, [make_review(i) for i in range(start, max(-1, start - page), -1)]]
+
+
+def place_payload(i):
+    return [None] * 6 + [make_place(i)]
+
+
+def images_payload(count):
+    images = [[None] * 6 + [[f"https://example.com/img/{i}.jpg"]] for i in range(count)]
+    return [images] + [None] * 11 + [[[[None, None, "Menu", images[:2]]]]]
+
+
+def route(path, places, reviews, max_page=None):
+    """
+    Payload for one request path, None for an unknown endpoint.
+
+    :param places: number of places a search finds, or a list of their (latitude, longitude) for searches
+        that depend on the viewport
+    """
+    parsed = urlparse(path)
+    pb = parse_qs(parsed.query).get("pb", [""])[0]
+
+    if parsed.path == "/search":
+        offset = int(re.search(r"!8i(\d+)", pb).group(1))
+        per_page = int(re.search(r"!7i(\d+)", pb).group(1))
+        if isinstance(places, list):
+            return geo_search_payload(places, pb, offset, per_page)
+        return search_payload(places, offset, per_page)
+    elif parsed.path == "/maps/preview/place":
+        place_id = re.search(r"!1s0x([0-9a-f]+):", pb).group(1)
+        return place_payload(int(place_id, 16))
+    elif parsed.path == "/maps/preview/review/listentitiesreviews":
+        page = int(re.search(r"!2i(\d+)", pb).group(1))
+        page = min(page, max_page or page)
+        last_id = re.search(r"!3sreview-(\d+)", pb)
+        # newest first and lowest rating first walk the reviews from the other end
+        if "!3e2" in pb or "!3e4" in pb:
+            start = int(last_id.group(1)) - 1 if last_id else reviews - 1
+            return newest_review_payload(reviews, start, page)
+        start = int(last_id.group(1)) + 1 if last_id else 0
+        return review_payload(reviews, start, page)
+    elif parsed.path == "/maps/preview/photo":
+        return images_payload(3)
+    return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        # one handler per connection
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        if server.delay:
+            time.sleep(server.delay)
+
+        parsed = urlparse(self.path)
+        failure = server.failures.pop(0) if server.failures and parsed.path != "/sorry/index" else None
+        if failure == "sorry":
+            self.send_response(302)
+            self.send_header("Location", f"/sorry/index?continue={parsed.path}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if failure is not None:
+            self.send_response(failure)
+            if server.retry_after is not None:
+                self.send_header("Retry-After", str(server.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if parsed.path == "/sorry/index":
+            self.send_error(429)
+            return
+        payload = route(self.path, server.places, server.reviews, server.max_page)
+        if payload is None:
+            self.send_error(404)
+            return
+
+        body = (PREFIX + json.dumps(payload)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        if server.compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        server.bytes_sent += len(body)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubGoogle:
+
+    def __init__(self, places=10, reviews=10, delay=0.0, failures=(), retry_after=None, ssl_context=None,
+                 compress=True, max_page=None):
+        self.httpd = _Server(("127.0.0.1", 0), _Handler)
+        if ssl_context is not None:
+            # handshake in the handler thread, not in the accept loop
+            self.httpd.socket = ssl_context.wrap_socket(self.httpd.socket, server_side=True,
+                                                        do_handshake_on_connect=False)
+        self.scheme = "https" if ssl_context is not None else "http"
+        self.httpd.places = places
+        self.httpd.reviews = reviews
+        # reviews per page the server answers at most, whatever the request asks for
+        self.httpd.max_page = max_page
+        self.httpd.delay = delay
+        self.httpd.requests = []
+        self.httpd.connections = 0
+        # gzip the bodies when the client accepts it; bytes_sent counts the body bytes on the wire
+        self.httpd.compress = compress
+        self.httpd.bytes_sent = 0
+        # answered in order before the normal responses: an http status, or "sorry" for the captcha redirect
+        self.httpd.failures = list(failures)
+        self.httpd.retry_after = retry_after
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"{self.scheme}://{host}:{port}"
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    @property
+    def bytes_sent(self):
+        return self.httpd.bytes_sent
+
+    @property
+    def connections(self):
+        return self.httpd.connections
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
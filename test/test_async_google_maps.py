@@ -0,0 +1,170 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from GoogleMapspy import AsyncGoogleMaps
+from GoogleMapspy.proxy_pool import ProxyPool
+from GoogleMapspy.retry import RetryPolicy
+from GoogleMapspy.var import Place, PlaceError, Review
+from stub_server import StubGoogle
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def collect(agen):
+    return [item async for item in agen]
+
+
+def test_search_pages_until_empty():
+    async def main(url):
+        async with AsyncGoogleMaps(base_url=url) as maps:
+            return await collect(maps.search("restaurant", per_page=20))
+
+    with StubGoogle(places=45) as server:
+        places = run(main(server.url))
+
+    assert len(places) == 45
+    assert all(isinstance(p, Place) for p in places)
+    assert [p.title for p in places[:2]] == ["Place 0", "Place 1"]
+
+
+def test_get_place_by_url_and_keyword():
+    url = "https://www.google.com/maps/place/Place+7/@30.0,31.0,17z/data=!4m6!3m5!1s0x7:0x8!8m2!3d30.0!4d31.0"
+
+    async def main(base_url):
+        async with AsyncGoogleMaps(base_url=base_url) as maps:
+            return await asyncio.gather(maps.get_place(url=url), maps.get_place(keyword="Place"))
+
+    with StubGoogle(places=3) as server:
+        by_url, by_keyword = run(main(server.url))
+
+    assert by_url.title == "Place 7"
+    assert by_url.phone == "+20550000007"
+    assert by_keyword.title == "Place 0"
+
+
+def test_get_reviews_follows_last_id():
+    async def main(url):
+        async with AsyncGoogleMaps(base_url=url) as maps:
+            return await collect(maps.get_reviews(ids=[1, 2]))
+
+    with StubGoogle(reviews=450) as server:
+        reviews = run(main(server.url))
+        review_requests = [r for r in server.requests if "listentitiesreviews" in r]
+
+    assert len(reviews) == 450
+    assert all(isinstance(r, Review) for r in reviews)
+    assert len({r.id for r in reviews}) == 450
+    assert len(review_requests) == 4
+
+
+def test_get_images():
+    async def main(url):
+        async with AsyncGoogleMaps(base_url=url) as maps:
+            return await maps.get_images(ids=[1, 2])
+
+    with StubGoogle() as server:
+        images = run(main(server.url))
+
+    assert images[0]["name"] == "all_image"
+    assert len(images[0]["images"]) == 3
+    assert images[1]["name"] == "Menu"
+
+
+def test_concurrent_fetches_respect_limit():
+    urls = [f"https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x{i:x}:0x1!8m2" for i in range(20)]
+
+    async def main(base_url, limit):
+        async with AsyncGoogleMaps(base_url=base_url, max_concurrency=limit) as maps:
+            return await asyncio.gather(*(maps.get_place(url=u) for u in urls))
+
+    with StubGoogle(delay=0.1) as server:
+        start = time.perf_counter()
+        places = run(main(server.url, 20))
+        concurrent = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run(main(server.url, 2))
+        limited = time.perf_counter() - start
+
+    assert [p.title for p in places] == [f"Place {i}" for i in range(20)]
+    assert concurrent < 1.0
+    assert limited >= 0.9
+
+
+def test_get_places_is_async():
+    urls = [f"https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x{i:x}:0x1!8m2" for i in range(10)]
+
+    async def main(base_url):
+        async with AsyncGoogleMaps(base_url=base_url) as maps:
+            return await collect(maps.get_places(urls=urls + ["not a place url"], workers=4, ordered=True))
+
+    with StubGoogle(delay=0.1) as server:
+        start = time.perf_counter()
+        results = run(main(server.url))
+        elapsed = time.perf_counter() - start
+
+    assert [p.title for p in results[:10]] == [f"Place {i}" for i in range(10)]
+    assert isinstance(results[10], PlaceError) and results[10].index == 10
+    # 11 fetches of 0.1 s, 4 at a time
+    assert 0.25 < elapsed < 1.0
+
+
+def test_retries_blocked_requests():
+    async def main(url):
+        async with AsyncGoogleMaps(base_url=url, retry_policy=RetryPolicy(backoff=0.01)) as maps:
+            return await maps.get_images(ids=[1, 2])
+
+    with StubGoogle(failures=[429, "sorry", 503]) as server:
+        images = run(main(server.url))
+        assert len(server.requests) == 5
+
+    assert images[0]["name"] == "all_image"
+
+
+def test_pool_proxy_waits_for_release():
+    urls = [f"https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x{i:x}:0x1!8m2" for i in range(3)]
+
+    async def main(base_url):
+        # the stub serves as the one proxy, one request at a time
+        pool = ProxyPool([base_url], max_concurrency=1)
+        acquire_for = pool.acquire_for
+        calls = []
+
+        def counted(*args, **kwargs):
+            calls.append(args)
+            return acquire_for(*args, **kwargs)
+
+        pool.acquire_for = counted
+        async with AsyncGoogleMaps(base_url=base_url, proxies=pool) as maps:
+            places = await asyncio.gather(*(maps.get_place(url=u) for u in urls))
+        return places, calls
+
+    with StubGoogle(delay=0.2) as server:
+        start = time.perf_counter()
+        places, calls = run(main(server.url))
+        elapsed = time.perf_counter() - start
+
+    assert [p.title for p in places] == [f"Place {i}" for i in range(3)]
+    assert 0.6 <= elapsed < 1.2
+    # woken by the releases instead of polling: 1 + 2 + 3 tries
+    assert len(calls) <= 6
+
+
+def test_error_response_is_released():
+    url = "https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2"
+
+    async def main(base_url):
+        async with AsyncGoogleMaps(base_url=base_url) as maps:
+            with pytest.raises(aiohttp.ClientResponseError):
+                await maps.get_place(url=url)
+            connector = maps.session.connector
+            assert not connector._acquired
+            return await maps.get_place(url=url)
+
+    with StubGoogle(failures=[404]) as server:
+        assert run(main(server.url)).title == "Place 5"
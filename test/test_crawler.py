@@ -0,0 +1,172 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.crawler import GeoCrawler, QuadTreeCrawler, ZoomSearch, ZoomSweep, in_polygon
+from GoogleMapspy.function import get_1d, get_com, lat_km2degree
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.var import Place
+from stub_server import StubGoogle, make_place
+
+BBOX = (114.10, 22.30, 114.20, 22.40)
+
+
+class FakeSearch:
+    """
+    One page per search: a company named after the tile, and a chain present everywhere.
+    """
+
+    def __init__(self, fail_at=None):
+        self.calls = []
+        self.fail_at = fail_at
+
+    def __call__(self, longitude, latitude, d1, offset):
+        self.calls.append((longitude, latitude, d1, offset))
+        if len(self.calls) == self.fail_at:
+            raise requests.ConnectionError("reset")
+        if offset:
+            return []
+        local = f"Shop {round(longitude, 3)},{round(latitude, 3)}"
+        return [{"companyName": local, "address": local, "phone": None},
+                {"companyName": "Chain", "address": "HQ", "phone": None}]
+
+
+def test_crawl_bbox():
+    fetch = FakeSearch()
+    crawler = GeoCrawler(zoom=17, bbox=BBOX, fetch=fetch)
+    companies = list(crawler.crawl(114.15, 22.35))
+
+    names = [c["companyName"] for c in companies]
+    assert len(names) == len(set(names)) and names.count("Chain") == 1
+    assert len(names) == crawler.tiles + 1
+
+    centres = {(round(lng, 6), round(lat, 6)) for lng, lat, _, offset in fetch.calls if not offset}
+    assert len(centres) == crawler.tiles  # no tile searched twice
+    assert all(BBOX[0] <= lng <= BBOX[2] and BBOX[1] <= lat <= BBOX[3] for lng, lat in centres)
+    # steps of the 1d of zoom 17 (~2.9 km) from the centre of a ~10 x 11 km box: a 3 x 3 grid
+    assert lat_km2degree(get_1d(0)[17] / 1000) < 0.05 < 2 * lat_km2degree(get_1d(0)[17] / 1000)
+    assert crawler.tiles == 9
+
+
+def test_crawl_max_tiles_and_polygon():
+    crawler = GeoCrawler(zoom=18, max_tiles=5, fetch=FakeSearch())
+    assert len(list(crawler.crawl(114.15, 22.35))) == 6 and crawler.tiles == 5
+
+    triangle = [(114.10, 22.30), (114.20, 22.30), (114.10, 22.40)]
+    assert in_polygon(114.12, 22.32, triangle) and not in_polygon(114.19, 22.39, triangle)
+    fetch = FakeSearch()
+    list(GeoCrawler(zoom=17, polygon=triangle, fetch=fetch).crawl(114.11, 22.31))
+    assert all(in_polygon(lng, lat, triangle) for lng, lat, _, _ in fetch.calls)
+
+    assert list(GeoCrawler(zoom=17, polygon=triangle, fetch=fetch).crawl(114.19, 22.39)) == []
+    with pytest.raises(ValueError):
+        next(GeoCrawler(fetch=fetch).crawl(114.15, 22.35))
+
+
+def test_probe_zooms_and_errors():
+    fetch = FakeSearch(fail_at=2)
+    crawler = GeoCrawler(probe=ZoomSweep((15, 16)), max_tiles=1, fetch=fetch)
+    assert len(list(crawler.crawl(114.15, 22.35))) == 2
+    # zoom 15: page 0, then the failed request ends its pages; zoom 16: page 0 and the empty page 1
+    assert [(d1, offset) for _, _, d1, offset in fetch.calls] == [
+        (get_1d(0)[15], 0), (get_1d(0)[15], 20), (get_1d(0)[16], 0), (get_1d(0)[16], 20)]
+
+
+def test_start_tile_keyed_with_its_zoom():
+    # the probe steps with zoom 18, not DEFAULT_ZOOM: walking back to the start must find it visited
+    fetch = FakeSearch()
+    crawler = GeoCrawler(probe=ZoomSweep((18,)), bbox=BBOX, max_tiles=30, fetch=fetch)
+    list(crawler.crawl(114.15, 22.35))
+    centres = [(round(lng, 6), round(lat, 6)) for lng, lat, _, offset in fetch.calls if not offset]
+    assert len(centres) == len(set(centres)) == crawler.tiles == 30
+
+
+def test_get_com_is_bounded():
+    fetch = FakeSearch()
+    companies = list(get_com(114.15, 22.35, zoom=20, fetch=fetch))
+    assert len(companies) == 1001
+
+
+class Density:
+    """
+    `per_km2` companies per km2 everywhere: a search returns those of its viewport, at most 120, 20 a page.
+    """
+
+    def __init__(self, per_km2):
+        self.per_km2 = per_km2
+        self.zooms = []
+
+    def __call__(self, longitude, latitude, d1, offset):
+        zoom = next(z for z, v in get_1d(0).items() if v == d1)
+        if not offset:
+            self.zooms.append(zoom)
+        count = min(120, int(self.per_km2 * (d1 / 1000) ** 2))
+        return [{"companyName": f"{longitude},{latitude},{zoom},{i}", "address": None, "phone": None}
+                for i in range(offset, min(count, offset + 20))]
+
+
+def test_zoom_search():
+    fetch = Density(per_km2=2)
+    crawler = GeoCrawler(max_tiles=1, fetch=fetch)
+    probe = crawler.probe
+    assert isinstance(probe, ZoomSearch)
+    # zoom 17: 2.9 km viewport, 16 companies; zoom 16: 5.8 km, 66; zoom 15: 11.6 km, saturated
+    assert probe.choose(crawler, 114.15, 22.35)[0] == 16
+    assert fetch.zooms == [17, 15, 16]
+    # the next tile of the region searches the cached zoom only
+    zoom, companies = probe.choose(crawler, 114.16, 22.35)
+    assert (zoom, len(companies), probe.hits) == (16, 66, 1) and fetch.zooms[3:] == [16]
+
+    # denser: the cached zoom saturates, the search goes closer
+    crawler.fetch = Density(per_km2=10)
+    assert probe.choose(crawler, 114.17, 22.35)[0] == 17
+    # saturated everywhere: the closest zoom, whose companies are searched
+    crawler.fetch = Density(per_km2=1e6)
+    zoom, companies = GeoCrawler(fetch=crawler.fetch).probe.choose(crawler, 114.15, 22.35)
+    assert zoom == 20 and crawler.fetch.zooms[-1] == 20
+
+
+def test_quadtree_splits_dense_tiles():
+    rnd = random.Random(3)
+    # a dense block of 300 places in a corner of the area, 40 spread over the rest
+    points = [(22.30 + rnd.random() * 0.01, 114.10 + rnd.random() * 0.01) for _ in range(300)]
+    points += [(22.30 + rnd.random() * 0.08, 114.10 + rnd.random() * 0.08) for _ in range(40)]
+    with StubGoogle(places=points) as server:
+        maps = GoogleMaps(base_url=server.url, latitude="30", longitude="31", rate_limiter=RateLimiter())
+        zoom = maps.zoom
+        crawler = QuadTreeCrawler(maps, "shop", bbox=(114.10, 22.30, 114.18, 22.38))
+        places = list(crawler.crawl())
+
+    assert sorted(p.google_id for p in places) == sorted(make_place(i)[10] for i in range(len(points)))
+    # only the quarters around the block are split: far fewer searches than a grid of the smallest tile
+    assert crawler.splits >= 3 and crawler.tiles == 1 + 4 * crawler.splits < 30
+    assert crawler.truncated == 0
+    assert (maps.latitude, maps.longitude, maps.zoom) == ("30", "31", zoom)
+
+
+def test_quadtree_min_size():
+    points = [(22.345, 114.145)] * 130
+    with StubGoogle(places=points) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        crawler = QuadTreeCrawler(maps, "shop", bbox=(114.14, 22.34, 114.16, 22.36), min_size_m=1000)
+        assert len(list(crawler.crawl())) == 120
+    assert (crawler.tiles, crawler.splits, crawler.truncated) == (5, 1, 1)
+
+
+def test_quadtree_keeps_places_without_ids():
+    def place(i, ids=False):
+        data = make_place(i)
+        if not ids:
+            data[10] = data[78] = None
+        return Place(data)
+
+    class Tile(QuadTreeCrawler):
+        def search_tile(self, tile):
+            self.tiles += 1
+            return [place(0), place(1), place(2), place(1), place(3, ids=True), place(3, ids=True)]
+
+    crawler = Tile(SimpleNamespace(latitude=None, longitude=None, zoom=None), "shop", bbox=(114.14, 22.34, 114.16, 22.36))
+    assert [p.title for p in crawler.crawl()] == ["Place 0", "Place 1", "Place 2", "Place 3"]
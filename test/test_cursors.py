@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from GoogleMapspy import AsyncGoogleMaps, GoogleMaps
+from GoogleMapspy.cursors import HEAD_SIZE, MemoryCursorStore, SQLiteCursorStore, SORT_NEWEST
+from GoogleMapspy.rate_limit import RateLimiter
+from stub_server import StubGoogle
+
+IDS = ["0x1", "0x2"]
+
+
+def client(server, store):
+    return GoogleMaps(base_url=server.url, latitude="30", longitude="31", rate_limiter=RateLimiter(),
+                      cursor_store=store)
+
+
+def review_requests(server):
+    return [r for r in server.requests if "listentitiesreviews" in r]
+
+
+def test_resume_after_crash(tmp_path):
+    path = str(tmp_path / "cursors.db")
+    with StubGoogle(reviews=450) as server:
+        reviews = client(server, SQLiteCursorStore(path)).get_reviews(ids=IDS)
+        seen = [next(reviews).id for _ in range(250)]
+        reviews.close()  # the crawl dies in the middle of the second page
+
+        # a new process: the crawl goes on from the last complete page
+        resumed = [r.id for r in client(server, SQLiteCursorStore(path)).get_reviews(ids=IDS, resume=True)]
+        assert resumed == [f"review-{i}" for i in range(200, 450)]
+        assert "!3sreview-199" in review_requests(server)[2]
+
+        # complete: the next crawl starts over
+        again = [r.id for r in client(server, SQLiteCursorStore(path)).get_reviews(ids=IDS, resume=True)]
+        assert again == [f"review-{i}" for i in range(450)]
+
+    assert seen == [f"review-{i}" for i in range(250)]
+
+
+def test_no_resume_by_default():
+    store = MemoryCursorStore()
+    with StubGoogle(reviews=450) as server:
+        maps = client(server, store)
+        first = [r.id for _, r in zip(range(250), maps.get_reviews(ids=IDS))]
+        # taking the first reviews only leaves a cursor behind, the next plain call still starts from the top
+        assert [r.id for r in maps.get_reviews(ids=IDS)] == [f"review-{i}" for i in range(450)]
+    assert first == [f"review-{i}" for i in range(250)]
+
+
+@pytest.mark.parametrize("store", [MemoryCursorStore, SQLiteCursorStore])
+def test_new_only_stops_at_known_reviews(tmp_path, store):
+    store = store(str(tmp_path / "cursors.db")) if store is SQLiteCursorStore else store()
+    with StubGoogle(reviews=450) as server:
+        maps = client(server, store)
+        first = [r.id for r in maps.get_reviews(ids=IDS, new_only=True)]
+        assert first == [f"review-{i}" for i in range(449, -1, -1)]
+        assert store.get(f"0x1:0x2:{SORT_NEWEST}")[1] == first[:HEAD_SIZE]
+
+        server.httpd.reviews = 455
+        sent = len(review_requests(server))
+        assert [r.id for r in maps.get_reviews(ids=IDS, new_only=True)] == [f"review-{i}" for i in range(454, 449, -1)]
+        assert len(review_requests(server)) == sent + 1
+        assert "!3e2" in review_requests(server)[-1]
+
+        assert list(maps.get_reviews(ids=IDS, new_only=True)) == []
+        assert store.get(f"0x1:0x2:{SORT_NEWEST}")[1][:6] == [f"review-{i}" for i in range(454, 448, -1)]
+
+    with pytest.raises(ValueError):
+        next(maps.get_reviews(ids=IDS, new_only=True, sort=1))
+
+
+def test_async_resume():
+    store = MemoryCursorStore()
+
+    async def main(url, stop=None):
+        async with AsyncGoogleMaps(base_url=url, cursor_store=store) as maps:
+            reviews = []
+            async for review in maps.get_reviews(ids=IDS, resume=True):
+                reviews.append(review.id)
+                if len(reviews) == stop:
+                    break
+            return reviews
+
+    with StubGoogle(reviews=300) as server:
+        assert len(asyncio.run(main(server.url, stop=210))) == 210
+        assert asyncio.run(main(server.url)) == [f"review-{i}" for i in range(200, 300)]
+
+
+def search_requests(server):
+    return [r for r in server.requests if r.startswith("/search")]
+
+
+def test_search_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "cursors.db")
+    with StubGoogle(places=45) as server:
+        places = client(server, SQLiteCursorStore(path)).search("restaurant", per_page=20)
+        assert [next(places).title for _ in range(25)][-1] == "Place 24"
+        places.close()
+
+        maps = client(server, SQLiteCursorStore(path))
+        assert not maps.search_done("restaurant")
+        resumed = [p.title for p in maps.search("restaurant", per_page=20)]
+        assert resumed == [f"Place {i}" for i in range(20, 45)]
+        assert "!8i20" in search_requests(server)[2]
+        assert maps.search_done("restaurant")
+        assert not maps.search_done("cafe")
+        assert client(server, SQLiteCursorStore(path)).search_done("restaurant")
+        # another language is another search
+        maps.hl = "ar"
+        assert not maps.search_done("restaurant")
+
+
+def test_search_many_skips_done_keywords(tmp_path):
+    store = SQLiteCursorStore(str(tmp_path / "cursors.db"))
+    keywords = ["a", "b", "c"]
+    with StubGoogle(places=30) as server:
+        places = client(server, store).search_many(keywords, per_page=20)
+        assert len([next(places) for _ in range(35)]) == 35
+        places.close()
+        sent = len(search_requests(server))
+
+        titles = [p.title for p in client(server, store).search_many(keywords, per_page=20)]
+        assert titles == [f"Place {i}" for i in range(30)] * 2
+        # a skipped; b (its first page was not finished) and c: two pages and the empty third one each
+        assert len(search_requests(server)) == sent + 6
+        assert list(client(server, store).search_many(keywords)) == []
+
+
+def test_search_done_only_when_results_end():
+    store = MemoryCursorStore()
+    with StubGoogle(places=45) as server:
+        maps = client(server, store)
+        assert len(list(maps.search("restaurant", per_page=20, all_=False))) == 20
+        assert not maps.search_done("restaurant")
+
+        get_json = maps._get_json
+        maps._get_json = lambda *args, **kwargs: [[None, None, None, 7]]
+        assert list(maps.search("restaurant", per_page=20)) == []
+        assert not maps.search_done("restaurant")
+        maps._get_json = get_json
+
+        with pytest.raises(ValueError):
+            next(maps.search("restaurant", offset=20))
+        assert [p.title for p in maps.search("restaurant", per_page=20)] == [f"Place {i}" for i in range(45)]
+        assert maps.search_done("restaurant")
+        assert len(list(maps.search("restaurant", per_page=20, offset=40, resume=False))) == 5
+
+
+def test_async_search_done_only_when_results_end():
+    store = MemoryCursorStore()
+
+    async def main(url, **kwargs):
+        async with AsyncGoogleMaps(base_url=url, latitude="30", longitude="31", cursor_store=store) as maps:
+            places = [p async for p in maps.search("restaurant", per_page=20, **kwargs)]
+            return len(places), maps.search_done("restaurant")
+
+    with StubGoogle(places=45) as server:
+        assert asyncio.run(main(server.url, all_=False)) == (20, False)
+        with pytest.raises(ValueError):
+            asyncio.run(main(server.url, offset=20))
+        assert asyncio.run(main(server.url)) == (45, True)
@@ -0,0 +1,99 @@
+import gc
+import json
+
+import pytest
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.decoding import (DECODERS, JSONStreamReader, accept_encoding, gc_paused, loads, loads_envelope,
+                                   read_json, use_decoder)
+from GoogleMapspy.rate_limit import RateLimiter
+from stub_server import PREFIX, StubGoogle
+
+URL = "https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2"
+
+
+@pytest.fixture(params=list(DECODERS))
+def backend(request):
+    previous = use_decoder(request.param)
+    yield request.param
+    use_decoder(previous)
+
+
+def test_loads_with_and_without_prefix(backend):
+    data = [[1, "é"], None]
+    assert loads((PREFIX + json.dumps(data)).encode()) == data
+    assert loads(bytearray((PREFIX + json.dumps(data)).encode())) == data
+    assert loads(PREFIX + json.dumps(data)) == data
+    assert loads(json.dumps(data)) == data
+    with pytest.raises(json.JSONDecodeError):
+        loads(PREFIX + "[1] [2]")
+    with pytest.raises(json.JSONDecodeError):
+        loads(b")]}'\n[1,")
+
+
+def test_loads_envelope(backend):
+    data = [[None, [[1, "é"]]]]
+    body = '/*""*/' + json.dumps({"d": PREFIX + json.dumps(data), "e": "x"})
+    assert loads_envelope(body) == data
+    assert loads_envelope(body.encode()) == data
+    assert loads_envelope('/*""*/{"d": ""}') is None
+    assert loads_envelope(b'{"e": 1}') is None
+
+
+def test_use_decoder():
+    previous = use_decoder("stdlib")
+    try:
+        with pytest.raises(ValueError):
+            use_decoder("nope")
+        assert use_decoder().name == "stdlib"
+    finally:
+        use_decoder(previous)
+
+
+def test_gc_is_only_paused_on_request():
+    assert gc.isenabled()
+    loads(PREFIX + "[[1]]")
+    assert gc.isenabled()
+    with gc_paused():
+        assert not gc.isenabled()
+        assert loads(PREFIX + "[[1]]") == [[1]]
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+
+@pytest.mark.parametrize("size", [1, 3, 4, 7, 1024])
+def test_stream_reader_strips_prefix_across_chunks(size, backend):
+    data = {"places": [[i, "مطعم"] for i in range(50)]}
+    body = (PREFIX + json.dumps(data, ensure_ascii=False)).encode()
+    reader = JSONStreamReader()
+    for i in range(0, len(body), size):
+        reader.feed(body[i:i + size])
+    assert reader.close() == data
+
+
+def test_read_json_without_iter_content():
+    class Response:
+        content = b")]}'\n[1, 2]"
+
+    assert read_json(Response()) == [1, 2]
+
+
+def test_accept_encoding():
+    assert accept_encoding() == "gzip, deflate"
+    assert accept_encoding(brotli=True, zstd=True) == "zstd, br, gzip, deflate"
+
+
+def test_google_maps_negotiates_compression():
+    with StubGoogle(places=100) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        places = list(maps.search("restaurant", per_page=100))
+        compressed = server.bytes_sent
+
+    with StubGoogle(places=100, compress=False) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        assert [p.title for p in maps.search("restaurant", per_page=100)] == [p.title for p in places]
+        plain = server.bytes_sent
+
+    assert "gzip" in maps.headers["accept-encoding"]
+    assert len(places) == 100
+    assert compressed < plain / 3
@@ -0,0 +1,54 @@
+import math
+
+import pytest
+
+from GoogleMapspy import function
+
+np = pytest.importorskip("numpy")
+geo = pytest.importorskip("GoogleMapspy.geo")
+
+
+def test_conversions_match_function():
+    lats = np.array([-60.0, 0.0, 22.35, 51.5])
+    for i, lat in enumerate(lats):
+        assert geo.lat_km2degree(5.0) == pytest.approx(function.lat_km2degree(5.0))
+        assert geo.lat_degree2km(0.3) == pytest.approx(function.lat_degree2km(0.3))
+        assert geo.lng_km2degree(5.0, lats)[i] == pytest.approx(function.lng_km2degree(5.0, lat))
+        assert geo.lng_degree2km(0.3, lats)[i] == pytest.approx(function.lng_degree2km(0.3, lat))
+
+
+def test_neighbours_match_get_23d():
+    lng = np.array([114.15, 0.0, 10.0])
+    lat = np.array([22.35, 85.05, -85.04])
+    lngs, lats, valid = geo.neighbours(lng, lat, dis=2000)
+    for i in range(len(lng)):
+        expected = function.get_23d(lng[i], lat[i], dis=2000)
+        got = [(x, y) for x, y, ok in zip(lngs[i], lats[i], valid[i]) if ok]
+        assert np.allclose(got, expected)
+    assert valid.sum() == 10
+
+
+def test_grid_covers_bbox():
+    bbox = (114.0, 22.2, 114.3, 22.5)
+    lng, lat = geo.grid(bbox, step_m=500)
+    step = function.lat_km2degree(0.5)
+    rows = math.ceil(0.3 / step)
+    assert lat.min() == pytest.approx(22.2 + step / 2) and len(np.unique(lat)) == rows
+    assert (lng > 114.0).all() and (lng - function.lng_km2degree(0.5, 22.5) / 2 < 114.3).all()
+    # neighbouring centres of a row are 500 m apart
+    first = lat == lat[0]
+    assert np.allclose(geo.haversine(lng[first][:-1], lat[first][:-1], lng[first][1:], lat[first][1:]), 0.5,
+                       rtol=1e-3)
+
+
+def test_distances_and_boxes():
+    lng, lat = np.array([114.15, 114.16, 0.0]), np.array([22.35, 22.35, 0.0])
+    d = geo.pairwise_distances(lng, lat)
+    assert d.shape == (3, 3) and np.allclose(np.diag(d), 0) and np.allclose(d, d.T)
+    assert d[0, 1] == pytest.approx(function.lng_degree2km(0.01, 22.35), rel=1e-4)
+    assert geo.haversine(0, 0, 180, 0) == pytest.approx(math.pi * function.earth_radius)
+
+    boxes = geo.bounding_boxes(lng, lat, 1.0)
+    assert boxes.shape == (3, 4)
+    assert boxes[2] == pytest.approx([-function.lng_km2degree(1, 0), -function.lat_km2degree(1),
+                                      function.lng_km2degree(1, 0), function.lat_km2degree(1)])
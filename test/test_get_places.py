@@ -0,0 +1,53 @@
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.var import Place, PlaceError
+from stub_server import StubGoogle
+
+
+def place_url(i):
+    return f"https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x{i:x}:0x1!8m2"
+
+
+def test_get_places_in_input_order():
+    with StubGoogle(places=5) as server:
+        maps = GoogleMaps(base_url=server.url)
+        results = list(maps.get_places(urls=[place_url(i) for i in range(30)], keywords=["a"], workers=6,
+                                       ordered=True))
+
+    assert all(isinstance(r, Place) for r in results)
+    assert [r.title for r in results] == [f"Place {i}" for i in range(30)] + ["Place 0"]
+
+
+def test_get_places_completion_order_has_every_item():
+    with StubGoogle() as server:
+        maps = GoogleMaps(base_url=server.url)
+        results = list(maps.get_places(urls=[place_url(i) for i in range(30)], workers=6, queue_size=8))
+
+    assert sorted(r.title for r in results) == sorted(f"Place {i}" for i in range(30))
+
+
+def test_get_places_failures_are_records():
+    with StubGoogle(places=0) as server:
+        maps = GoogleMaps(base_url=server.url)
+        results = list(maps.get_places(urls=[place_url(1), "https://example.com/not-a-place"],
+                                       keywords=["nothing here"], workers=2, ordered=True))
+
+    assert results[0].title == "Place 1"
+    assert isinstance(results[1], PlaceError)
+    assert results[1].index == 1 and results[1].url == "https://example.com/not-a-place"
+    assert isinstance(results[2], PlaceError)
+    assert results[2].keyword == "nothing here"
+    assert isinstance(results[2].error, LookupError)
+
+
+def test_search_and_get_place_with_fields():
+    fields = ["title", "google_place_id", "latitude", "longitude"]
+    with StubGoogle(places=45) as server:
+        maps = GoogleMaps(base_url=server.url, latitude="30", longitude="31")
+        rows = list(maps.search("restaurant", per_page=20, fields=fields))
+        place = maps.get_place(url=place_url(3), fields=fields, as_tuple=True)
+        results = list(maps.get_places(keywords=["a"], fields=["title"]))
+
+    assert rows[0] == {"title": "Place 0", "google_place_id": "ChIJ0", "latitude": 30.0, "longitude": 31.0}
+    assert [r["title"] for r in rows] == [f"Place {i}" for i in range(45)]
+    assert place.title == "Place 3" and place.latitude == 30.003
+    assert results == [{"title": "Place 0"}]
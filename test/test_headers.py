@@ -0,0 +1,76 @@
+import time
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.headers import DEFAULT_PROFILES, HeaderRotator
+from GoogleMapspy.proxy_pool import ProxyPool
+from GoogleMapspy.rate_limit import RateLimiter
+
+A, B = "http://a:1", "http://b:1"
+
+
+def test_sticky_profile_per_key():
+    rotator = HeaderRotator(seed=1)
+    assert rotator.headers_for(A) is rotator.headers_for(A)
+    assert rotator.headers_for(None) is rotator.headers_for(None)
+    profiles = {rotator.headers_for(f"http://p{i}:1")["User-Agent"] for i in range(50)}
+    assert len(profiles) > 5
+
+    rotator.forget(A)
+    assert A not in rotator._assigned
+
+
+def test_profiles_are_consistent():
+    for profile in DEFAULT_PROFILES:
+        ua = profile["User-Agent"]
+        if "sec-ch-ua" in profile:
+            assert "Chrome/" in ua and "Firefox" not in ua
+            assert ("Edg/" in ua) == ("Microsoft Edge" in profile["sec-ch-ua"])
+            platform = profile["sec-ch-ua-platform"].strip('"')
+            assert {"Windows": "Windows NT", "macOS": "Mac OS X", "Linux": "Linux"}[platform] in ua
+        else:
+            assert "Firefox/" in ua or "Safari/" in ua
+
+
+def test_not_sticky_and_seeded():
+    a = [HeaderRotator(sticky=False, seed=7).headers_for(A) for _ in range(3)]
+    b = [HeaderRotator(sticky=False, seed=7).headers_for(A) for _ in range(3)]
+    assert a == b
+    rotator = HeaderRotator(sticky=False, seed=7)
+    assert len({rotator.headers_for(A)["User-Agent"] for _ in range(50)}) > 5
+
+
+def test_from_user_agents():
+    rotator = HeaderRotator.from_user_agents(["ua-1", "ua-2", "ua-1"])
+    assert rotator.profiles == ({"User-Agent": "ua-1"}, {"User-Agent": "ua-2"})
+
+
+def test_google_maps_keeps_one_profile_per_proxy():
+    seen = []
+
+    class Response:
+        ok = True
+        status_code = 200
+        history = ()
+        headers = {}
+        url = ""
+        content = b")]}'\n[null, null, null, null, null, null, " \
+                  b"[null, null, null, null, null, null, null, null, null, null, null, \"Place\"]]"
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def request(self, method, url, headers=None, proxies=None, **kwargs):
+            seen.append((proxies["https"], headers["User-Agent"]))
+            time.sleep(0.01)
+            return Response()
+
+    maps = GoogleMaps(session=Session(), proxies=ProxyPool([A, B], max_concurrency=1),
+                      rate_limiter=RateLimiter(), header_rotator=HeaderRotator(seed=3))
+    url = "https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2"
+    list(maps.get_places(urls=[url] * 20, workers=2))
+
+    assert {proxy for proxy, _ in seen} == {A, B}
+    for proxy in (A, B):
+        assert len({ua for p, ua in seen if p == proxy}) == 1
+    assert maps.headers["accept"] == "*/*"
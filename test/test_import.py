@@ -0,0 +1,35 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["requests", "numpy", "fake_useragent", "aiohttp", "httpx", "asyncio"]
+
+
+def loaded_after(statement):
+    code = f"import sys, json; {statement}; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_import_package_loads_nothing_heavy():
+    assert loaded_after("import GoogleMapspy") == []
+
+
+def test_google_maps_does_not_load_optional_packages():
+    assert loaded_after("from GoogleMapspy import GoogleMaps") == ["requests"]
+
+
+def test_lazy_attributes():
+    import GoogleMapspy
+    from GoogleMapspy.google_maps import GoogleMaps
+
+    assert GoogleMapspy.GoogleMaps is GoogleMaps
+    assert "AsyncGoogleMaps" in dir(GoogleMapspy)
+    try:
+        GoogleMapspy.Nope
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("expected AttributeError")
@@ -0,0 +1,102 @@
+import json
+import time
+
+import requests
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.paging import AdaptivePageSize, PageSize, page_size
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.retry import RetryPolicy
+from stub_server import PREFIX, StubGoogle, route
+
+
+def test_fixed_page_size():
+    pager = page_size(100)
+    assert isinstance(pager, PageSize) and page_size(pager) is pager
+    pager.record(100, 100, latency=60)
+    assert pager.size == 100 and not pager.timed_out()
+    assert pager.shrink() == 25 and pager.shrink() == 6
+
+
+def test_adaptive_page_size():
+    pager = AdaptivePageSize(100, minimum=10, maximum=400, target_latency=2)
+    pager.record(100, 100, latency=0.5)
+    assert pager.size == 200
+    pager.record(200, 200, latency=1.5)
+    assert pager.size == 200
+    pager.record(200, 200, latency=8)
+    assert pager.size == 50
+    # one short page (the last one, or a hiccup) does not cap the size
+    pager.record(50, 30, latency=0.1)
+    assert pager.size == 50 and pager.maximum == 400
+    pager.record(50, 50, latency=0.1)
+    pager.record(100, 30, latency=0.1)
+    assert pager.size == 100
+    # the same short count twice in a row is the server's cap
+    pager.record(100, 30, latency=0.1)
+    assert pager.size == 30 and pager.maximum == 30
+    pager.record(30, 30, latency=0.1)
+    assert pager.size == 30
+    pager.record(30, 0, latency=0.1)
+    assert pager.size == 30
+    assert pager.timed_out() and pager.size == 15
+    assert pager.timed_out() and pager.size == 10
+    assert not pager.timed_out()
+
+    # a new crawl may grow past the cap learned on the last one
+    pager.reset()
+    pager.record(10, 10, latency=0.1)
+    assert pager.size == 20 and pager.maximum == 400
+
+    capped = AdaptivePageSize(100, maximum=1000, max_bytes=50_000)
+    capped.record(100, 100, latency=0.1, nbytes=100_000)
+    assert capped.size == 50
+
+
+def test_reviews_follow_server_page_cap():
+    with StubGoogle(reviews=450, max_page=100) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        reviews = list(maps.get_reviews(ids=["0x1", "0x2"], page=AdaptivePageSize(400, maximum=400)))
+        pages = [r for r in server.requests if "listentitiesreviews" in r]
+
+    assert len(reviews) == 450 and len({r.id for r in reviews}) == 450
+    # the first short page may be a hiccup, the second one at the same count is the cap
+    assert all("!2i400" in p for p in pages[:2]) and all("!2i100" in p for p in pages[2:5])
+
+
+def test_timeouts_shrink_the_page():
+    class Response:
+        ok = True
+        status_code = 200
+        history = ()
+        headers = {}
+
+        def __init__(self, url):
+            self.url = url
+            path = url.split("//", 1)[1].split("/", 1)[1]
+            self.content = (PREFIX + json.dumps(route("/" + path, 10, 300))).encode()
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def request(self, method, url, **kwargs):
+            if "!2i200" in url or "!2i100" in url:
+                raise requests.Timeout(url)
+            return Response(url)
+
+    sleeps = []
+    maps = GoogleMaps(session=Session(), rate_limiter=RateLimiter(),
+                      retry_policy=RetryPolicy(on_retry=lambda attempt, wait, error: sleeps.append(wait)))
+    start = time.monotonic()
+    reviews = list(maps.get_reviews(ids=["0x1", "0x2"], page=AdaptivePageSize(200, minimum=10)))
+    # the default policy hands each timeout to the pager: no backoff, no circuit breaker wait
+    assert len(reviews) == 300 and sleeps == [] and time.monotonic() - start < 1
+
+    maps = GoogleMaps(session=Session(), rate_limiter=RateLimiter(), retry_policy=RetryPolicy(max_retries=0))
+    try:
+        list(maps.get_reviews(ids=["0x1", "0x2"], page=200))
+    except requests.Timeout:
+        pass
+    else:
+        raise AssertionError("a fixed page size does not retry smaller pages")
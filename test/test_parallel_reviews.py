@@ -0,0 +1,109 @@
+import asyncio
+import json
+import re
+import time
+
+from GoogleMapspy import AsyncGoogleMaps, GoogleMaps
+from GoogleMapspy.cursors import SORT_HIGHEST, SORT_LOWEST, SORT_NEWEST, SORT_RELEVANT
+from GoogleMapspy.paging import AdaptivePageSize
+from GoogleMapspy.rate_limit import RateLimiter
+from stub_server import PREFIX, StubGoogle, make_review
+
+IDS = ["0x1", "0x2"]
+
+
+def review_requests(server):
+    return [r for r in server.requests if "listentitiesreviews" in r]
+
+
+def test_streams_meet_in_the_middle():
+    with StubGoogle(reviews=1000, delay=0.05) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        start = time.perf_counter()
+        serial = [r.id for r in maps.get_reviews(ids=IDS)]
+        serial_time = time.perf_counter() - start
+        serial_requests = len(review_requests(server))
+
+        start = time.perf_counter()
+        parallel = [r.id for r in maps.get_reviews_parallel(ids=IDS, total=1000)]
+        parallel_time = time.perf_counter() - start
+        parallel_requests = len(review_requests(server)) - serial_requests
+
+    assert len(parallel) == len(set(parallel)) == 1000
+    assert set(parallel) == set(serial)
+    assert len(maps.reviews) == 1000
+    # 6 requests (5 pages and the empty one) one after the other, vs 3-4 rounds of 2 at the same time
+    assert serial_requests == 6 and parallel_requests <= 8
+    assert parallel_time < serial_time * 0.8
+
+
+def test_total_and_more_streams():
+    with StubGoogle(reviews=450) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        sorts = (SORT_RELEVANT, SORT_NEWEST, SORT_HIGHEST, SORT_LOWEST)
+        reviews = [r.id for r in maps.get_reviews_parallel(ids=IDS, sorts=sorts, total=450, page=100)]
+    assert sorted(reviews) == sorted(f"review-{i}" for i in range(450))
+
+
+def test_adaptive_page_size():
+    with StubGoogle(reviews=900, max_page=100) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        pager = AdaptivePageSize(200, maximum=400)
+        reviews = [r.id for r in maps.get_reviews_parallel(ids=IDS, total=900, page=pager)]
+        pages = [int(re.search(r"!2i(\d+)", r).group(1)) for r in review_requests(server)]
+    assert sorted(reviews) == sorted(f"review-{i}" for i in range(900))
+    # the streams share the pager: the cap of 100 learned from their short pages
+    assert set(pages[:2]) == {200} and pager.maximum == 100 and pages[-1] == 100
+
+
+def test_stream_error_is_raised():
+    with StubGoogle(reviews=450, failures=[404]) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter())
+        try:
+            list(maps.get_reviews_parallel(ids=IDS))
+        except Exception as e:
+            assert "404" in str(e)
+        else:
+            raise AssertionError("expected the 404 of one stream")
+
+
+def test_async_parallel():
+    async def main(url):
+        async with AsyncGoogleMaps(base_url=url) as maps:
+            return [review.id async for review in maps.get_reviews_parallel(ids=IDS, page=AdaptivePageSize(50))]
+
+    with StubGoogle(reviews=300) as server:
+        reviews = asyncio.run(main(server.url))
+    assert sorted(reviews) == sorted(f"review-{i}" for i in range(300))
+
+
+def test_tied_reviews_are_not_lost():
+    # 5 stars: 0-1, 3 stars: 2-9, 1 star: 10-11. Google keeps its own order among the 3 star reviews in both
+    # sorts, so lowest first is not the reverse of highest first
+    orders = {SORT_HIGHEST: list(range(12)), SORT_LOWEST: [10, 11, 6, 7, 2, 3, 4, 5, 8, 9, 0, 1]}
+
+    class Response:
+        ok = True
+        status_code = 200
+        history = ()
+        headers = {}
+
+        def __init__(self, url):
+            self.url = url
+            order = orders[int(re.search(r"!3e(\d)", url).group(1))]
+            last = re.search(r"!3sreview-(\d+)", url)
+            start = order.index(int(last.group(1))) + 1 if last else 0
+            page = order[start:start + int(re.search(r"!2i(\d+)", url).group(1))]
+            self.content = (PREFIX + json.dumps([None, None, [make_review(i) for i in page]])).encode()
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def request(self, method, url, **kwargs):
+            time.sleep(0.01)
+            return Response(url)
+
+    maps = GoogleMaps(session=Session(), rate_limiter=RateLimiter())
+    reviews = [r.id for r in maps.get_reviews_parallel(ids=IDS, page=2)]
+    assert sorted(reviews) == sorted(f"review-{i}" for i in range(12))
@@ -0,0 +1,64 @@
+import pickle
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.var import Place
+from stub_server import StubGoogle, make_place
+
+
+def test_fields_are_decoded_on_first_access():
+    data = make_place(3)
+    place = Place(data)
+    assert not hasattr(place, "__dict__")
+    assert not hasattr(place, "_title")
+
+    assert place.title == "Place 3"
+    assert place._title == "Place 3"
+    data[11] = "changed"
+    assert place.title == "Place 3"
+
+    place.title = "renamed"
+    assert place.title == "renamed"
+
+
+def test_properties_return_values():
+    place = Place(make_place(3))
+    assert place.address["full"] == "Place 3, Street 3, Cairo"
+    assert place.review_ids == ["3", "4"]
+    assert place.days[0]["from_to"] == {"text": "9 AM–5 PM", "from": 9, "to": 17}
+    assert place.location == {"latitude": 30.003, "longitude": 31.003}
+
+
+def test_drop_raw():
+    kept = Place(make_place(5))
+    dropped = Place(make_place(5), keep_raw=False)
+    assert dropped.data is None
+    assert dropped.json() == kept.json()
+    assert repr(dropped) == repr(kept)
+    assert pickle.loads(pickle.dumps(dropped)).json() == kept.json()
+
+
+def test_unexpected_shapes_give_defaults():
+    data = [None] * 204
+    data[11] = "Only a name"
+    data[37] = [None, "many"]
+    data[203] = [[["Monday"]]]
+    monday = {"day_name": "Monday", "day_id": None, "date": None, "from_to": {"text": None, "from": None, "to": None}}
+    for place in (Place(data), Place(data, keep_raw=False)):
+        assert place.title == "Only a name"
+        assert place.photos_count is None
+        assert place.days == [monday]
+        assert place.reviews == {} and place.subtypes == []
+    assert Place([]).json()["address"]["full"] is None
+
+
+def test_google_maps_keep_raw():
+    url = "https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2"
+    with StubGoogle(places=30) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter(), keep_raw=False)
+        place = maps.get_place(url=url)
+        places = list(maps.search("restaurant", per_page=20))
+
+    assert place.title == "Place 5" and place.data is None
+    assert len(places) == 30
+    assert all(p.data is None for p in places)
@@ -0,0 +1,205 @@
+import threading
+import time
+
+import pytest
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.proxy_pool import ProxyPool, ENV_PROXY_LIST
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.retry import CircuitBreaker, RetryPolicy
+
+A, B, C = "http://a:1", "http://b:1", "http://c:1"
+
+
+def test_load_from_list_file_and_env(tmp_path, monkeypatch):
+    path = tmp_path / "proxies.txt"
+    path.write_text(f"# pool\n{A}\n\n{B}\n{A}\n")
+    assert list(ProxyPool.from_file(str(path)).stats) == [A, B]
+
+    monkeypatch.setenv(ENV_PROXY_LIST, f"{A}, {B}\n{C}")
+    assert list(ProxyPool.from_env().stats) == [A, B, C]
+    assert GoogleMaps().proxy_pool is not None
+
+    monkeypatch.delenv(ENV_PROXY_LIST)
+    assert ProxyPool.from_env() is None
+    with pytest.raises(ValueError):
+        ProxyPool([])
+
+
+def record(pool, proxy, **kwargs):
+    pool.stats[proxy].in_flight += 1
+    pool.release(proxy, **kwargs)
+
+
+def test_routes_to_healthiest_proxy():
+    pool = ProxyPool([A, B], max_failures=10)
+    for _ in range(3):
+        record(pool, A, latency=0.5)
+        record(pool, B, latency=0.1)
+    # same success rate: the faster proxy wins
+    proxy = pool.acquire()
+    assert proxy == B
+    pool.release(proxy, latency=0.1)
+
+    record(pool, B, ok=False)
+    record(pool, B, ok=False)
+    assert pool.acquire() == A
+
+
+def test_per_proxy_concurrency():
+    pool = ProxyPool([A, B], max_concurrency=2)
+    taken = [pool.acquire() for _ in range(4)]
+    assert sorted(taken) == [A, A, B, B]
+    assert pool.acquire(block=False) is None
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+
+    threading.Timer(0.1, pool.release, args=(A,)).start()
+    assert pool.acquire(timeout=2) == A
+
+
+def test_blocks_and_failures_quarantine():
+    pool = ProxyPool([A, B], max_failures=2, quarantine_time=0.2)
+    record(pool, A, blocked=True)
+    assert [s.url for s in pool.available()] == [B]
+
+    record(pool, B, ok=False)
+    assert [s.url for s in pool.available()] == [B]
+    record(pool, B, ok=False)
+    assert pool.available() == []
+
+    assert pool.acquire(block=False) is None
+    # keep B out so the blocking acquire can only be woken by A leaving quarantine
+    pool.quarantine(B, 5)
+    assert pool.acquire(timeout=2) == A
+
+
+def test_google_maps_uses_pool(monkeypatch):
+    pool = ProxyPool([A, B], quarantine_time=60)
+    seen = []
+
+    class Response:
+        ok = True
+        status_code = 200
+        history = ()
+        headers = {}
+        content = b")]}'\n[null, null, null, null, null, null, " \
+                  b"[null, null, null, null, null, null, null, null, null, null, null, \"Place\"]]"
+
+        def __init__(self, url):
+            self.url = url
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def request(self, method, url, proxies=None, **kwargs):
+            seen.append(proxies["https"])
+            response = Response(url)
+            if proxies["https"] == A:
+                response.status_code, response.ok = 429, False
+            return response
+
+    maps = GoogleMaps(session=Session(), proxies=pool, rate_limiter=RateLimiter(),
+                      retry_policy=RetryPolicy(backoff=0.01))
+    place = maps.get_place(url="https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2")
+    assert place.title == "Place"
+    assert seen == [A, B]
+    assert pool.stats[A].blocks == 1 and pool.stats[A].quarantined_until > 0
+
+
+def test_breaker_is_per_pool_proxy():
+    pool = ProxyPool([A, B], quarantine_time=60)
+    seen, blocked = [], []
+
+    class Response:
+        ok = True
+        status_code = 200
+        history = ()
+        headers = {}
+        content = b")]}'\n[null, null, null, null, null, null, " \
+                  b"[null, null, null, null, null, null, null, null, null, null, null, \"Place\"]]"
+
+        def __init__(self, url):
+            self.url = url
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def request(self, method, url, proxies=None, **kwargs):
+            seen.append(proxies["https"])
+            response = Response(url)
+            if proxies["https"] == A:
+                response.status_code, response.ok = 429, False
+            return response
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, fail_fast=True)
+    policy = RetryPolicy(backoff=0.01, circuit_breaker=breaker,
+                         on_block=lambda response, proxy: blocked.append(proxy))
+    maps = GoogleMaps(session=Session(), proxies=pool, rate_limiter=RateLimiter(), retry_policy=policy)
+    for _ in range(5):
+        place = maps.get_place(url="https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2")
+        assert place.title == "Place"
+    # the block opened the circuit of A only: B keeps serving, nothing fails fast
+    assert seen == [A] + [B] * 5 and blocked == [A]
+    assert breaker.remaining(A) > 0 and breaker.remaining(B) == 0 and breaker.remaining(None) == 0
+
+
+def test_pool_spreads_over_rate_limits():
+    proxies = [f"http://p{i}:1" for i in range(5)]
+    pool = ProxyPool(proxies)
+    seen = []
+
+    class Response:
+        ok = True
+        status_code = 200
+        history = ()
+        headers = {}
+        content = b")]}'\n[null, null, null, null, null, null, " \
+                  b"[null, null, null, null, null, null, null, null, null, null, null, \"Place\"]]"
+
+        def __init__(self, url):
+            self.url = url
+
+        def raise_for_status(self):
+            pass
+
+    class Session:
+        def request(self, method, url, proxies=None, **kwargs):
+            seen.append(proxies["https"])
+            return Response(url)
+
+    limiter = RateLimiter(rates={"place": 1 / 4})
+    maps = GoogleMaps(session=Session(), proxies=pool, rate_limiter=limiter)
+    start = time.monotonic()
+    for _ in range(4):
+        maps.get_place(url="https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2")
+    # a proxy that must wait 4s is passed over while others have a token
+    assert time.monotonic() - start < 1 and sorted(seen) == proxies[:4]
+    assert limiter.ready_in("place", proxies[4]) == 0 and limiter.ready_in("place", proxies[0]) > 3
+
+    # every bucket empty: the proxy that frees up first, with its token reserved
+    proxy, wait = pool.acquire_for(limiter, "place")
+    pool.release(proxy)
+    assert proxy == proxies[4] and wait == 0
+    proxy, wait = pool.acquire_for(limiter, "place")
+    pool.release(proxy)
+    assert proxy == proxies[0] and 3 < wait <= 4
+
+
+def test_acquire_skips_open_circuits():
+    pool = ProxyPool([A, B])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure(A)
+    for _ in range(3):
+        proxy, wait = pool.acquire_for(RateLimiter(), "place", cooldown=breaker.remaining)
+        pool.release(proxy)
+        assert (proxy, wait) == (B, 0)
+
+    # every circuit open: the one that closes first, waited for
+    breaker.record_failure(B)
+    breaker._opened_at[A] -= 30
+    proxy, wait = pool.acquire_for(RateLimiter(), "place", cooldown=breaker.remaining)
+    pool.release(proxy)
+    assert proxy == A and 29 < wait <= 30
@@ -0,0 +1,62 @@
+import multiprocessing
+import time
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.rate_limit import RateLimiter, SQLiteBackend
+from stub_server import StubGoogle
+
+
+def test_bucket_paces_requests():
+    limiter = RateLimiter(rates={"search": 20})
+    start = time.perf_counter()
+    waits = [limiter.acquire("search") for _ in range(6)]
+    elapsed = time.perf_counter() - start
+
+    assert waits[0] == 0
+    assert 0.2 <= elapsed < 0.4
+
+
+def test_buckets_are_per_endpoint_and_proxy():
+    limiter = RateLimiter(rates={"search": 1})
+    assert limiter.delay("search", "http://proxy-a") == 0
+    assert limiter.delay("search", "http://proxy-b") == 0
+    assert limiter.delay("review", "http://proxy-a") == 0
+    assert limiter.delay("search", "http://proxy-a") > 0.9
+
+
+def test_burst_capacity():
+    limiter = RateLimiter(rates={"place": 1}, capacity=3)
+    assert [limiter.delay("place") for _ in range(3)] == [0, 0, 0]
+    assert limiter.delay("place") > 0.9
+
+
+def _take(path, queue):
+    limiter = RateLimiter(rates={"search": 10}, backend=SQLiteBackend(path))
+    queue.put([limiter.delay("search") for _ in range(5)])
+
+
+def test_sqlite_backend_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "rate.db")
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_take, args=(path, queue)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    waits = sorted(queue.get(timeout=10) + queue.get(timeout=10))
+    for worker in workers:
+        worker.join()
+
+    # 10 reservations at 10/s from one shared bucket: the last one waits ~0.9s
+    assert waits[0] == 0
+    assert 0.8 <= waits[-1] <= 1.0
+
+
+def test_search_uses_rate_limiter():
+    with StubGoogle(places=60) as server:
+        maps = GoogleMaps(base_url=server.url, rate_limiter=RateLimiter(rates={"search": 10}))
+        start = time.perf_counter()
+        places = list(maps.search("restaurant", per_page=20))
+        elapsed = time.perf_counter() - start
+
+    # 4 pages (the last one empty), the first goes out immediately
+    assert len(places) == 60
+    assert 0.3 <= elapsed < 1.0
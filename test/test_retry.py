@@ -0,0 +1,109 @@
+import time
+
+import pytest
+import requests
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.retry import RetryPolicy, CircuitBreaker, GoogleBlockedError, CircuitOpenError, retry_after
+from stub_server import StubGoogle
+
+URL = "https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2"
+
+
+def maps_for(server, **policy):
+    return GoogleMaps(base_url=server.url, rate_limiter=RateLimiter(),
+                      retry_policy=RetryPolicy(backoff=0.01, **policy))
+
+
+def test_retries_server_errors_then_succeeds():
+    with StubGoogle(failures=[503, 500]) as server:
+        place = maps_for(server).get_place(url=URL)
+        assert len(server.requests) == 3
+    assert place.title == "Place 5"
+
+
+def test_error_response_is_closed():
+    with StubGoogle(failures=[404]) as server:
+        maps = maps_for(server)
+        responses = []
+        request = maps.session.request
+
+        def record(*args, **kwargs):
+            responses.append(request(*args, **kwargs))
+            return responses[-1]
+
+        maps.session.request = record
+        with pytest.raises(requests.exceptions.HTTPError):
+            maps.get_place(url=URL)
+        assert responses[0].status_code == 404 and responses[0].raw.closed
+        assert maps.get_place(url=URL).title == "Place 5"
+
+
+def test_sorry_redirect_is_a_block():
+    blocked = []
+    with StubGoogle(failures=["sorry", "sorry"]) as server:
+        maps = maps_for(server, on_block=lambda response, key: blocked.append(response.url))
+        place = maps.get_place(url=URL)
+    assert place.title == "Place 5"
+    assert len(blocked) == 2 and all("/sorry/index" in url for url in blocked)
+
+
+def test_gives_up_after_max_retries():
+    with StubGoogle(failures=[429] * 10) as server:
+        with pytest.raises(GoogleBlockedError):
+            maps_for(server, max_retries=2).get_place(url=URL)
+        assert len(server.requests) == 3
+
+    with StubGoogle(failures=[503] * 10) as server:
+        with pytest.raises(requests.exceptions.HTTPError):
+            maps_for(server, max_retries=1).get_place(url=URL)
+
+
+def test_honours_retry_after():
+    with StubGoogle(failures=[429], retry_after=1) as server:
+        start = time.perf_counter()
+        maps_for(server).get_place(url=URL)
+        assert time.perf_counter() - start >= 1
+
+
+def test_retry_after_http_date():
+    response = requests.Response()
+    response.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert retry_after(response) == 0
+    response.headers["Retry-After"] = "7"
+    assert retry_after(response) == 7
+
+
+def test_backoff_is_exponential_and_capped():
+    policy = RetryPolicy(backoff=1, max_backoff=5, jitter=False)
+    assert [policy.wait_for(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+    policy = RetryPolicy(backoff=1, max_backoff=5)
+    assert all(0 <= policy.wait_for(3) <= 5 for _ in range(50))
+
+
+def test_circuit_breaker_opens_and_fails_fast():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, fail_fast=True)
+    with StubGoogle(failures=[503] * 10) as server:
+        maps = maps_for(server, max_retries=1, circuit_breaker=breaker)
+        with pytest.raises(requests.exceptions.HTTPError):
+            maps.get_place(url=URL)
+        with pytest.raises(CircuitOpenError):
+            maps.get_place(url=URL)
+        assert len(server.requests) == 2
+
+
+def test_search_retries_connection_errors():
+    calls = []
+
+    class FlakySession(requests.Session):
+        def request(self, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise requests.exceptions.ConnectionError("reset")
+            return super().request(*args, **kwargs)
+
+    with StubGoogle(places=5) as server:
+        maps = GoogleMaps(base_url=server.url, session=FlakySession(), rate_limiter=RateLimiter(),
+                          retry_policy=RetryPolicy(backoff=0.01))
+        assert len(list(maps.search("restaurant"))) == 5
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from GoogleMapspy.function import get_allcom
+from GoogleMapspy.google_maps import GoogleMaps
+from GoogleMapspy.schema import Field, compile_field, compile_record
+from GoogleMapspy.var import Review
+from stub_server import images_payload, make_place, make_review
+
+
+def test_compile_field():
+    data = [None, [1, ["a", "b"]], "", [5]]
+    assert compile_field(Field(1, 1, 0))(data) == "a"
+    assert compile_field(Field(1, 5, 0))(data) is None
+    assert compile_field(Field(0, 3, default="x"))(data) == "x"
+    assert compile_field(Field(2, fallback=Field(3, 0)))(data) == 5
+    assert compile_field(Field(3, 0, type=str))(data) == "5"
+    assert compile_field(Field(1, 1, type=int))(data) is None
+    get = compile_field(Field(9, default=[]))
+    assert get(data) == [] and get(data) is not get(data)
+
+
+def test_compile_record():
+    record = compile_record({"a": Field(0), "b": Field(1, 1, default=0), "c": Field(1, 0, type=float)})
+    assert record([7, [1]]) == {"a": 7, "b": 0, "c": 1.0}
+    assert record(None) == {"a": None, "b": 0, "c": None}
+
+
+def test_review_on_short_arrays():
+    review = Review(make_review(4))
+    assert review.contrib_reviews_count == 4 and review.id == "review-4"
+    short = Review([["url", "name"]])
+    assert short.contrib_name == "name"
+    assert short.json()["contrib_level"] is None
+    assert short.review == ""
+    assert short.id is None
+
+
+def test_parse_images():
+    images = GoogleMaps._parse_images(images_payload(3))
+    assert images == [
+        {"name": "all_image", "images": [f"https://example.com/img/{i}.jpg" for i in range(3)]},
+        {"name": "Menu", "images": ["https://example.com/img/0.jpg", "https://example.com/img/1.jpg"]},
+    ]
+    assert GoogleMaps._parse_images([[[None]]]) == [{"name": "all_image", "images": []}]
+
+
+def test_get_allcom():
+    places = [[None] * 14 + [make_place(i)] for i in range(3)]
+    places[1][14][11] = None
+    places[2][14][39] = None
+    places[2][14][18] = "Somewhere"
+
+    class Response:
+        text = '/*""*/' + json.dumps({"d": ")]}'\n" + json.dumps([[None, places]])})
+
+    result = get_allcom(Response())
+    assert [r["companyName"] for r in result] == ["Place 0", "Place 2"]
+    assert result[0] == {"companyName": "Place 0", "url": "https://example.com/0", "address": "Street 0, Cairo",
+                         "phone": "+20 55 0000000", "category": "Restaurant>Cafe", "countryEn": "Egypt",
+                         "city": None}
+    assert result[1]["address"] == "Somewhere"
+    # the address names no country: the code at [183][1][6]. The last element of [183], read before, is the
+    # plus code block, on which .lower() raised and dropped the company
+    assert result[1]["countryEn"] == "Egypt"
+
+
+def test_get_allcom_skips_malformed_companies():
+    places = [[None] * 14 + [make_place(i)] for i in range(3)]
+    places[0][14][7] = [123]
+    places[1][14][183] = [None, ["Downtown", "Street 1", None, "Cairo", "11511", "Cairo", 7]]
+    places[1][14][39] = places[1][14][18] = None
+    places[1][14][13] = 5
+
+    class Response:
+        text = '/*""*/' + json.dumps({"d": ")]}'\n" + json.dumps([[None, places]])})
+
+    result = get_allcom(Response())
+    assert [r["companyName"] for r in result] == ["Place 1", "Place 2"]
+    assert result[0]["countryEn"] is None and result[0]["category"] is None
+
+
+def test_projection():
+    from GoogleMapspy.schema import projection
+
+    fields = ["title", "google_place_id", "latitude", "longitude", "phone"]
+    extract = projection(fields)
+    assert projection(fields) is extract
+    assert extract(make_place(7)) == {"title": "Place 7", "google_place_id": "ChIJ7", "latitude": 30.007,
+                                      "longitude": 31.007, "phone": "+20550000007"}
+    row = projection(fields, as_tuple=True)(make_place(7))
+    assert row == ("Place 7", "ChIJ7", 30.007, 31.007, "+20550000007")
+    assert row.title == "Place 7"
+    assert projection("title")([None]) == {"title": None}
+    with pytest.raises(ValueError):
+        projection(["title", "nope"])
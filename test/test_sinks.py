@@ -0,0 +1,153 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.var import Place, PlaceError, Review
+from GoogleMapspy.schema import projection
+from GoogleMapspy.sinks import ArrowSink, CSVSink, NDJSONSink, Sink
+from stub_server import StubGoogle, make_place, make_review
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+needs_arrow = pytest.mark.skipif(pa is None, reason="pyarrow is not installed")
+
+
+@needs_arrow
+def test_places_to_parquet_in_chunks(tmp_path):
+    path = tmp_path / "places.parquet"
+    places = [Place(make_place(i), keep_raw=i % 2 == 0) for i in range(25)]
+    with ArrowSink(str(path), chunk_rows=10) as sink:
+        assert sink.write_many(places + [PlaceError(0, url="x")]) == 25
+    assert sink.rows == 25 and sink.skipped == 1
+
+    file = pq.ParquetFile(str(path))
+    assert file.metadata.num_row_groups == 3
+    table = file.read()
+    assert table.schema.field("latitude").type == pa.float64()
+    assert table.schema.field("reviews_count").type == pa.int64()
+    assert table.schema.field("subtypes").type == pa.list_(pa.string())
+    rows = table.to_pylist()
+    assert [r["title"] for r in rows] == [f"Place {i}" for i in range(25)]
+    assert rows[3]["latitude"] == 30.003 and rows[3]["subtypes"] == ["Restaurant", "Cafe"]
+    assert rows[3]["url"] == places[3].url
+    assert rows[3]["opening_days"].startswith('[["Monday", 1')
+
+
+@needs_arrow
+def test_reviews_and_rows_to_ipc(tmp_path):
+    review_path, row_path = tmp_path / "reviews.arrow", tmp_path / "rows.feather"
+    with ArrowSink(str(review_path)) as sink:
+        sink.write_many(Review(make_review(i)) for i in range(5))
+    table = pa.ipc.open_file(str(review_path)).read_all()
+    assert table.column("id").to_pylist() == [f"review-{i}" for i in range(5)]
+    assert table.schema.field("contrib_reviews_count").type == pa.int64()
+
+    extract = projection(["title", "latitude", "phone"], as_tuple=True)
+    with ArrowSink(str(row_path), compression=None) as sink:
+        sink.write(extract(make_place(1)))
+        sink.write({"title": 5, "latitude": "not a number", "phone": None})
+    table = pa.ipc.open_file(str(row_path)).read_all()
+    assert table.to_pylist() == [{"title": "Place 1", "latitude": 30.001, "phone": "+20550000001"},
+                                 {"title": "5", "latitude": None, "phone": None}]
+
+
+@needs_arrow
+def test_explicit_columns(tmp_path):
+    path = tmp_path / "places.parquet"
+    with ArrowSink(str(path), columns={"title": "string", "rating": "float64", "all_phones": "json"}) as sink:
+        sink.write(Place(make_place(2)))
+    assert pq.read_table(str(path)).to_pylist() == [
+        {"title": "Place 2", "rating": 4.5, "all_phones": '[["+20 55 0000002", null, null, "+20550000002"]]'}]
+    with pytest.raises(ValueError):
+        ArrowSink(str(path), columns={"title": "varchar"}).write(Place(make_place(2)))
+
+
+def test_ndjson_plain_gzip_and_append(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+    for name in ("places.ndjson", "places.ndjson.gz"):
+        path = tmp_path / name
+        with NDJSONSink(str(path), fsync_every=4) as sink:
+            sink.write_many([Place(make_place(i)) for i in range(10)] + [PlaceError(0)])
+        with NDJSONSink(str(path), append=True) as sink:
+            sink.write(Review(make_review(1)))
+            sink.write(projection(["title"], as_tuple=True)(make_place(3)))
+
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(str(path), "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["name"] for line in lines[:10]] == [f"Place {i}" for i in range(10)]
+        assert lines[0] == json.loads(json.dumps(Place(make_place(0)).json()))
+        assert lines[10]["id"] == "review-1" and lines[11] == {"title": "Place 3"}
+        assert sink.rows == 2
+    # 2 periodic + 1 on close for the first sink, 1 on close for the second, for both files
+    assert len(synced) == 8
+
+
+def test_gzip_readable_after_sync(tmp_path):
+    path = tmp_path / "reviews.ndjson.gz"
+    sink = NDJSONSink(str(path), fsync_every=0)
+    sink.write_many(Review(make_review(i)) for i in range(3))
+    sink.sync()
+    with open(str(path), "rb") as f:
+        data = gzip.GzipFile(fileobj=io.BytesIO(f.read())).read1(1 << 20)
+    assert len(data.splitlines()) == 3
+    sink.close()
+
+
+def test_csv_header_nested_values_and_append(tmp_path):
+    path = tmp_path / "places.csv.gz"
+    with CSVSink(str(path), columns=["name", "location", "phone"]) as sink:
+        sink.write_many(Place(make_place(i)) for i in range(2))
+    with CSVSink(str(path), columns=["name", "location", "phone"], append=True) as sink:
+        sink.write({"name": "Place 9", "phone": None})
+
+    with gzip.open(str(path), "rt", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["name", "location", "phone"]
+    assert rows[1] == ["Place 0", '{"latitude": 30.0, "longitude": 31.0}', "+20550000000"]
+    assert rows[3] == ["Place 9", "", ""]
+    assert len(rows) == 4
+
+
+def test_keep_results_false(tmp_path):
+    path = tmp_path / "places.ndjson"
+    with StubGoogle(places=30) as server:
+        maps = GoogleMaps(base_url=server.url, latitude="30", longitude="31", keep_results=False,
+                          rate_limiter=RateLimiter())
+        with NDJSONSink(str(path)) as sink:
+            assert sink.write_many(maps.search("restaurant", per_page=20)) == 30
+        reviews = list(maps.get_reviews(ids=["0x1", "0x2"]))
+
+    assert maps.places == [] and maps.reviews == [] and len(reviews) == 10
+    with open(str(path), encoding="utf-8") as f:
+        assert sum(1 for _ in f) == 30
+
+
+def test_sink_subclass_must_write():
+    class NoWrite(Sink):
+        pass
+
+    with pytest.raises(TypeError):
+        NoWrite()
+
+    class Collect(Sink):
+        def __init__(self):
+            self.records = []
+
+        def write(self, record):
+            self.records.append(record)
+
+    with Collect() as sink:
+        assert sink.write_many([1, PlaceError(0, keyword="x", error=None), 2]) == 2
+    assert sink.records == [1, 2] and sink.skipped == 1
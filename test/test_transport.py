@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from GoogleMapspy import GoogleMaps
+from GoogleMapspy.rate_limit import RateLimiter
+from GoogleMapspy.retry import RetryPolicy
+from GoogleMapspy.transport import DNSCache, HTTPXTransport, PooledSession, make_transport
+from stub_server import StubGoogle
+
+URL = "https://www.google.com/maps/place/P/@1,1,17z/data=!3m5!1s0x5:0x1!8m2"
+
+
+def test_make_transport():
+    assert isinstance(make_transport("requests"), PooledSession)
+    assert isinstance(GoogleMaps().session, PooledSession)
+    transport = HTTPXTransport()
+    assert make_transport(transport) is transport
+    with pytest.raises(ValueError):
+        make_transport("carrier-pigeon")
+
+
+def test_http2_transport_with_google_maps():
+    with StubGoogle(places=30, failures=[503]) as server:
+        maps = GoogleMaps(base_url=server.url, transport="http2", rate_limiter=RateLimiter(),
+                          retry_policy=RetryPolicy(backoff=0.01))
+        assert isinstance(maps.session, HTTPXTransport)
+        assert maps.get_place(url=URL).title == "Place 5"
+        assert len(list(maps.search("restaurant", per_page=20))) == 30
+        results = list(maps.get_places(urls=[URL] * 20, workers=8))
+        maps.session.close()
+
+    assert [p.title for p in results] == ["Place 5"] * 20
+
+
+def test_http2_transport_errors_are_requests_errors():
+    transport = HTTPXTransport(timeout=2)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.request("GET", "http://127.0.0.1:9/")
+    transport.close()
+
+    with StubGoogle(failures=[404]) as server:
+        r = HTTPXTransport().request("GET", server.url + "/maps/preview/photo")
+        assert not r.ok
+        with pytest.raises(requests.exceptions.HTTPError):
+            r.raise_for_status()
+
+
+def test_pooled_session_reuses_connections():
+    session = PooledSession(pool_maxsize=8)
+    with StubGoogle(delay=0.01) as server:
+        url = server.url.replace("127.0.0.1", "localhost") + "/maps/preview/photo"
+        with ThreadPoolExecutor(8) as pool:
+            statuses = list(pool.map(lambda _: session.get(url).status_code, range(100)))
+        connections = server.connections
+
+    assert statuses == [200] * 100
+    assert session.stats.requests == 100
+    assert session.stats.connections == connections <= 8
+    assert session.stats.reuse_rate >= 0.9
+    assert [address for address, _ in session.dns_cache._cache.values()] == ["127.0.0.1"]
+
+
+def test_pooled_session_through_proxy():
+    session = PooledSession(proxy_pool_maxsize=2, dns_ttl=0)
+    with StubGoogle() as server:
+        # the stub answers absolute-form requests too, so it doubles as an http proxy
+        for _ in range(5):
+            r = session.get("http://maps.invalid/maps/preview/photo", proxies={"http": server.url})
+        assert server.connections == 1
+
+    assert r.ok
+    assert session.dns_cache is None
+    assert session.get_adapter("http://").proxy_manager[server.url].connection_pool_kw["maxsize"] == 2
+
+
+def test_dns_cache(monkeypatch):
+    calls = []
+
+    def getaddrinfo(host, port, **kwargs):
+        calls.append(host)
+        return [(None, None, None, "", ("10.0.0.1", port))]
+
+    monkeypatch.setattr("socket.getaddrinfo", getaddrinfo)
+    cache = DNSCache(ttl=60)
+    assert cache.resolve("www.google.com", 443) == "10.0.0.1"
+    assert cache.resolve("www.google.com", 443) == "10.0.0.1"
+    assert cache.resolve("127.0.0.1", 443) == "127.0.0.1"
+    assert calls == ["www.google.com"]
+    cache.invalidate("www.google.com", 443)
+    cache.resolve("www.google.com", 443)
+    assert len(calls) == 2
@@ -0,0 +1,25 @@
+import pytest
+
+from GoogleMapspy.function import D1_ZOOM2, d1_to_zoom, get_1d, zoom_to_1d
+
+
+def test_get_1d_is_built_once():
+    assert get_1d(0) is get_1d(0) and get_1d(1) is get_1d(1)
+    assert list(get_1d(0)) == list(range(2, 22))
+    assert get_1d(0)[16] == 5775.056889653493
+    with pytest.raises(TypeError):
+        get_1d(0)[16] = 1
+
+
+def test_zoom_to_1d_matches_tables():
+    for zoom, d1 in [*get_1d(0).items(), *get_1d(1).items()]:
+        assert zoom_to_1d(zoom) == pytest.approx(d1, rel=1e-12)
+        assert d1_to_zoom(d1) == pytest.approx(zoom, abs=1e-9)
+    assert zoom_to_1d(15.5) == pytest.approx(0.75 * zoom_to_1d(15))
+
+
+def test_d1_to_zoom_clamps():
+    assert d1_to_zoom(D1_ZOOM2 * 10) == 2 and zoom_to_1d(0) == D1_ZOOM2
+    assert d1_to_zoom(1) == 21 and zoom_to_1d(30) == zoom_to_1d(21)
+    with pytest.raises(ValueError):
+        d1_to_zoom(0)